@@ -1,34 +1,94 @@
-from fastapi import Depends, HTTPException
+import hashlib
+import time
+from datetime import date
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
 from app.core.config import get_settings
 from app.core.database import get_db
-from app.models.user import User
+from app.core.profiling import timed
+from app.core.security import token_cache, user_cache
+from app.crud import aio
+from app.schemas.user import UserOut
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db=Depends(get_db),
 ):
-    settings = get_settings()
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-    except JWTError:
-        raise HTTPException(status_code=401, detail="invalid_token")
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="invalid_token")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="user_not_found")
+    with timed("auth"):
+        return await _authenticate(credentials.credentials, db)
+
+
+async def get_stream_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+    access_token: str | None = None,
+    db=Depends(get_db),
+):
+    # EventSource cannot set headers, so streams also take ?access_token=.
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(status_code=401, detail="not_authenticated")
+    with timed("auth"):
+        return await _authenticate(token, db)
+
+
+async def _authenticate(token: str, db):
+    user_id = token_cache.get(token)
+    if user_id is None:
+        settings = get_settings()
+        try:
+            payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="invalid_token")
+        user_id = payload.get("sub")
+        if not user_id:
+            raise HTTPException(status_code=401, detail="invalid_token")
+        expires_in = payload["exp"] - time.time() if "exp" in payload else None
+        token_cache.set(token, user_id, expires_in)
+    # lets the session route this user's reads (see core.routing)
+    db.info["user_id"] = user_id
+    # A hit touches no database. crud.user evicts the entry on every user
+    # write in this process; other processes (workers, the bootstrap CLI)
+    # serve the old snapshot for at most auth_user_cache_ttl seconds.
+    user = user_cache.get(user_id)
+    if user is None:
+        record = await aio.get_user(db, user_id)
+        if not record:
+            raise HTTPException(status_code=401, detail="user_not_found")
+        user = UserOut.model_validate(record)
+        user_cache.set(user_id, user)
     return user
 
 
-def require_superadmin(user=Depends(get_current_user)):
+async def require_superadmin(user=Depends(get_current_user)):
     if getattr(user, "role", None) != "superadmin":
         raise HTTPException(status_code=403, detail="permission_denied")
     return user
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: ignore a W/ prefix on either side.
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+async def conditional_get(request: Request, db=Depends(get_db), user=Depends(get_current_user)) -> dict:
+    # The ETag covers the user's data version, the exact query and the current
+    # date (due/stats windows move at midnight without a write).
+    version = await aio.get_data_version(db, user.id)
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{user.id}|{date.today()}|{request.url.path}?{query}".encode("utf-8")).hexdigest()[:16]
+    etag = f'"{version}-{digest}"'
+    # for handlers that cache by data version (crud.category.cached_categories)
+    request.state.data_version = version
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    return headers
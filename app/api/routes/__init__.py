@@ -1,3 +1,3 @@
-from app.api.routes import auth, users, categories, todos, trash, stats
+from app.api.routes import auth, users, categories, todos, trash, stats, system, tags
 
-__all__ = ["auth", "users", "categories", "todos", "trash", "stats"]
+__all__ = ["auth", "users", "categories", "todos", "trash", "stats", "system", "tags"]
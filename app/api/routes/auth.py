@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.response import ok, error
-from app.core.security import verify_password, create_access_token
-from app.crud.user import get_user_by_username, create_user
+from app.core.security import PasswordQueueFull, create_access_token, verify_password_async
+from app.crud import aio
 from app.schemas.auth import LoginIn, RegisterIn
 from app.core.config import get_settings
 
@@ -11,15 +10,23 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register")
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
+async def register(payload: RegisterIn, db=Depends(get_db)):
     return error(40301, "registration_disabled", status_code=403)
 
 
 @router.post("/login")
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    user = get_user_by_username(db, payload.username)
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginIn, db=Depends(get_db)):
+    user = await aio.get_user_by_username(db, payload.username)
+    if not user:
         return error(40101, "invalid_credentials", status_code=401)
+    try:
+        valid, new_hash = await verify_password_async(payload.password, user.password_hash)
+    except PasswordQueueFull as exc:
+        return error(50301, str(exc), status_code=503)
+    if not valid:
+        return error(40101, "invalid_credentials", status_code=401)
+    if new_hash:
+        user = await aio.update_user(db, user, {"password_hash": new_hash})
     token = create_access_token(user.id)
     settings = get_settings()
     return ok(
@@ -0,0 +1,43 @@
+import asyncio
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.api.deps import get_stream_user
+from app.core.config import get_settings
+from app.core.events import OVERFLOW, SHUTDOWN, hub, sse_message
+from app.core.response import error
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+HEARTBEAT = b": ping\n\n"
+
+
+async def _event_stream(request: Request, user_id: str, heartbeat: float):
+    # uvicorn drops writes to a closed connection without raising, so check
+    # for the disconnect at least once per heartbeat.
+    subscription = hub.subscribe(user_id)
+    try:
+        yield b"retry: 3000\n" + sse_message("ready", {})
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                message = HEARTBEAT
+            if await request.is_disconnected():
+                break
+            yield message
+            if message is OVERFLOW or message is SHUTDOWN:
+                break
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("")
+async def stream(request: Request, user=Depends(get_stream_user)):
+    settings = get_settings()
+    if not settings.events_enabled:
+        return error(40401, "events_disabled", status_code=404)
+    return StreamingResponse(
+        _event_stream(request, user.id, settings.events_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
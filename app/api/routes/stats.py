@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.api.deps import get_current_user
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from app.api.deps import conditional_get, get_current_user
 from app.core.database import get_db
-from app.core.response import ok
-from app.crud.todo import stats_summary
+from app.core.response import ok, error
+from app.crud import aio
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
+MAX_DAILY_RANGE = 366
+
 
 @router.get("/summary")
-def summary(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    data = stats_summary(db, user.id)
-    return ok(data)
+async def summary(db=Depends(get_db), user=Depends(get_current_user), cache_headers=Depends(conditional_get)):
+    data = await aio.stats_summary(db, user.id)
+    return ok(data, headers=cache_headers)
+
+
+@router.get("/daily")
+async def daily(
+    db=Depends(get_db),
+    user=Depends(get_current_user),
+    cache_headers=Depends(conditional_get),
+    start: date = Query(alias="from"),
+    end: date = Query(alias="to"),
+):
+    if end < start or (end - start).days >= MAX_DAILY_RANGE:
+        return error(40001, "invalid_range")
+    items = await aio.daily_stats(db, user.id, start, end)
+    return ok(items, headers=cache_headers)
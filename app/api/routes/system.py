@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import require_superadmin
+from app.core.database import pool_stats
+from app.core.events import hub
+from app.core.reminders import scheduler_stats
+from app.core.response import ok
+from app.core.security import password_pool_stats, token_cache, user_cache
+from app.core.trash_purge import purger_stats
+from app.crud.category import category_cache
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/auth-cache")
+async def auth_cache(_=Depends(require_superadmin)):
+    return ok({"token": token_cache.stats(), "user": user_cache.stats()})
+
+
+@router.get("/category-cache")
+async def category_cache_stats(_=Depends(require_superadmin)):
+    return ok(category_cache.stats())
+
+
+@router.get("/password-pool")
+async def password_pool(_=Depends(require_superadmin)):
+    return ok(password_pool_stats())
+
+
+@router.get("/db-pool")
+async def db_pool(_=Depends(require_superadmin)):
+    return ok(pool_stats())
+
+
+@router.get("/reminders")
+async def reminders(_=Depends(require_superadmin)):
+    return ok(scheduler_stats())
+
+
+@router.get("/trash-purge")
+async def trash_purge(_=Depends(require_superadmin)):
+    return ok(purger_stats())
+
+
+@router.get("/events")
+async def events(_=Depends(require_superadmin)):
+    return ok(hub.stats())
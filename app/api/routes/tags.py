@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import conditional_get, get_current_user
+from app.core.database import get_db
+from app.core.response import ok
+from app.crud import aio
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+
+@router.get("")
+async def get_tags(db=Depends(get_db), user=Depends(get_current_user), cache_headers=Depends(conditional_get)):
+    rows = await aio.tag_counts(db, user.id)
+    return ok([{"tag": tag, "count": count} for tag, count in rows], headers=cache_headers)
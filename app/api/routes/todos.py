@@ -1,55 +1,85 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app.api.deps import get_current_user
-from app.core.database import get_db
+import json
+import time
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from app.api.deps import conditional_get, get_current_user
+from app.core.config import get_settings
+from app.core.database import get_db, stream_partitions
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.profiling import timed
 from app.core.response import ok, paginated, error
-from app.crud.todo import (
-    list_todos,
-    create_todo,
-    update_todo,
-    soft_delete_todo,
-    batch_status,
-    clear_done,
+from app.core.streaming import csv_chunks, gzip_chunks, iter_csv_rows, iter_lines, ndjson_chunks
+from app.crud import aio
+from app.crud.todo import export_statement
+from app.schemas.todo import (
+    TODO_FIELDS, TodoBatchCreate, TodoBatchStatus, TodoCreate, TodoUpdate, normalize_tags, parse_fields, serialize_todo
 )
-from app.models.todo import Todo
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoBatchStatus
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
+MAX_BATCH_ITEMS = 1000
+IMPORT_CHUNK_SIZE = 500
+MAX_IMPORT_ERRORS = 100
+EXPORT_BATCH_SIZE = 1000
+MAX_SYNC_ITEMS = 1000
 
-def serialize(todo: Todo):
-    return {
-        "id": todo.id,
-        "title": todo.title,
-        "description": todo.description,
-        "priority": todo.priority,
-        "status": todo.status,
-        "due_date": todo.due_date,
-        "remind_at": todo.remind_at,
-        "category_id": todo.category_id,
-        "tags": todo.tags,
-        "is_deleted": todo.is_deleted,
-        "deleted_at": todo.deleted_at,
-        "completed_at": todo.completed_at,
-        "created_at": todo.created_at,
-        "updated_at": todo.updated_at,
-    }
+
+def _item_errors(exc: ValidationError):
+    return exc.errors(include_url=False, include_context=False, include_input=False)
+
+
+def _tag_filter(tag: list[str] | None) -> list[str] | None:
+    # ?tag=a&tag=b, same normalization as stored tags
+    return normalize_tags([value.strip() for value in tag]) if tag else None
+
+
+def _csv_record(header: list[str], row: list[str]) -> dict:
+    if len(row) != len(header):
+        raise ValueError("column_count_mismatch")
+    data = {key: value for key, value in zip(header, row) if value != ""}
+    if "tags" in data:
+        data["tags"] = [tag.strip() for tag in data["tags"].split(";") if tag.strip()]
+    return data
+
+
+async def _import_records(fmt: str, stream):
+    # Yields (line number, raw record); parsing happens per row so one bad
+    # row is reported without aborting the import.
+    lines = iter_lines(stream)
+    if fmt == "jsonl":
+        async for line_no, line in lines:
+            if line.strip():
+                yield line_no, line
+        return
+    header = None
+    async for line_no, row in iter_csv_rows(lines):
+        if header is None:
+            header = [name.strip() for name in row]
+            continue
+        yield line_no, (header, row)
 
 
 @router.get("")
-def get_todos(
-    db: Session = Depends(get_db),
+async def get_todos(
+    db=Depends(get_db),
     user=Depends(get_current_user),
+    cache_headers=Depends(conditional_get),
     status: str | None = None,
     category_id: str | None = None,
     priority: str | None = None,
     keyword: str | None = None,
     due: str | None = None,
+    tag: list[str] | None = Query(None),
+    tag_match: str = "any",
     sort_by: str | None = None,
     sort_order: str | None = None,
     include_deleted: bool = False,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    fields: str | None = None,
 ):
     filters = {
         "status": status,
@@ -57,45 +87,203 @@ def get_todos(
         "priority": priority,
         "keyword": keyword,
         "due": due,
+        "tags": _tag_filter(tag),
+        "tag_match": tag_match,
         "sort_by": sort_by,
         "sort_order": sort_order,
         "include_deleted": include_deleted,
     }
-    items, total = list_todos(db, user.id, filters, page, page_size)
-    return paginated([serialize(item) for item in items], page, page_size, total)
+    try:
+        selected = parse_fields(fields)
+        items, total, next_cursor = await aio.list_todos(
+            db, user.id, filters, page, page_size, cursor, with_total, selected
+        )
+    except ValueError as exc:
+        return error(40001, str(exc))
+    with timed("serialize"):
+        items = [serialize_todo(item, selected) for item in items]
+    return paginated(items, page, page_size, total, next_cursor, headers=cache_headers)
+
+
+@router.get("/export")
+async def export_todos(
+    user=Depends(get_current_user),
+    status: str | None = None,
+    category_id: str | None = None,
+    priority: str | None = None,
+    keyword: str | None = None,
+    due: str | None = None,
+    tag: list[str] | None = Query(None),
+    tag_match: str = "any",
+    include_deleted: bool = False,
+    fields: str | None = None,
+    fmt: str = Query("ndjson", alias="format"),
+    gzip: bool = False,
+):
+    if fmt not in ("ndjson", "csv"):
+        return error(40001, "invalid_format")
+    filters = {
+        "status": status,
+        "category_id": category_id,
+        "priority": priority,
+        "keyword": keyword,
+        "due": due,
+        "tags": _tag_filter(tag),
+        "tag_match": tag_match,
+        "include_deleted": include_deleted,
+    }
+    try:
+        selected = parse_fields(fields)
+        stmt = export_statement(user.id, filters, selected)
+    except ValueError as exc:
+        return error(40001, str(exc))
+    partitions = stream_partitions(stmt, EXPORT_BATCH_SIZE, user.id)
+    if fmt == "csv":
+        body = csv_chunks(partitions, list(stmt.selected_columns.keys()))
+        media_type = "text/csv; charset=utf-8"
+    else:
+        body = ndjson_chunks(partitions)
+        media_type = "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="todos.{fmt}"'}
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+@router.get("/changes")
+async def get_changes(
+    db=Depends(get_db),
+    user=Depends(get_current_user),
+    since: str | None = None,
+    limit: int = Query(500, ge=1, le=MAX_SYNC_ITEMS),
+):
+    # `since` is the cursor from the previous response; without it the first
+    # pages are a full snapshot. Tombstones are kept sync_tombstone_days, so an
+    # older cursor can no longer see every delete: the client starts over.
+    now = int(time.time())
+    position, issued = None, now
+    if since:
+        try:
+            data = decode_cursor(since)
+            position, issued = (int(data["s"]), int(data["r"]), str(data["id"])), int(data["t"])
+        except (ValueError, KeyError, TypeError):
+            return error(40001, "invalid_cursor")
+        days = get_settings().sync_tombstone_days
+        if days > 0 and now - issued > days * 86400:
+            return error(41001, "cursor_expired", status_code=410)
+    changes, has_more = await aio.changes_since(db, user.id, position, limit, since is not None)
+    todos, categories, deleted = [], [], []
+    with timed("serialize"):
+        for seq, source, item_id, row in changes:
+            if source == 1:
+                todos.append(serialize_todo(row, TODO_FIELDS))
+            elif source == 0:
+                categories.append({"id": row.id, "name": row.name, "color": row.color, "order": row.order, "is_system": row.is_system})
+            else:
+                deleted.append({"entity": row.entity, "id": row.entity_id})
+    if changes:
+        seq, source, item_id, _ = changes[-1]
+        position = (seq, source, item_id)
+    elif position is None:
+        position = (-1, 0, "")
+    # a cursor is only as old as the oldest delete it may still miss
+    cursor = encode_cursor({"s": position[0], "r": position[1], "id": position[2], "t": issued if has_more else now})
+    return ok({"todos": todos, "categories": categories, "deleted": deleted, "cursor": cursor, "has_more": has_more})
 
 
 @router.post("")
-def create(payload: TodoCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    todo = create_todo(db, user.id, payload.model_dump())
-    return ok(serialize(todo))
+async def create(payload: TodoCreate, db=Depends(get_db), user=Depends(get_current_user)):
+    todo = await aio.create_todo(db, user.id, payload.model_dump())
+    return ok(serialize_todo(todo))
+
+
+@router.post("/batch")
+async def create_batch(payload: TodoBatchCreate, db=Depends(get_db), user=Depends(get_current_user)):
+    if len(payload.items) > MAX_BATCH_ITEMS:
+        return error(40001, "too_many_items")
+    items = []
+    errors = []
+    for index, item in enumerate(payload.items):
+        try:
+            items.append(TodoCreate.model_validate(item).model_dump())
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": _item_errors(exc)})
+    if errors:
+        return error(40001, "validation_error", {"errors": errors}, status_code=422)
+    ids = await aio.create_todos(db, user.id, items)
+    return ok({"created": len(ids), "ids": ids})
+
+
+@router.post("/import")
+async def import_todos(
+    request: Request,
+    db=Depends(get_db),
+    user=Depends(get_current_user),
+    fmt: str | None = Query(None, alias="format"),
+):
+    fmt = fmt or ("csv" if "csv" in request.headers.get("content-type", "") else "jsonl")
+    if fmt not in ("jsonl", "csv"):
+        return error(40001, "invalid_format")
+    summary = {"rows": 0, "created": 0, "failed": 0, "chunks": 0, "errors": []}
+    chunk = []
+
+    async def flush():
+        ids = await aio.create_todos(db, user.id, chunk)
+        summary["created"] += len(ids)
+        summary["chunks"] += 1
+        chunk.clear()
+
+    try:
+        async for line_no, raw in _import_records(fmt, request.stream()):
+            summary["rows"] += 1
+            try:
+                data = json.loads(raw) if fmt == "jsonl" else _csv_record(*raw)
+                chunk.append(TodoCreate.model_validate(data).model_dump())
+            except ValidationError as exc:
+                errors = _item_errors(exc)
+            except ValueError as exc:
+                errors = [{"msg": "invalid_json" if fmt == "jsonl" else str(exc)}]
+            else:
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    await flush()
+                continue
+            summary["failed"] += 1
+            if len(summary["errors"]) < MAX_IMPORT_ERRORS:
+                summary["errors"].append({"line": line_no, "errors": errors})
+    except ValueError as exc:
+        # Earlier chunks are already committed; the summary says how far we got.
+        return error(40001, str(exc), summary)
+    if chunk:
+        await flush()
+    return ok(summary)
+
+
+@router.delete("/clear-done")
+async def clear_done_items(db=Depends(get_db), user=Depends(get_current_user)):
+    affected = await aio.clear_done(db, user.id)
+    return ok({"affected": affected})
 
 
 @router.put("/{todo_id}")
-def update(todo_id: str, payload: TodoUpdate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    todo = db.query(Todo).filter(Todo.id == todo_id, Todo.user_id == user.id).first()
+async def update(todo_id: str, payload: TodoUpdate, db=Depends(get_db), user=Depends(get_current_user)):
+    todo = await aio.get_todo(db, user.id, todo_id)
     if not todo:
         return error(40401, "todo_not_found", status_code=404)
-    todo = update_todo(db, todo, payload.model_dump(exclude_unset=True))
-    return ok(serialize(todo))
+    todo = await aio.update_todo(db, todo, payload.model_dump(exclude_unset=True))
+    return ok(serialize_todo(todo))
 
 
 @router.delete("/{todo_id}")
-def remove(todo_id: str, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    todo = db.query(Todo).filter(Todo.id == todo_id, Todo.user_id == user.id).first()
+async def remove(todo_id: str, db=Depends(get_db), user=Depends(get_current_user)):
+    todo = await aio.get_todo(db, user.id, todo_id)
     if not todo:
         return error(40401, "todo_not_found", status_code=404)
-    soft_delete_todo(db, todo)
+    await aio.soft_delete_todo(db, todo)
     return ok({})
 
 
 @router.patch("/batch/status")
-def update_batch(payload: TodoBatchStatus, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    batch_status(db, user.id, payload.ids, payload.status)
-    return ok({})
-
-
-@router.delete("/clear-done")
-def clear_done_items(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    clear_done(db, user.id)
-    return ok({})
+async def update_batch(payload: TodoBatchStatus, db=Depends(get_db), user=Depends(get_current_user)):
+    affected = await aio.batch_status(db, user.id, payload.ids, payload.status)
+    return ok({"affected": affected})
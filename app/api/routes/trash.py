@@ -1,63 +1,54 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app.api.deps import get_current_user
+from app.api.deps import conditional_get, get_current_user
 from app.core.database import get_db
+from app.core.profiling import timed
 from app.core.response import ok, paginated, error
-from app.crud.todo import list_trash, restore_todo, purge_todo, clear_trash
-from app.models.todo import Todo
+from app.crud import aio
+from app.schemas.todo import parse_fields, serialize_todo
 
 router = APIRouter(prefix="/trash", tags=["trash"])
 
 
-def serialize(todo: Todo):
-    return {
-        "id": todo.id,
-        "title": todo.title,
-        "description": todo.description,
-        "priority": todo.priority,
-        "status": todo.status,
-        "due_date": todo.due_date,
-        "remind_at": todo.remind_at,
-        "category_id": todo.category_id,
-        "tags": todo.tags,
-        "is_deleted": todo.is_deleted,
-        "deleted_at": todo.deleted_at,
-        "completed_at": todo.completed_at,
-        "created_at": todo.created_at,
-        "updated_at": todo.updated_at,
-    }
-
-
 @router.get("")
-def get_trash(
-    db: Session = Depends(get_db),
+async def get_trash(
+    db=Depends(get_db),
     user=Depends(get_current_user),
+    cache_headers=Depends(conditional_get),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    fields: str | None = None,
 ):
-    items, total = list_trash(db, user.id, page, page_size)
-    return paginated([serialize(item) for item in items], page, page_size, total)
+    try:
+        selected = parse_fields(fields)
+        items, total, next_cursor = await aio.list_trash(db, user.id, page, page_size, cursor, with_total, selected)
+    except ValueError as exc:
+        return error(40001, str(exc))
+    with timed("serialize"):
+        items = [serialize_todo(item, selected) for item in items]
+    return paginated(items, page, page_size, total, next_cursor, headers=cache_headers)
 
 
 @router.post("/{todo_id}/restore")
-def restore(todo_id: str, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    todo = db.query(Todo).filter(Todo.id == todo_id, Todo.user_id == user.id, Todo.is_deleted.is_(True)).first()
+async def restore(todo_id: str, db=Depends(get_db), user=Depends(get_current_user)):
+    todo = await aio.get_todo(db, user.id, todo_id, deleted=True)
     if not todo:
         return error(40401, "todo_not_found", status_code=404)
-    restore_todo(db, todo)
+    await aio.restore_todo(db, todo)
     return ok({})
 
 
 @router.delete("/{todo_id}/purge")
-def purge(todo_id: str, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    todo = db.query(Todo).filter(Todo.id == todo_id, Todo.user_id == user.id, Todo.is_deleted.is_(True)).first()
+async def purge(todo_id: str, db=Depends(get_db), user=Depends(get_current_user)):
+    todo = await aio.get_todo(db, user.id, todo_id, deleted=True)
     if not todo:
         return error(40401, "todo_not_found", status_code=404)
-    purge_todo(db, todo)
+    await aio.purge_todo(db, todo)
     return ok({})
 
 
 @router.delete("/clear")
-def clear(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    clear_trash(db, user.id)
-    return ok({})
+async def clear(db=Depends(get_db), user=Depends(get_current_user)):
+    affected = await aio.clear_trash(db, user.id)
+    return ok({"affected": affected})
@@ -1,16 +1,16 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 from app.api.deps import get_current_user, require_superadmin
 from app.core.database import get_db
 from app.core.response import ok, error
-from app.crud.user import create_user, get_user_by_username
+from app.core.security import PasswordQueueFull, hash_password_async
+from app.crud import aio
 from app.schemas.user import UserCreate
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me")
-def me(user=Depends(get_current_user)):
+async def me(user=Depends(get_current_user)):
     return ok(
         {
             "id": user.id,
@@ -23,10 +23,16 @@ def me(user=Depends(get_current_user)):
 
 
 @router.post("")
-def create(payload: UserCreate, db: Session = Depends(get_db), _=Depends(require_superadmin)):
-    if get_user_by_username(db, payload.username):
+async def create(payload: UserCreate, db=Depends(get_db), _=Depends(require_superadmin)):
+    if await aio.get_user_by_username(db, payload.username):
         return error(40901, "username_exists", status_code=409)
-    user = create_user(db, payload.username, payload.password, payload.email, payload.role)
+    try:
+        password_hash = await hash_password_async(payload.password)
+    except PasswordQueueFull as exc:
+        return error(50301, str(exc), status_code=503)
+    except ValueError as exc:
+        return error(40001, str(exc))
+    user = await aio.create_user(db, payload.username, password_hash, payload.email, payload.role)
     return ok(
         {
             "id": user.id,
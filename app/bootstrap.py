@@ -0,0 +1,58 @@
+from app.core.config import get_settings
+from app.core.database import SessionLocal, engine
+from app.core.security import hash_password, pwd_context, verify_password
+from app.crud.user import create_user, get_user_by_username, update_user
+from app.migrations import lock, upgrade
+from app.models.user import User
+
+
+def bootstrap() -> list[str]:
+    # Schema upgrade plus superadmin, once per deploy (python -m app.migrations
+    # bootstrap), or at API startup when bootstrap_on_startup is set; the lock
+    # keeps concurrent workers from racing on the same DDL.
+    with lock(engine):
+        applied = upgrade(engine)
+        ensure_superadmin()
+    return applied
+
+
+def _admin_changes(user: User) -> dict:
+    settings = get_settings()
+    data = {}
+    if user.username != settings.admin_username:
+        data["username"] = settings.admin_username
+    if user.email != settings.admin_email:
+        data["email"] = settings.admin_email
+    # only rehash when the configured password or the bcrypt cost changed
+    if pwd_context.needs_update(user.password_hash) or not verify_password(settings.admin_password, user.password_hash):
+        data["password_hash"] = hash_password(settings.admin_password)
+    return data
+
+
+def ensure_superadmin():
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == "superadmin").first()
+        if user:
+            if settings.admin_force_reset:
+                data = _admin_changes(user)
+                if data:
+                    update_user(db, user, data)
+            return
+        existing = get_user_by_username(db, settings.admin_username)
+        if existing:
+            data = {"role": "superadmin"}
+            if settings.admin_force_reset:
+                data.update(_admin_changes(existing))
+            update_user(db, existing, data)
+            return
+        create_user(
+            db,
+            settings.admin_username,
+            hash_password(settings.admin_password),
+            settings.admin_email,
+            role="superadmin",
+        )
+    finally:
+        db.close()
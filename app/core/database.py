@@ -1,24 +1,230 @@
-from sqlalchemy import create_engine
+import asyncio
+import os
+import time
+import weakref
+from contextlib import contextmanager
+from fastapi import Request
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from app.core.config import get_settings
+from starlette.concurrency import run_in_threadpool
+from app.core.config import _build_async_database_url, get_settings
+from app.core.pool import MeteredAsyncQueuePool, MeteredQueuePool, instrument_pool
+from app.core.routing import RoutingSession
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_engine():
+def _pool_options(url: str, poolclass) -> dict:
+    settings = get_settings()
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # in-memory SQLite needs its single-connection pool
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping == "always",
+    }
+
+
+def _instrument(pool):
     settings = get_settings()
-    return create_engine(settings.database_url, pool_pre_ping=True)
+    if isinstance(pool, (MeteredQueuePool, MeteredAsyncQueuePool)):
+        instrument_pool(pool, settings.db_pool_pre_ping, settings.db_pool_ping_idle)
+
+
+def get_engine(url: str | None = None):
+    url = url or get_settings().database_url
+    sync_engine = create_engine(url, **_pool_options(url, MeteredQueuePool))
+    _instrument(sync_engine.pool)
+    return sync_engine
+
 
+def get_async_engine(url: str | None = None):
+    url = url or get_settings().async_database_url
+    aio_engine = create_async_engine(url, **_pool_options(url, MeteredAsyncQueuePool))
+    _instrument(aio_engine.sync_engine.pool)
+    return aio_engine
 
+
+def pool_stats() -> dict:
+    engines = [("sync", engine)]
+    engines += [(f"sync_replica_{i}", replica) for i, replica in enumerate(replica_engines)]
+    if async_engine is not None:
+        engines.append(("async", async_engine.sync_engine))
+        engines += [(f"async_replica_{i}", replica.sync_engine) for i, replica in enumerate(async_replica_engines)]
+    data = {}
+    for name, current in engines:
+        metrics = getattr(current.pool, "metrics", None)
+        data[name] = metrics.stats(current.pool) if metrics else {"pool": current.pool.status()}
+    return data
+
+
+# The sync engine is always built: migrations and admin bootstrap use it.
 engine = get_engine()
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+replica_engines = [get_engine(url) for url in get_settings().replica_urls]
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    info={"replicas": replica_engines},
+)
 
+async_engine = get_async_engine() if get_settings().database_async else None
+async_replica_engines = (
+    [get_async_engine(_build_async_database_url(url)) for url in get_settings().replica_urls]
+    if async_engine is not None
+    else []
+)
+AsyncSessionLocal = (
+    async_sessionmaker(
+        async_engine,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+        info={"replicas": [replica.sync_engine for replica in async_replica_engines]},
+    )
+    if async_engine is not None
+    else None
+)
 
-def get_db():
+_session_slots = weakref.WeakKeyDictionary()
+
+
+def _pool_capacity() -> int:
+    settings = get_settings()
+    return settings.db_pool_size + max(settings.db_max_overflow, 0)
+
+
+def _slots() -> asyncio.Semaphore:
+    # A request session keeps its connection between run_db calls while it
+    # waits for a threadpool thread. Capping such sessions at the pool size
+    # means a worker thread never blocks on checkout, so the threadpool and
+    # the pool cannot deadlock each other.
+    loop = asyncio.get_running_loop()
+    slots = _session_slots.get(loop)
+    if slots is None:
+        slots = _session_slots[loop] = asyncio.Semaphore(_pool_capacity())
+    return slots
+
+
+async def get_db(request: Request):
+    # GET handlers are read-only: their sessions may be served by a replica.
+    read_only = request.method == "GET"
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            db.info["read_only"] = read_only
+            yield db
+        return
     db = SessionLocal()
+    db.info["read_only"] = read_only
+    db.info["slots"] = _slots()
     try:
         yield db
     finally:
-        db.close()
+        # Not via the threadpool, which may be saturated with requests
+        # waiting for the slot this session holds.
+        await asyncio.get_running_loop().run_in_executor(None, db.close)
+        if db.info.pop("slot_acquired", False):
+            db.info["slots"].release()
+
+
+async def run_db(db, fn, *args, **kwargs):
+    # Run sync ORM code without holding the event loop: on an AsyncSession it
+    # runs via run_sync on the async driver, otherwise in the threadpool.
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    if "slots" in db.info and not db.info.get("slot_acquired"):
+        await db.info["slots"].acquire()
+        db.info["slot_acquired"] = True
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def stream_partitions(statement, batch_size: int, user_id: str | None = None):
+    # Yield lists of rows from a server-side cursor on a session of its own:
+    # request sessions are closed before a streaming response body is sent.
+    # With a user_id the read may go to a replica, as for GET requests.
+    statement = statement.execution_options(yield_per=batch_size)
+    info = {"read_only": True, "user_id": user_id} if user_id else {}
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal(info=info) as db:
+            result = await db.stream(statement)
+            async for rows in result.partitions():
+                yield rows
+        return
+    async with _slots():
+        db = SessionLocal(info=info)
+        try:
+            result = await run_in_threadpool(db.execute, statement)
+            partitions = result.partitions()
+            while rows := await run_in_threadpool(next, partitions, None):
+                yield rows
+        finally:
+            await asyncio.get_running_loop().run_in_executor(None, db.close)
+
+
+def upsert_add(db, model, rows: list[dict], columns: tuple[str, ...], replace: tuple[str, ...] = ()):
+    # INSERT the rows; on a primary-key conflict add `columns` onto the stored
+    # values and overwrite `replace` with the new ones.
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql_insert(model).values(rows)
+        values = {col: getattr(model, col) + getattr(stmt.inserted, col) for col in columns}
+        values.update({col: getattr(stmt.inserted, col) for col in replace})
+        stmt = stmt.on_duplicate_key_update(values)
+    else:
+        stmt = sqlite_insert(model).values(rows)
+        values = {col: getattr(model, col) + getattr(stmt.excluded, col) for col in columns}
+        values.update({col: getattr(stmt.excluded, col) for col in replace})
+        stmt = stmt.on_conflict_do_update(index_elements=list(model.__table__.primary_key.columns), set_=values)
+    db.execute(stmt)
+
+
+@contextmanager
+def named_lock(engine, name: str, timeout: float = 0):
+    # Cross-process mutex; yields whether it was acquired within `timeout`
+    # seconds (0: don't wait). A named lock on MySQL (held by this connection
+    # while the work uses others), a file lock next to the database on SQLite,
+    # always acquired elsewhere.
+    if engine.dialect.name == "mysql":
+        with engine.connect() as conn:
+            acquired = conn.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": timeout}).scalar() == 1
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+        return
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or fcntl is None or database in (None, "", ":memory:"):
+        yield True
+        return
+    with open(f"{os.path.abspath(database)}.{name}.lock", "w") as handle:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+            except BlockingIOError:
+                acquired = False
+            if acquired or time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(handle, fcntl.LOCK_UN)
@@ -0,0 +1,130 @@
+import asyncio
+import signal
+import threading
+import orjson
+from app.core.config import get_settings
+from app.core.metrics import change_events_total, change_subscribers
+
+# Queued in place of events once a subscriber has fallen too far behind.
+OVERFLOW = b"event: overflow\ndata: {}\n\n"
+# Queued for every subscriber when the server is going down.
+SHUTDOWN = b"event: shutdown\ndata: {}\n\n"
+
+
+def sse_message(event: str, data) -> bytes:
+    return b"event: " + event.encode("ascii") + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+class Subscription:
+    def __init__(self, user_id: str, maxsize: int):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = False
+
+
+class ChangeHub:
+    # In-process fan-out of per-user change events to open streams. publish()
+    # may be called from any thread (crud functions run in the threadpool);
+    # delivery happens on the event loop. Each subscriber has a bounded queue
+    # and is dropped, with an overflow message, instead of buffering without
+    # limit when it stops reading.
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._loop = None
+        self.counts = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def subscribe(self, user_id: str) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        change_subscribers.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+        change_subscribers.dec()
+
+    def publish(self, user_id: str, event: dict):
+        # Cheap no-op when this process has no stream open for the user.
+        loop = self._loop
+        if loop is None or user_id not in self._subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._deliver, user_id, event)
+
+    def _deliver(self, user_id: str, event: dict):
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+        self.counts["published"] += 1
+        change_events_total.inc(event["entity"])
+        # encoded once, shared by every stream of the user
+        message = sse_message("change", event)
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+                self.counts["delivered"] += 1
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription, message: bytes = OVERFLOW):
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(message)
+        if message is OVERFLOW:
+            self.counts["dropped"] += 1
+
+    def close(self):
+        # Ends every open stream; safe to call from a signal handler.
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._close_all)
+
+    def _close_all(self):
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self._drop(subscription, SHUTDOWN)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            **self.counts,
+        }
+
+
+hub = ChangeHub(get_settings().events_queue_size)
+
+
+def publish_change(user_id: str, entity: str, op: str, ids: list[str] | None = None, **extra):
+    # Call after the commit, so a client that refetches on the event sees it.
+    event = {"entity": entity, "op": op}
+    if ids is not None:
+        event["ids"] = ids
+    event.update(extra)
+    hub.publish(user_id, event)
+
+
+def close_streams_on_exit():
+    # uvicorn waits for open responses to finish before it runs the shutdown
+    # handlers, so streams are ended as soon as the exit signal arrives; the
+    # previous (uvicorn's) handler still runs.
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(signum)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            hub.close()
+            previous(signum, frame)
+
+        signal.signal(signum, handler)
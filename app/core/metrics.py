@@ -0,0 +1,208 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+SQL_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LAG_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+PURGE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class _Metric:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{key}="{_escape(value)}"' for key, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{self._label_text(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        self._values = {}
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{self._label_text(labels)} {_number(total)}"
+            yield f"{self.name}_count{self._label_text(labels)} {cumulative}"
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+requests_total = register(
+    Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+)
+request_duration = register(
+    Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+)
+requests_in_progress = register(Gauge("http_requests_in_progress", "HTTP requests being served.", ("method",)))
+request_sql_statements = register(
+    Histogram("http_request_sql_statements", "SQL statements per request.", ("method", "route"), SQL_COUNT_BUCKETS)
+)
+request_sql_duration = register(
+    Histogram("http_request_sql_duration_seconds", "SQL time per request.", ("method", "route"), SQL_TIME_BUCKETS)
+)
+sql_statements_total = register(Counter("db_statements_total", "SQL statements executed, requests or not."))
+sql_duration_total = register(Counter("db_statement_duration_seconds_total", "Time spent in SQL statements."))
+reminders_total = register(Counter("reminders_total", "Reminders handled by outcome.", ("outcome",)))
+reminder_lag = register(Histogram("reminder_lag_seconds", "Delivery time minus remind_at.", (), LAG_BUCKETS))
+reminders_queued = register(Gauge("reminders_queued", "Reminders loaded into this worker's schedule."))
+trash_purged_total = register(Counter("trash_purged_total", "Expired trash rows deleted by the purger."))
+trash_purge_duration = register(
+    Histogram("trash_purge_duration_seconds", "Trash purge run time, pauses included.", (), PURGE_BUCKETS)
+)
+change_events_total = register(Counter("change_events_total", "Change events published to open streams.", ("entity",)))
+change_subscribers = register(Gauge("change_subscribers", "Open change streams in this worker."))
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+class _SqlUsage:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# SQL usage of the request being served. The threadpool and run_sync both run
+# in a copy of the request's context, so they update the same object.
+_sql_usage = ContextVar("sql_usage", default=None)
+
+
+# The start time lives on the statement's execution context rather than the
+# connection: a statement that raises never reaches after_cursor_execute, and
+# its context is dropped with it.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    sql_statements_total.inc()
+    sql_duration_total.inc(amount=elapsed)
+    usage = _sql_usage.get()
+    if usage is not None:
+        usage.statements += 1
+        usage.seconds += elapsed
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: no per-request task or body wrapping.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        usage = _SqlUsage()
+        token = _sql_usage.set(usage)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_progress.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_progress.dec(method)
+            _sql_usage.reset(token)
+            # route templates, not raw paths, keep the label set bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            requests_total.inc(method, path, status)
+            request_duration.observe(elapsed, method, path)
+            request_sql_statements.observe(usage.statements, method, path)
+            request_sql_duration.observe(usage.seconds, method, path)
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Recent checkout waits kept for the percentiles in /system/db-pool.
+WAIT_SAMPLES = 1024
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+        self.connects = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        wait_ms = seconds * 1000
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self._waits.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self, pool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "wait_ms_p50": _percentile(waits, 50),
+                "wait_ms_p95": _percentile(waits, 95),
+                "wait_ms_max": round(self.max_wait_ms, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                {
+                    "pool_size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "checked_out": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    # negative while the pool has not opened pool_size connections yet
+                    "overflow": max(pool.overflow(), 0),
+                }
+            )
+        return data
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 3)
+
+
+class _MeteredPoolMixin:
+    # Pool events fire once a connection is handed out, so the time spent
+    # waiting for one is measured around the queue get itself.
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(pool, pre_ping: str, idle_seconds: int) -> PoolMetrics:
+    metrics = pool.metrics = PoolMetrics()
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_conn, record):
+        metrics.count("connects")
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_conn, record, exception):
+        metrics.count("invalidations")
+
+    if pre_ping == "idle":
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_conn, record):
+            record.info["checked_in_at"] = time.monotonic()
+
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_conn, record, proxy):
+            # Only connections that sat idle long enough to have been dropped
+            # by the server pay for a round trip; raising DisconnectionError
+            # makes the pool discard this one and check out another.
+            checked_in_at = record.info.get("checked_in_at")
+            if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+                return
+            metrics.count("pings")
+            cursor = dbapi_conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            except Exception:
+                metrics.count("ping_failures")
+                raise exc.DisconnectionError()
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    return metrics
@@ -0,0 +1,136 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text written to the log.
+MAX_LOG_TEXT = 1000
+
+
+class RequestProfile:
+    __slots__ = ("scope", "start", "queries", "phases", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.phases = {"db": 0.0, "auth": 0.0, "serialize": 0.0}
+        self.statements = Counter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope["path"]
+
+    def server_timing(self) -> str:
+        entries = [f'db;dur={self.phases["db"] * 1000:.2f};desc="{self.queries} queries"']
+        entries.extend(f"{name};dur={self.phases[name] * 1000:.2f}" for name in ("auth", "serialize"))
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_profile = ContextVar("request_profile", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.phases[phase] += time.perf_counter() - start
+
+
+def _clip(text) -> str:
+    text = str(text)
+    return text if len(text) <= MAX_LOG_TEXT else text[:MAX_LOG_TEXT] + "..."
+
+
+def _param_shape(parameters, executemany: bool) -> str:
+    # Bound values are password hashes, emails, todo text: only their count
+    # is logged.
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} rows x {len(rows[0]) if rows else 0} params"
+    return f"{len(parameters or ())} params"
+
+
+# Timed on the execution context, as in core.metrics: nothing is left behind
+# on the connection by a statement that raises.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _profile.get() is not None:
+        context._profile_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    start = getattr(context, "_profile_start", None)
+    if profile is None or start is None:
+        return
+    elapsed = time.perf_counter() - start
+    profile.queries += 1
+    profile.phases["db"] += elapsed
+    profile.statements[statement] += 1
+    if elapsed * 1000 >= get_settings().slow_query_ms:
+        logger.warning(
+            "slow query %.1f ms on %s %s: %s (%s)",
+            elapsed * 1000,
+            profile.scope["method"],
+            profile.route,
+            _clip(statement),
+            _param_shape(parameters, executemany),
+        )
+
+
+def _report_repeats(profile: RequestProfile):
+    # The same SQL text many times in one request is usually a per-row loop
+    # (N+1); parameters differ per row, so only the statement is compared.
+    threshold = get_settings().repeated_query_threshold
+    for statement, count in profile.statements.items():
+        if count >= threshold:
+            logger.warning(
+                "statement repeated %d times on %s %s: %s",
+                count,
+                profile.scope["method"],
+                profile.route,
+                _clip(statement),
+            )
+
+
+class ProfilerMiddleware:
+    # Debug aid (profile_requests in config.yaml): Server-Timing header plus
+    # slow / repeated statement logging.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile(scope)
+        token = _profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            _report_repeats(profile)
@@ -0,0 +1,222 @@
+import asyncio
+import heapq
+import json
+import logging
+import time
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.metrics import reminder_lag, reminders_queued, reminders_total
+from app.crud.reminder import claim_reminders, due_reminders, finish_reminders
+
+logger = logging.getLogger(__name__)
+
+
+def reminder_payload(row) -> dict:
+    return {
+        "todo_id": row.id,
+        "user_id": row.user_id,
+        "title": row.title,
+        "remind_at": row.remind_at.isoformat(),
+        "due_date": row.due_date.isoformat() if row.due_date else None,
+    }
+
+
+class LogSink:
+    async def deliver(self, reminders: list[dict]):
+        for reminder in reminders:
+            logger.info("reminder %s for user %s at %s", reminder["todo_id"], reminder["user_id"], reminder["remind_at"])
+
+
+class QueueSink:
+    # In-process delivery, for tests and benchmarks.
+    def __init__(self, maxsize: int = 0):
+        self.queue = asyncio.Queue(maxsize)
+
+    async def deliver(self, reminders: list[dict]):
+        for reminder in reminders:
+            await self.queue.put(reminder)
+
+
+class WebhookSink:
+    # POSTs {"reminders": [...]} per batch; any non-2xx response fails the
+    # batch, which is retried once its claims expire.
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes):
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def deliver(self, reminders: list[dict]):
+        await run_in_threadpool(self._post, json.dumps({"reminders": reminders}).encode("utf-8"))
+
+
+def build_sink():
+    settings = get_settings()
+    if settings.reminder_sink == "webhook":
+        if not settings.reminder_webhook_url:
+            raise ValueError("reminder_webhook_url is required for the webhook sink")
+        return WebhookSink(settings.reminder_webhook_url)
+    if settings.reminder_sink == "queue":
+        return QueueSink()
+    return LogSink()
+
+
+def _run(fn, *args):
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+class ReminderScheduler:
+    # Keeps the reminders due within the next `window` seconds in a heap
+    # ordered by remind_at, refilled from the database every `poll_seconds`
+    # (immediately while a backlog remains), and fires each one by claiming,
+    # delivering and then marking the row. Several workers can run one each.
+    def __init__(self, sink, window: int = 60, batch_size: int = 500, poll_seconds: float = 5, lease_seconds: int = 60):
+        self.sink = sink
+        self.window = window
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._heap = []
+        self._queued = set()
+        self._cursor = None
+        self._backlog = False
+        self._next_poll = 0.0
+        self._task = None
+        self.counts = {"delivered": 0, "skipped": 0, "failed": 0, "lost_claims": 0, "polls": 0}
+
+    def _refill(self, now: datetime):
+        # The periodic poll starts from the beginning of the range, so a new
+        # reminder earlier than everything queued is found; backlog reads
+        # continue after the last row loaded.
+        from_start = not self._backlog
+        limit = self.batch_size + (len(self._heap) if from_start else 0)
+        rows = _run(due_reminders, now + timedelta(seconds=self.window), limit, None if from_start else self._cursor)
+        self.counts["polls"] += 1
+        for remind_at, todo_id in rows:
+            if todo_id not in self._queued:
+                self._queued.add(todo_id)
+                heapq.heappush(self._heap, (remind_at, todo_id))
+        self._backlog = len(rows) == limit
+        self._cursor = (rows[-1][0], rows[-1][1]) if rows else None
+        reminders_queued.set(len(self._heap))
+
+    def _fire(self, keys: list[tuple]):
+        token = str(uuid.uuid4())
+        now = datetime.utcnow()
+        try:
+            rows = _run(claim_reminders, keys, token, now, self.lease_seconds)
+        finally:
+            self._queued.difference_update(todo_id for _, todo_id in keys)
+        self.counts["lost_claims"] += len(keys) - len(rows)
+        return token, rows
+
+    async def _dispatch(self, keys: list[tuple]):
+        token, rows = await run_in_threadpool(self._fire, keys)
+        if not rows:
+            return
+        live = [row for row in rows if not row.is_deleted and row.status != "done"]
+        skipped = len(rows) - len(live)
+        if live:
+            try:
+                await self.sink.deliver([reminder_payload(row) for row in live])
+            except Exception:
+                # claims stay until the lease runs out, then another poll retries
+                logger.exception("reminder delivery failed for %d reminders", len(live))
+                self.counts["failed"] += len(live)
+                reminders_total.inc("failed", amount=len(live))
+                live = []
+        done = [row.id for row in rows if row.is_deleted or row.status == "done"] + [row.id for row in live]
+        if not done:
+            return
+        now = datetime.utcnow()
+        await run_in_threadpool(_run, finish_reminders, done, token, now)
+        for row in live:
+            reminder_lag.observe(max((now - row.remind_at).total_seconds(), 0.0))
+        self.counts["delivered"] += len(live)
+        self.counts["skipped"] += skipped
+        reminders_total.inc("delivered", amount=len(live))
+        reminders_total.inc("skipped", amount=skipped)
+
+    async def tick(self) -> float:
+        now = datetime.utcnow()
+        if self._backlog or time.monotonic() >= self._next_poll:
+            self._next_poll = time.monotonic() + self.poll_seconds
+            await run_in_threadpool(self._refill, now)
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            due.append(heapq.heappop(self._heap))
+        if due:
+            await self._dispatch(due)
+            reminders_queued.set(len(self._heap))
+        if self._backlog or (self._heap and self._heap[0][0] <= datetime.utcnow()):
+            return 0.0
+        wait = self._next_poll - time.monotonic()
+        if self._heap:
+            wait = min(wait, (self._heap[0][0] - datetime.utcnow()).total_seconds())
+        return max(wait, 0.0)
+
+    async def run(self):
+        while True:
+            try:
+                wait = await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("reminder scheduler tick failed")
+                wait = self.poll_seconds
+            await asyncio.sleep(wait)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            **self.counts,
+            "queued": len(self._heap),
+            "backlog": self._backlog,
+            "next_due": self._heap[0][0].isoformat() if self._heap else None,
+        }
+
+
+scheduler = None
+
+
+def start_scheduler():
+    global scheduler
+    settings = get_settings()
+    scheduler = ReminderScheduler(
+        build_sink(),
+        window=settings.reminder_window_seconds,
+        batch_size=settings.reminder_batch_size,
+        poll_seconds=settings.reminder_poll_seconds,
+        lease_seconds=settings.reminder_lease_seconds,
+    )
+    scheduler.start()
+
+
+async def stop_scheduler():
+    if scheduler is not None:
+        await scheduler.stop()
+
+
+def scheduler_stats() -> dict:
+    return scheduler.stats() if scheduler is not None else {"running": False}
@@ -1,16 +1,25 @@
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from app.core.profiling import timed
 
 
-def ok(data=None):
-    return {"code": 0, "message": "ok", "data": data if data is not None else {}}
+def ok(data=None, headers=None):
+    with timed("serialize"):
+        return ORJSONResponse(
+            content={"code": 0, "message": "ok", "data": data if data is not None else {}},
+            headers=headers,
+        )
 
 
-def paginated(items, page, page_size, total):
-    return ok({"items": items, "page": page, "page_size": page_size, "total": total})
+def paginated(items, page, page_size, total, next_cursor=None, headers=None):
+    return ok(
+        {"items": items, "page": page, "page_size": page_size, "total": total, "next_cursor": next_cursor},
+        headers=headers,
+    )
 
 
 def error(code: int, message: str, data=None, status_code: int = 400):
-    return JSONResponse(
-        status_code=status_code,
-        content={"code": code, "message": message, "data": data or {}},
-    )
+    with timed("serialize"):
+        return ORJSONResponse(
+            status_code=status_code,
+            content={"code": code, "message": message, "data": data or {}},
+        )
@@ -0,0 +1,71 @@
+import logging
+import random
+from datetime import datetime
+from sqlalchemy import DateTime, String, column, select, table
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+# Core view of models.version.UserDataVersion (the model imports core.database).
+user_data_versions = table("user_data_versions", column("user_id", String), column("last_write_at", DateTime))
+
+# Users this process saw writing within the stickiness window; saves the
+# primary lookup below for the common "write, then re-list" sequence.
+recent_writers = TTLCache(10000, get_settings().replica_sticky_seconds)
+
+# Replicas that failed a connection attempt are skipped for this many seconds.
+REPLICA_RETRY_SECONDS = 30
+down_replicas = TTLCache(100, REPLICA_RETRY_SECONDS)
+
+logger = logging.getLogger(__name__)
+
+
+def mark_write(user_id: str):
+    recent_writers.set(user_id, True)
+
+
+def wrote_recently(primary, user_id: str) -> bool:
+    if recent_writers.get(user_id):
+        return True
+    # last_write_at is committed together with the write itself, so this also
+    # sees writes handled by other workers.
+    with primary.connect() as conn:
+        last_write_at = conn.execute(
+            select(user_data_versions.c.last_write_at).where(user_data_versions.c.user_id == user_id)
+        ).scalar()
+    if last_write_at is None:
+        return False
+    return (datetime.utcnow() - last_write_at).total_seconds() < get_settings().replica_sticky_seconds
+
+
+class RoutingSession(Session):
+    # Sessions flagged read_only (GET requests, see get_db) read from one
+    # replica for their whole lifetime, so e.g. an ETag version and the list
+    # it describes come from the same snapshot. Writes, and reads for a user
+    # inside the stickiness window after their own write, use the primary.
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and not self._flushing and not getattr(clause, "is_dml", False):
+            replica = self.info.get("replica")
+            if replica is None:
+                replica = self.info["replica"] = self._choose_replica()
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def _choose_replica(self):
+        primary = super().get_bind()
+        replicas = [replica for replica in self.info.get("replicas") or () if not down_replicas.get(replica)]
+        user_id = self.info.get("user_id")
+        if not replicas or (user_id and wrote_recently(primary, user_id)):
+            return primary
+        # A pool checkout up front, so an unreachable replica sends the
+        # session to another one (or the primary) instead of failing it.
+        random.shuffle(replicas)
+        for replica in replicas:
+            try:
+                with replica.connect():
+                    return replica
+            except DBAPIError:
+                logger.warning("replica %s unavailable, skipped for %ss", replica.url, REPLICA_RETRY_SECONDS, exc_info=True)
+                down_replicas.set(replica, True)
+        return primary
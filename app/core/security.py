@@ -1,9 +1,21 @@
+import asyncio
+import logging
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_settings = get_settings()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=_settings.bcrypt_rounds)
+# token -> user id, and user id -> UserOut snapshot for get_current_user
+token_cache = TTLCache(_settings.auth_cache_size, _settings.auth_cache_ttl)
+user_cache = TTLCache(_settings.auth_cache_size, _settings.auth_user_cache_ttl)
+# ?access_token=<jwt>, as taken by event streams (api.deps.get_stream_user)
+_QUERY_TOKEN = re.compile(r"(access_token=)[^&\s\"]+")
 
 
 def hash_password(password: str) -> str:
@@ -21,6 +33,75 @@ def verify_password(plain: str, hashed: str) -> bool:
         return False
 
 
+def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    # The new hash is set when the stored one uses outdated parameters.
+    if len(plain) > 72:
+        return False, None
+    try:
+        return pwd_context.verify_and_update(plain, hashed)
+    except ValueError:
+        return False, None
+
+
+class PasswordQueueFull(RuntimeError):
+    pass
+
+
+_password_pool = None
+_password_jobs = 0
+
+
+def _get_password_pool():
+    global _password_pool
+    if _password_pool is None:
+        # spawn: never fork a process that holds the event loop, the DB pool
+        # and the threadpool.
+        _password_pool = ProcessPoolExecutor(
+            max_workers=_settings.password_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _password_pool
+
+
+def shutdown_password_pool():
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(cancel_futures=True)
+        _password_pool = None
+
+
+async def _run_password_job(fn, *args):
+    # bcrypt is CPU bound on purpose; run it in worker processes so logins
+    # neither hold the GIL nor the request threadpool, and shed load once
+    # password_queue_limit jobs are waiting.
+    global _password_jobs
+    if _password_jobs >= _settings.password_queue_limit:
+        raise PasswordQueueFull("password_queue_full")
+    _password_jobs += 1
+    try:
+        pool = _get_password_pool() if _settings.password_workers > 0 else None
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    finally:
+        _password_jobs -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> tuple[bool, str | None]:
+    return await _run_password_job(verify_and_update_password, plain, hashed)
+
+
+def password_pool_stats() -> dict:
+    return {
+        "workers": _settings.password_workers,
+        "queue_limit": _settings.password_queue_limit,
+        "pending": _password_jobs,
+        "bcrypt_rounds": _settings.bcrypt_rounds,
+    }
+
+
 def create_access_token(subject: str) -> str:
     settings = get_settings()
     expire = datetime.utcnow() + timedelta(seconds=settings.jwt_expires_in)
@@ -29,3 +110,22 @@ def create_access_token(subject: str) -> str:
         "exp": expire,
     }
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+
+def invalidate_user(user_id: str):
+    user_cache.pop(user_id)
+
+
+def redact_query_tokens(text: str) -> str:
+    return _QUERY_TOKEN.sub(r"\1***", text)
+
+
+class RedactQueryTokens(logging.Filter):
+    # uvicorn's access log prints the request path with its query string:
+    # mask bearer tokens passed as ?access_token= before any handler sees them.
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(redact_query_tokens(arg) if isinstance(arg, str) else arg for arg in record.args)
+        if isinstance(record.msg, str):
+            record.msg = redact_query_tokens(record.msg)
+        return True
@@ -0,0 +1,91 @@
+import codecs
+import csv
+import io
+import zlib
+from datetime import date, datetime
+import orjson
+
+# Longest single line (or quoted CSV record) kept in memory while parsing.
+MAX_LINE_LENGTH = 64 * 1024
+
+
+async def iter_lines(chunks):
+    # Split an async byte stream into text lines without reading it all.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_no = 0
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                line_no += 1
+                yield line_no, line.rstrip("\r")
+            if len(buffer) > MAX_LINE_LENGTH:
+                raise ValueError("line_too_long")
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ValueError("invalid_encoding")
+    if buffer:
+        yield line_no + 1, buffer.rstrip("\r")
+
+
+async def iter_csv_rows(lines):
+    # Quoted fields may span lines: keep reading until the quotes balance.
+    pending = ""
+    start = 0
+    async for line_no, line in lines:
+        if not pending:
+            if not line:
+                continue
+            start = line_no
+            pending = line
+        else:
+            pending = f"{pending}\n{line}"
+        if pending.count('"') % 2:
+            if len(pending) > MAX_LINE_LENGTH:
+                raise ValueError("line_too_long")
+            continue
+        yield start, next(csv.reader([pending]))
+        pending = ""
+    if pending:
+        raise ValueError("invalid_csv")
+
+
+async def ndjson_chunks(partitions):
+    async for rows in partitions:
+        yield b"".join(orjson.dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    return value
+
+
+async def csv_chunks(partitions, header: list[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    async for rows in partitions:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.core.database import SessionLocal, engine, named_lock
+from app.core.metrics import trash_purge_duration, trash_purged_total
+from app.crud.sync import prune_tombstones
+from app.crud.todo import purge_expired_chunk
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "todo_trash_purge"
+
+
+def purge_expired_trash(
+    retention_days: int, chunk_size: int = 500, pause_seconds: float = 0.1, tombstone_days: int = 0
+) -> dict:
+    # One purge run: deletes trash older than the retention period in chunks
+    # of `chunk_size`, each in its own short transaction, sleeping between
+    # chunks so other writers get the rows and the log in between, then the
+    # same for delta sync tombstones older than `tombstone_days`. Only one
+    # process runs at a time; the others skip the run. 0 days skips a part.
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=retention_days)
+    report = {"skipped": False, "purged": 0, "chunks": 0, "tombstones": 0, "cutoff": cutoff.isoformat()}
+    with named_lock(engine, LOCK_NAME) as acquired:
+        if not acquired:
+            report["skipped"] = True
+        else:
+            after = None
+            with SessionLocal() as db:
+                while retention_days > 0:
+                    purged, after = purge_expired_chunk(db, cutoff, chunk_size, after)
+                    if after is None:
+                        break
+                    report["purged"] += purged
+                    report["chunks"] += 1
+                    trash_purged_total.inc(amount=purged)
+                    time.sleep(pause_seconds)
+                while tombstone_days > 0:
+                    pruned = prune_tombstones(db, now - timedelta(days=tombstone_days), chunk_size)
+                    if not pruned:
+                        break
+                    report["tombstones"] += pruned
+                    time.sleep(pause_seconds)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    if not report["skipped"]:
+        trash_purge_duration.observe(report["seconds"])
+        logger.info(
+            "trash purge removed %d rows in %d chunks and %d sync tombstones in %.3fs (deleted before %s)",
+            report["purged"], report["chunks"], report["tombstones"], report["seconds"], report["cutoff"],
+        )
+    return report
+
+
+class TrashPurger:
+    # Runs purge_expired_trash every `interval_seconds` in the threadpool.
+    def __init__(
+        self,
+        retention_days: int,
+        interval_seconds: float = 3600,
+        chunk_size: int = 500,
+        pause_seconds: float = 0.1,
+        tombstone_days: int = 0,
+    ):
+        self.retention_days = retention_days
+        self.tombstone_days = tombstone_days
+        self.interval_seconds = interval_seconds
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+        self._task = None
+        self.counts = {"runs": 0, "skipped": 0, "failed": 0, "purged": 0, "tombstones": 0}
+        self.last_run = None
+
+    async def run_once(self) -> dict:
+        report = await run_in_threadpool(
+            purge_expired_trash, self.retention_days, self.chunk_size, self.pause_seconds, self.tombstone_days
+        )
+        self.counts["skipped" if report["skipped"] else "runs"] += 1
+        self.counts["purged"] += report["purged"]
+        self.counts["tombstones"] += report["tombstones"]
+        self.last_run = {**report, "finished_at": datetime.utcnow().isoformat()}
+        return report
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("trash purge failed")
+                self.counts["failed"] += 1
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "retention_days": self.retention_days,
+            "tombstone_days": self.tombstone_days,
+            **self.counts,
+            "last_run": self.last_run,
+        }
+
+
+purger = None
+
+
+def start_purger():
+    global purger
+    settings = get_settings()
+    purger = TrashPurger(
+        settings.trash_retention_days,
+        interval_seconds=settings.trash_purge_interval_seconds,
+        chunk_size=settings.trash_purge_chunk_size,
+        pause_seconds=settings.trash_purge_pause_seconds,
+        tombstone_days=settings.sync_tombstone_days,
+    )
+    purger.start()
+
+
+async def stop_purger():
+    if purger is not None:
+        await purger.stop()
+
+
+def purger_stats() -> dict:
+    return purger.stats() if purger is not None else {"running": False}
@@ -0,0 +1,47 @@
+from functools import wraps
+from app.core.database import run_db
+from app.crud import category, stats, sync, tag, todo, user, version
+
+
+def _async(fn):
+    @wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        return await run_db(db, fn, *args, **kwargs)
+
+    return wrapper
+
+
+get_user = _async(user.get_user)
+get_user_by_username = _async(user.get_user_by_username)
+create_user = _async(user.create_user)
+update_user = _async(user.update_user)
+
+list_categories = _async(category.list_categories)
+cached_categories = _async(category.cached_categories)
+get_category = _async(category.get_category)
+get_category_by_name = _async(category.get_category_by_name)
+create_category = _async(category.create_category)
+update_category = _async(category.update_category)
+delete_category = _async(category.delete_category)
+
+list_todos = _async(todo.list_todos)
+get_todo = _async(todo.get_todo)
+create_todo = _async(todo.create_todo)
+create_todos = _async(todo.create_todos)
+update_todo = _async(todo.update_todo)
+soft_delete_todo = _async(todo.soft_delete_todo)
+restore_todo = _async(todo.restore_todo)
+purge_todo = _async(todo.purge_todo)
+clear_done = _async(todo.clear_done)
+batch_status = _async(todo.batch_status)
+list_trash = _async(todo.list_trash)
+clear_trash = _async(todo.clear_trash)
+
+tag_counts = _async(tag.tag_counts)
+
+stats_summary = _async(stats.stats_summary)
+daily_stats = _async(stats.daily_stats)
+
+get_data_version = _async(version.get_data_version)
+
+changes_since = _async(sync.changes_since)
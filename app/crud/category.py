@@ -1,7 +1,24 @@
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.events import publish_change
+from app.crud.todo import unassign_category
+from app.crud.version import bump_data_version, record_tombstones
 from app.models.category import Category
+from app.models.todo import Todo
 import uuid
 
+CATEGORY_COLUMNS = (Category.id, Category.name, Category.color, Category.order, Category.is_system)
+
+_settings = get_settings()
+# (user id, with_counts) -> (data version, serialized list) for GET /categories
+category_cache = TTLCache(_settings.category_cache_size, _settings.category_cache_ttl)
+
+
+def serialize_category(row) -> dict:
+    return {"id": row.id, "name": row.name, "color": row.color, "order": row.order, "is_system": row.is_system}
+
 
 def list_categories(db: Session, user_id: str):
     return (
@@ -12,7 +29,66 @@ def list_categories(db: Session, user_id: str):
     )
 
 
+def list_categories_with_counts(db: Session, user_id: str):
+    # Categories with their open and done todo counts (trash excluded): the
+    # todos are grouped once on ix_todos_user_category_status, index only,
+    # and joined to the categories instead of one filtered list per category.
+    counts = (
+        select(
+            Todo.category_id,
+            func.count(case((Todo.status == "todo", 1))).label("todo_count"),
+            func.count(case((Todo.status == "done", 1))).label("done_count"),
+        )
+        .where(Todo.user_id == user_id, Todo.category_id.is_not(None), Todo.is_deleted.is_(False))
+        .group_by(Todo.category_id)
+        .subquery()
+    )
+    return db.execute(
+        select(
+            *CATEGORY_COLUMNS,
+            func.coalesce(counts.c.todo_count, 0).label("todo_count"),
+            func.coalesce(counts.c.done_count, 0).label("done_count"),
+        )
+        .outerjoin(counts, counts.c.category_id == Category.id)
+        .where(Category.user_id == user_id)
+        .order_by(Category.order.asc())
+    ).all()
+
+
+def cached_categories(db: Session, user_id: str, version: int, with_counts: bool = False) -> list[dict]:
+    # Entries are only served for the user's current data version, which
+    # every category and todo write bumps, so other workers' writes are never
+    # hidden; the local writers below also drop them right away.
+    key = (user_id, with_counts)
+    cached = category_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    if with_counts:
+        items = [
+            {**serialize_category(row), "todo_count": row.todo_count, "done_count": row.done_count}
+            for row in list_categories_with_counts(db, user_id)
+        ]
+    else:
+        items = [serialize_category(row) for row in list_categories(db, user_id)]
+    category_cache.set(key, (version, items))
+    return items
+
+
+def invalidate_categories(user_id: str):
+    category_cache.pop((user_id, False))
+    category_cache.pop((user_id, True))
+
+
+def get_category(db: Session, user_id: str, category_id: str):
+    return db.query(Category).filter(Category.id == category_id, Category.user_id == user_id).first()
+
+
+def get_category_by_name(db: Session, user_id: str, name: str):
+    return db.query(Category).filter(Category.user_id == user_id, Category.name == name).first()
+
+
 def create_category(db: Session, user_id: str, name: str, color: str, order: int):
+    seq = bump_data_version(db, user_id)
     category = Category(
         id=str(uuid.uuid4()),
         user_id=user_id,
@@ -20,23 +96,36 @@ def create_category(db: Session, user_id: str, name: str, color: str, order: int
         color=color,
         order=order or 0,
         is_system=False,
+        change_seq=seq,
     )
     db.add(category)
     db.commit()
     db.refresh(category)
+    invalidate_categories(user_id)
+    publish_change(category.user_id, "category", "created", [category.id])
     return category
 
 
 def update_category(db: Session, category: Category, data: dict):
+    category.change_seq = bump_data_version(db, category.user_id)
     for key, value in data.items():
         if value is not None:
             setattr(category, key, value)
     db.add(category)
     db.commit()
     db.refresh(category)
+    invalidate_categories(category.user_id)
+    publish_change(category.user_id, "category", "updated", [category.id])
     return category
 
 
 def delete_category(db: Session, category: Category):
+    # Its todos are unassigned in the same transaction.
+    user_id, category_id = category.user_id, category.id
+    seq = bump_data_version(db, user_id)
+    unassign_category(db, user_id, category_id, seq)
     db.delete(category)
+    record_tombstones(db, user_id, "category", [category_id], seq)
     db.commit()
+    invalidate_categories(user_id)
+    publish_change(user_id, "category", "deleted", [category_id])
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+from app.models.todo import Todo
+
+REMINDER_COLUMNS = (Todo.id, Todo.user_id, Todo.title, Todo.remind_at, Todo.due_date, Todo.status, Todo.is_deleted)
+
+
+def due_reminders(db: Session, horizon: datetime, limit: int, after: tuple | None = None) -> list:
+    # Range scan on ix_todos_reminder_due, in (remind_at, id) order so a
+    # backlog larger than one batch is read with a keyset cursor.
+    query = select(Todo.remind_at, Todo.id).where(Todo.reminded_at.is_(None), Todo.remind_at <= horizon)
+    if after:
+        remind_at, todo_id = after
+        query = query.where(or_(Todo.remind_at > remind_at, and_(Todo.remind_at == remind_at, Todo.id > todo_id)))
+    return db.execute(query.order_by(Todo.remind_at, Todo.id).limit(limit)).all()
+
+
+def claim_reminders(db: Session, keys: list[tuple], token: str, now: datetime, lease_seconds: int) -> list:
+    # A single conditional UPDATE: of several workers racing for the same
+    # rows exactly one sets its token. Claims older than the lease (worker
+    # died before delivering) can be taken over. keys are (remind_at, id)
+    # from due_reminders; the remind_at range keeps the statement on the
+    # index range just read (SQLite would otherwise walk every pending row),
+    # and a row whose remind_at was changed since is left for a later poll.
+    in_range = (Todo.reminded_at.is_(None), Todo.remind_at.between(min(keys)[0], max(keys)[0]))
+    ids = [todo_id for _, todo_id in keys]
+    db.execute(
+        update(Todo)
+        .where(
+            *in_range,
+            Todo.id.in_(ids),
+            or_(Todo.reminder_claimed_at.is_(None), Todo.reminder_claimed_at < now - timedelta(seconds=lease_seconds)),
+        )
+        # reminder bookkeeping is not a user-visible change
+        .values(reminder_claim=token, reminder_claimed_at=now, updated_at=Todo.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return db.execute(
+        select(*REMINDER_COLUMNS).where(*in_range, Todo.id.in_(ids), Todo.reminder_claim == token)
+    ).all()
+
+
+def finish_reminders(db: Session, ids: list[str], token: str, now: datetime) -> int:
+    result = db.execute(
+        update(Todo)
+        .where(Todo.id.in_(ids), Todo.reminder_claim == token)
+        .values(reminded_at=now, updated_at=Todo.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,136 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, delete, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from app.core.database import upsert_add
+from app.models.stats import UserDailyStats
+from app.models.todo import Todo
+
+STAT_COLUMNS = ("created", "completed", "deleted")
+
+# Columns needed to compute a todo's contribution to the rollup.
+STAT_FIELDS = (Todo.user_id, Todo.is_deleted, Todo.status, Todo.created_at, Todo.completed_at, Todo.deleted_at)
+
+
+def _day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def todo_contributions(todos) -> Counter:
+    counts = Counter()
+    for todo in todos:
+        if not todo.is_deleted and todo.created_at is not None:
+            counts[(todo.user_id, _day(todo.created_at), "created")] += 1
+        if todo.status == "done" and todo.completed_at is not None:
+            counts[(todo.user_id, _day(todo.completed_at), "completed")] += 1
+        if todo.is_deleted and todo.deleted_at is not None:
+            counts[(todo.user_id, _day(todo.deleted_at), "deleted")] += 1
+    return counts
+
+
+def stat_rows(db: Session, user_id: str, ids: list[str], change_seq: int | None = None):
+    # The user's rows among `ids`; with change_seq, only those a write at
+    # that sequence number stamped (the rows it actually hit).
+    query = select(Todo.id, *STAT_FIELDS).where(Todo.user_id == user_id, Todo.id.in_(ids))
+    if change_seq is not None:
+        query = query.where(Todo.change_seq == change_seq)
+    return db.execute(query).all()
+
+
+def apply_stats_delta(db: Session, before: Counter, after: Counter):
+    delta = Counter(after)
+    delta.subtract(before)
+    rows = {}
+    for (user_id, day, column), n in delta.items():
+        if n:
+            row = rows.setdefault((user_id, day), {"user_id": user_id, "day": day, "created": 0, "completed": 0, "deleted": 0})
+            row[column] += n
+    if rows:
+        upsert_add(db, UserDailyStats, list(rows.values()), STAT_COLUMNS)
+
+
+def record_created(db: Session, user_id: str, count: int = 1):
+    # created_at is set from the app clock (UTC), so key the day on it too.
+    upsert_add(
+        db,
+        UserDailyStats,
+        [{"user_id": user_id, "day": datetime.utcnow().date(), "created": count, "completed": 0, "deleted": 0}],
+        STAT_COLUMNS,
+    )
+
+
+def stats_summary(db: Session, user_id: str):
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=6)
+    in_week = UserDailyStats.day.between(week_start, week_end)
+    row = db.execute(
+        select(
+            func.sum(UserDailyStats.created),
+            func.sum(case((UserDailyStats.day == today, UserDailyStats.completed), else_=0)),
+            func.sum(case((in_week, UserDailyStats.completed), else_=0)),
+            func.sum(case((in_week, UserDailyStats.created), else_=0)),
+        ).where(UserDailyStats.user_id == user_id)
+    ).one()
+    total, today_completed, week_done, week_total = (int(value or 0) for value in row)
+    rate = round(week_done / week_total, 2) if week_total else 0.0
+    return {"total_todos": total, "today_completed": today_completed, "week_completion_rate": rate}
+
+
+def daily_stats(db: Session, user_id: str, start: date, end: date):
+    rows = db.execute(
+        select(UserDailyStats.day, UserDailyStats.created, UserDailyStats.completed, UserDailyStats.deleted)
+        .where(UserDailyStats.user_id == user_id, UserDailyStats.day.between(start, end))
+        .order_by(UserDailyStats.day.asc())
+    ).all()
+    by_day = {_day(row.day): row for row in rows}
+    items = []
+    day = start
+    while day <= end:
+        row = by_day.get(day)
+        items.append({
+            "day": day,
+            "created": row.created if row else 0,
+            "completed": row.completed if row else 0,
+            "deleted": row.deleted if row else 0,
+        })
+        day += timedelta(days=1)
+    return items
+
+
+def backfill_daily_stats(db: Session, user_id: str | None = None) -> int:
+    def scoped(query):
+        return query.where(Todo.user_id == user_id) if user_id else query
+
+    zero, one = literal(0), literal(1)
+    events = union_all(
+        scoped(select(Todo.user_id, func.date(Todo.created_at).label("day"), one.label("created"), zero.label("completed"), zero.label("deleted"))
+               .where(Todo.is_deleted.is_(False))),
+        scoped(select(Todo.user_id, func.date(Todo.completed_at), zero, one, zero)
+               .where(Todo.status == "done", Todo.completed_at.is_not(None))),
+        scoped(select(Todo.user_id, func.date(Todo.deleted_at), zero, zero, one)
+               .where(Todo.is_deleted.is_(True), Todo.deleted_at.is_not(None))),
+    ).subquery()
+    rows = db.execute(
+        select(events.c.user_id, events.c.day, func.sum(events.c.created), func.sum(events.c.completed), func.sum(events.c.deleted))
+        .group_by(events.c.user_id, events.c.day)
+    ).all()
+
+    cleared = delete(UserDailyStats)
+    if user_id:
+        cleared = cleared.where(UserDailyStats.user_id == user_id)
+    db.execute(cleared)
+    values = [
+        {
+            "user_id": row[0],
+            "day": row[1] if isinstance(row[1], date) else date.fromisoformat(str(row[1])),
+            "created": int(row[2]),
+            "completed": int(row[3]),
+            "deleted": int(row[4]),
+        }
+        for row in rows
+    ]
+    if values:
+        db.execute(UserDailyStats.__table__.insert(), values)
+    db.commit()
+    return len(values)
@@ -0,0 +1,75 @@
+from datetime import datetime
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.orm import Session
+from app.crud.category import CATEGORY_COLUMNS
+from app.crud.todo import todo_columns
+from app.models.category import Category
+from app.models.sync import SyncTombstone
+from app.models.todo import Todo
+
+# Sources in cursor order: rows sharing a change_seq (one bulk chunk) are
+# ordered by source, then id.
+SOURCES = ("category", "todo", "deleted")
+
+
+def _after(seq_col, id_col, rank: int, position: tuple | None):
+    # Rows of source `rank` that come after the cursor position.
+    if position is None:
+        return None
+    seq, source, last_id = position
+    if rank > source:
+        return seq_col >= seq
+    if rank < source:
+        return seq_col > seq
+    # the redundant bound keeps the index range scan starting at `seq`
+    return and_(seq_col >= seq, or_(seq_col > seq, and_(seq_col == seq, id_col > last_id)))
+
+
+def _read(db: Session, statement, seq_col, id_col, rank: int, position, limit: int):
+    where = _after(seq_col, id_col, rank, position)
+    if where is not None:
+        statement = statement.where(where)
+    rows = db.execute(statement.order_by(seq_col.asc(), id_col.asc()).limit(limit + 1)).all()
+    return [(row.change_seq, rank, getattr(row, id_col.key), row) for row in rows]
+
+
+def changes_since(db: Session, user_id: str, position: tuple | None, limit: int, tombstones: bool = True):
+    # Up to `limit` todos, categories and tombstones changed after `position`
+    # ((change_seq, source rank, id) of the last change returned), merged in
+    # cursor order. Each source is one range scan on its (user_id, change_seq)
+    # index, so a resync costs the rows changed since, not the account size.
+    merged = _read(
+        db,
+        select(*CATEGORY_COLUMNS, Category.change_seq).where(Category.user_id == user_id),
+        Category.change_seq, Category.id, 0, position, limit,
+    )
+    merged += _read(
+        db,
+        select(*todo_columns(), Todo.change_seq).where(Todo.user_id == user_id),
+        Todo.change_seq, Todo.id, 1, position, limit,
+    )
+    if tombstones:
+        merged += _read(
+            db,
+            select(SyncTombstone.entity, SyncTombstone.entity_id, SyncTombstone.change_seq).where(SyncTombstone.user_id == user_id),
+            SyncTombstone.change_seq, SyncTombstone.entity_id, 2, position, limit,
+        )
+    merged.sort(key=lambda item: item[:3])
+    has_more = len(merged) > limit
+    return merged[:limit], has_more
+
+
+def prune_tombstones(db: Session, cutoff: datetime, limit: int) -> int:
+    # One chunk of tombstones created before `cutoff`, oldest first; rows
+    # written by one bulk chunk share a timestamp and go together.
+    last = db.execute(
+        select(SyncTombstone.created_at)
+        .where(SyncTombstone.created_at < cutoff)
+        .order_by(SyncTombstone.created_at.asc())
+        .offset(limit - 1)
+        .limit(1)
+    ).scalar()
+    bound = SyncTombstone.created_at <= last if last is not None else SyncTombstone.created_at < cutoff
+    deleted = db.execute(delete(SyncTombstone).where(bound, SyncTombstone.created_at < cutoff)).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,55 @@
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from app.models.tag import TodoTag
+from app.models.todo import Todo
+
+# Most tags accepted by one tag filter.
+MAX_FILTER_TAGS = 20
+
+
+def tag_rows(user_id: str, todo_id: str, tags: list[str] | None) -> list[dict]:
+    return [{"user_id": user_id, "tag": tag, "todo_id": todo_id} for tag in tags or ()]
+
+
+def add_tags(db: Session, rows: list[dict]):
+    if rows:
+        db.execute(insert(TodoTag), rows)
+
+
+def replace_tags(db: Session, user_id: str, todo_id: str, tags: list[str]):
+    db.execute(delete(TodoTag).where(TodoTag.todo_id == todo_id))
+    add_tags(db, tag_rows(user_id, todo_id, tags))
+
+
+def delete_tags(db: Session, todo_ids: list[str]):
+    if todo_ids:
+        db.execute(delete(TodoTag).where(TodoTag.todo_id.in_(todo_ids)))
+
+
+def tagged_ids(user_id: str, tags: list[str], match: str = "any"):
+    # Subquery of the user's todo ids carrying any (or all) of `tags`; a range
+    # scan on the (user_id, tag, todo_id) primary key per tag.
+    if match not in ("any", "all"):
+        raise ValueError("invalid_tag_match")
+    if len(tags) > MAX_FILTER_TAGS:
+        raise ValueError("too_many_tags")
+    stmt = select(TodoTag.todo_id).where(TodoTag.user_id == user_id, TodoTag.tag.in_(tags))
+    if match == "all" and len(tags) > 1:
+        stmt = stmt.group_by(TodoTag.todo_id).having(func.count() == len(tags))
+    return stmt
+
+
+def tag_counts(db: Session, user_id: str) -> list[tuple[str, int]]:
+    # Todos per tag, trash excluded, most used first, in one GROUP BY: every
+    # tag row of the user (covering primary key range) counts +1 and the tags
+    # of trashed todos count -1, which is cheaper than joining each tag row to
+    # its todo to check is_deleted.
+    trashed = select(Todo.id).where(Todo.user_id == user_id, Todo.is_deleted.is_(True))
+    rows = union_all(
+        select(TodoTag.tag, literal(1).label("n")).where(TodoTag.user_id == user_id),
+        select(TodoTag.tag, literal(-1)).where(TodoTag.todo_id.in_(trashed)),
+    ).subquery()
+    count = func.sum(rows.c.n).label("count")
+    return db.execute(
+        select(rows.c.tag, count).group_by(rows.c.tag).having(count > 0).order_by(count.desc(), rows.c.tag.asc())
+    ).all()
@@ -1,15 +1,32 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from app.models.todo import Todo
-from datetime import date, datetime, timedelta, time
+from sqlalchemy import func, literal, and_, or_, insert, select, update, delete
+from app.core.events import publish_change
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.search import get_search_backend
+from app.crud.stats import STAT_FIELDS, apply_stats_delta, record_created, stat_rows, todo_contributions
+from app.crud.tag import add_tags, delete_tags, replace_tags, tag_rows, tagged_ids
+from app.crud.version import bump_data_version, record_tombstones
+from app.models.todo import PRIORITY_ORDER, Todo
+from app.schemas.todo import TODO_FIELDS
+from collections import Counter
+from datetime import date, datetime, timedelta
 import uuid
 
 
-PRIORITY_ORDER = {
-    "high": 3,
-    "medium": 2,
-    "low": 1,
-}
+# Plain column projection used by the list endpoints: rows skip ORM
+# hydration and the identity map and serialize straight from their mapping.
+TODO_COLUMNS = tuple(getattr(Todo, name) for name in TODO_FIELDS)
+
+
+def todo_columns(fields: tuple[str, ...] | None = None, *required: str):
+    # Sparse fieldsets still select id and the sort key the pager needs.
+    if not fields:
+        return TODO_COLUMNS
+    names = {"id", *fields, *required}
+    return tuple(getattr(Todo, name) for name in TODO_FIELDS if name in names)
+
+# Rows touched per statement (and per commit) by the bulk operations.
+BULK_CHUNK_SIZE = 500
 
 
 def build_filters(query, user_id: str, filters: dict):
@@ -30,10 +47,13 @@ def build_filters(query, user_id: str, filters: dict):
     if priority:
         query = query.filter(Todo.priority == priority)
 
+    tags = filters.get("tags")
+    if tags:
+        query = query.filter(Todo.id.in_(tagged_ids(user_id, tags, filters.get("tag_match") or "any")))
+
     keyword = filters.get("keyword")
     if keyword:
-        like = f"%{keyword}%"
-        query = query.filter((Todo.title.ilike(like)) | (Todo.description.ilike(like)))
+        query = get_search_backend().apply(query, keyword)
 
     due = filters.get("due")
     if due:
@@ -51,140 +71,365 @@ def build_filters(query, user_id: str, filters: dict):
     return query
 
 
-def list_todos(db: Session, user_id: str, filters: dict, page: int, page_size: int):
-    base = db.query(Todo)
-    base = build_filters(base, user_id, filters)
-
-    total = base.count()
-
+def _sort_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _parse_sort_value(sort_by: str, value):
+    # Back to the column's Python type: _seek binds it through the column
+    # type, so it compares in the format the database stores (on SQLite, text
+    # that always carries microseconds, see migration 0013).
+    try:
+        if sort_by == "priority":
+            if not isinstance(value, int):
+                raise ValueError
+        elif value is None:
+            if sort_by == "created_at":
+                raise ValueError
+        elif sort_by == "due_date":
+            value = date.fromisoformat(value)
+        else:
+            value = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError("invalid_cursor")
+    return value
+
+
+def _seek(order_col, value, last_id: str, descending: bool):
+    # Keyset predicate for ORDER BY order_col, id in the same direction.
+    # NULL sorts first ascending and last descending, as on MySQL and SQLite.
+    if value is None:
+        if descending:
+            return and_(order_col.is_(None), Todo.id < last_id)
+        return or_(order_col.is_not(None), and_(order_col.is_(None), Todo.id > last_id))
+    bound = literal(value, order_col.type)
+    if descending:
+        return or_(order_col < bound, and_(order_col == bound, Todo.id < last_id), order_col.is_(None))
+    return or_(order_col > bound, and_(order_col == bound, Todo.id > last_id))
+
+
+def _keyset_page(query, order_col, sort_by: str, sort_order: str, cursor: str | None, page: int, page_size: int, sort_key):
+    descending = sort_order != "asc"
+    if cursor:
+        data = decode_cursor(cursor)
+        if data.get("k") != sort_by or data.get("o") != sort_order or not isinstance(data.get("id"), str):
+            raise ValueError("invalid_cursor")
+        value = _parse_sort_value(sort_by, data.get("v"))
+        query = query.filter(_seek(order_col, value, data["id"], descending))
+    if descending:
+        query = query.order_by(order_col.desc(), Todo.id.desc())
+    else:
+        query = query.order_by(order_col.asc(), Todo.id.asc())
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    rows = query.limit(page_size + 1).all()
+    items = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = items[-1]
+        next_cursor = encode_cursor({"k": sort_by, "o": sort_order, "v": _sort_value(sort_key(last)), "id": last.id})
+    return items, next_cursor
+
+
+def list_todos(
+    db: Session,
+    user_id: str,
+    filters: dict,
+    page: int,
+    page_size: int,
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    fields: tuple[str, ...] | None = None,
+):
     sort_by = filters.get("sort_by") or "created_at"
     sort_order = filters.get("sort_order") or "desc"
 
+    sort_field = sort_by if sort_by in ("due_date", "priority") else "created_at"
+    base = db.query(*todo_columns(fields, sort_field))
+    base = build_filters(base, user_id, filters)
+
+    if with_total is None:
+        with_total = not cursor
+    total = base.count() if with_total else None
+
+    if sort_by == "relevance":
+        keyword = filters.get("keyword")
+        rank = get_search_backend().rank(keyword) if keyword else None
+        if rank is not None:
+            # Relevance scores are not stable cursor keys; page by offset.
+            if cursor:
+                raise ValueError("invalid_cursor")
+            items = base.order_by(rank.desc(), Todo.id.desc()).offset((page - 1) * page_size).limit(page_size).all()
+            return items, total, None
+        sort_by = "created_at"
+
     if sort_by == "due_date":
         order_col = Todo.due_date
+        sort_key = lambda todo: todo.due_date
     elif sort_by == "priority":
-        order_col = case(
-            (Todo.priority == "high", PRIORITY_ORDER["high"]),
-            (Todo.priority == "medium", PRIORITY_ORDER["medium"]),
-            (Todo.priority == "low", PRIORITY_ORDER["low"]),
-            else_=0,
-        )
+        order_col = Todo.priority_rank
+        sort_key = lambda todo: PRIORITY_ORDER.get(todo.priority, 0)
     else:
+        sort_by = "created_at"
         order_col = Todo.created_at
+        sort_key = lambda todo: todo.created_at
+
+    items, next_cursor = _keyset_page(base, order_col, sort_by, sort_order, cursor, page, page_size, sort_key)
+    return items, total, next_cursor
+
+
+def export_statement(user_id: str, filters: dict, fields: tuple[str, ...] | None = None):
+    stmt = build_filters(select(*todo_columns(fields)), user_id, filters)
+    return stmt.order_by(Todo.created_at.desc(), Todo.id.desc())
 
-    if sort_order == "asc":
-        base = base.order_by(order_col.asc())
-    else:
-        base = base.order_by(order_col.desc())
 
-    items = base.offset((page - 1) * page_size).limit(page_size).all()
-    return items, total
+def get_todo(db: Session, user_id: str, todo_id: str, deleted: bool | None = None):
+    q = db.query(Todo).filter(Todo.id == todo_id, Todo.user_id == user_id)
+    if deleted is not None:
+        q = q.filter(Todo.is_deleted.is_(deleted))
+    return q.first()
 
 
 def create_todo(db: Session, user_id: str, data: dict):
+    seq = bump_data_version(db, user_id)
     todo = Todo(
         id=str(uuid.uuid4()),
         user_id=user_id,
+        change_seq=seq,
         **data,
     )
     db.add(todo)
+    add_tags(db, tag_rows(user_id, todo.id, todo.tags))
+    record_created(db, user_id)
     db.commit()
     db.refresh(todo)
+    publish_change(user_id, "todo", "created", [todo.id])
     return todo
 
 
+def create_todos(db: Session, user_id: str, items: list[dict]) -> list[str]:
+    # One executemany INSERT and one commit; no per-row refresh.
+    if not items:
+        return []
+    seq = bump_data_version(db, user_id)
+    rows = [{"id": str(uuid.uuid4()), "user_id": user_id, "change_seq": seq, **data} for data in items]
+    db.execute(insert(Todo), rows)
+    add_tags(db, [tag for row in rows for tag in tag_rows(user_id, row["id"], row.get("tags"))])
+    record_created(db, user_id, len(rows))
+    db.commit()
+    ids = [row["id"] for row in rows]
+    publish_change(user_id, "todo", "created", ids)
+    return ids
+
+
 def update_todo(db: Session, todo: Todo, data: dict):
+    before = todo_contributions([todo])
+    todo.change_seq = bump_data_version(db, todo.user_id)
+    if data.get("remind_at") is not None and data["remind_at"] != todo.remind_at:
+        # a new reminder time fires again
+        todo.reminded_at = todo.reminder_claim = todo.reminder_claimed_at = None
     for key, value in data.items():
         if value is not None:
             setattr(todo, key, value)
+    todo.priority_rank = PRIORITY_ORDER.get(todo.priority, 0)
+    if data.get("tags") is not None:
+        replace_tags(db, todo.user_id, todo.id, todo.tags)
     if todo.status == "done" and todo.completed_at is None:
         todo.completed_at = datetime.utcnow()
     db.add(todo)
+    apply_stats_delta(db, before, todo_contributions([todo]))
     db.commit()
     db.refresh(todo)
+    publish_change(todo.user_id, "todo", "updated", [todo.id])
     return todo
 
 
 def soft_delete_todo(db: Session, todo: Todo):
+    before = todo_contributions([todo])
+    todo.change_seq = bump_data_version(db, todo.user_id)
     todo.is_deleted = True
     todo.deleted_at = datetime.utcnow()
     db.add(todo)
+    apply_stats_delta(db, before, todo_contributions([todo]))
+    user_id, todo_id = todo.user_id, todo.id
     db.commit()
+    publish_change(user_id, "todo", "deleted", [todo_id])
 
 
 def restore_todo(db: Session, todo: Todo):
+    before = todo_contributions([todo])
+    todo.change_seq = bump_data_version(db, todo.user_id)
     todo.is_deleted = False
     todo.deleted_at = None
     db.add(todo)
+    apply_stats_delta(db, before, todo_contributions([todo]))
+    user_id, todo_id = todo.user_id, todo.id
     db.commit()
+    publish_change(user_id, "todo", "restored", [todo_id])
 
 
 def purge_todo(db: Session, todo: Todo):
+    before = todo_contributions([todo])
+    user_id, todo_id = todo.user_id, todo.id
+    seq = bump_data_version(db, user_id)
     db.delete(todo)
+    delete_tags(db, [todo_id])
+    apply_stats_delta(db, before, Counter())
+    record_tombstones(db, user_id, "todo", [todo_id], seq)
     db.commit()
-
-
-def clear_done(db: Session, user_id: str):
-    q = db.query(Todo).filter(
-        Todo.user_id == user_id,
-        Todo.status == "done",
-        Todo.is_deleted.is_(False),
+    publish_change(user_id, "todo", "purged", [todo_id])
+
+
+def _bulk_by_chunks(db: Session, user_id: str, criteria: list, make_statement, op: str, deletes: bool = False) -> int:
+    affected = 0
+    while True:
+        rows = db.query(Todo.id, *STAT_FIELDS).filter(*criteria).limit(BULK_CHUNK_SIZE).all()
+        if not rows:
+            break
+        ids = [row.id for row in rows]
+        seq = bump_data_version(db, user_id)
+        statement = make_statement(Todo.id.in_(ids), *criteria)
+        if not deletes:
+            statement = statement.values(change_seq=seq)
+        result = db.execute(statement.execution_options(synchronize_session=False))
+        if not result.rowcount:
+            # every row of the chunk changed meanwhile; the next SELECT
+            # re-evaluates the criteria, so later rows are still processed
+            db.rollback()
+            continue
+        # The statement repeats the criteria, so rows changed since the
+        # SELECT are skipped: bookkeeping covers only the rows it hit, found
+        # as the ones gone (deletes) or stamped with this write's change_seq.
+        if deletes:
+            survivors = set(db.execute(select(Todo.id).where(Todo.id.in_(ids))).scalars()) if result.rowcount < len(ids) else set()
+            rows = [row for row in rows if row.id not in survivors]
+            ids = [row.id for row in rows]
+            apply_stats_delta(db, todo_contributions(rows), Counter())
+            delete_tags(db, ids)
+            record_tombstones(db, user_id, "todo", ids, seq)
+        else:
+            after = stat_rows(db, user_id, ids, seq)
+            hit = {row.id for row in after}
+            rows = [row for row in rows if row.id in hit]
+            ids = [row.id for row in rows]
+            apply_stats_delta(db, todo_contributions(rows), todo_contributions(after))
+        db.commit()
+        publish_change(user_id, "todo", op, ids)
+        affected += result.rowcount
+    return affected
+
+
+def clear_done(db: Session, user_id: str) -> int:
+    criteria = [Todo.user_id == user_id, Todo.status == "done", Todo.is_deleted.is_(False)]
+    now = datetime.utcnow()
+    return _bulk_by_chunks(
+        db, user_id, criteria, lambda *where: update(Todo).where(*where).values(is_deleted=True, deleted_at=now), "deleted"
     )
-    for item in q.all():
-        item.is_deleted = True
-        item.deleted_at = datetime.utcnow()
-        db.add(item)
-    db.commit()
-
-
-def batch_status(db: Session, user_id: str, ids: list[str], status: str):
-    q = db.query(Todo).filter(Todo.user_id == user_id, Todo.id.in_(ids))
-    for item in q.all():
-        item.status = status
-        if status == "done" and item.completed_at is None:
-            item.completed_at = datetime.utcnow()
-        db.add(item)
-    db.commit()
-
 
-def list_trash(db: Session, user_id: str, page: int, page_size: int):
-    q = db.query(Todo).filter(Todo.user_id == user_id, Todo.is_deleted.is_(True))
-    total = q.count()
-    items = q.order_by(Todo.deleted_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
-    return items, total
 
-
-def clear_trash(db: Session, user_id: str):
-    q = db.query(Todo).filter(Todo.user_id == user_id, Todo.is_deleted.is_(True))
-    for item in q.all():
-        db.delete(item)
-    db.commit()
+def batch_status(db: Session, user_id: str, ids: list[str], status: str) -> int:
+    values = {"status": status}
+    if status == "done":
+        values["completed_at"] = func.coalesce(Todo.completed_at, datetime.utcnow())
+    ids = list(dict.fromkeys(ids))
+    affected = 0
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        chunk = ids[start:start + BULK_CHUNK_SIZE]
+        seq = bump_data_version(db, user_id)
+        before = stat_rows(db, user_id, chunk)
+        result = db.execute(
+            update(Todo)
+            .where(Todo.user_id == user_id, Todo.id.in_(chunk))
+            .values(**values, change_seq=seq)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            # none of the ids are (still) the user's: no write, no event
+            db.rollback()
+            continue
+        # stats and the event cover only the user's rows the UPDATE hit
+        after = stat_rows(db, user_id, chunk, seq)
+        hit = {row.id for row in after}
+        apply_stats_delta(db, todo_contributions([row for row in before if row.id in hit]), todo_contributions(after))
+        db.commit()
+        publish_change(user_id, "todo", "updated", [row.id for row in after])
+        affected += result.rowcount
+    return affected
+
+
+def unassign_category(db: Session, user_id: str, category_id: str, seq: int):
+    # One UPDATE on the (user_id, category_id) index range, trash included, in
+    # the caller's transaction (crud.category.delete_category) at its
+    # change_seq, so the category and its assignments go together.
+    db.execute(
+        update(Todo)
+        .where(Todo.user_id == user_id, Todo.category_id == category_id)
+        .values(category_id=None, change_seq=seq)
+        .execution_options(synchronize_session=False)
+    )
 
 
-def stats_summary(db: Session, user_id: str):
-    total = db.query(func.count(Todo.id)).filter(Todo.user_id == user_id, Todo.is_deleted.is_(False)).scalar() or 0
-    today = date.today()
-    today_completed = (
-        db.query(func.count(Todo.id))
-        .filter(Todo.user_id == user_id, Todo.status == "done", func.date(Todo.completed_at) == today)
-        .scalar()
-        or 0
+def list_trash(
+    db: Session,
+    user_id: str,
+    page: int,
+    page_size: int,
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    fields: tuple[str, ...] | None = None,
+):
+    q = db.query(*todo_columns(fields, "deleted_at")).filter(Todo.user_id == user_id, Todo.is_deleted.is_(True))
+    if with_total is None:
+        with_total = not cursor
+    total = q.count() if with_total else None
+    items, next_cursor = _keyset_page(
+        q, Todo.deleted_at, "deleted_at", "desc", cursor, page, page_size, lambda todo: todo.deleted_at
     )
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    week_start_dt = datetime.combine(week_start, time.min)
-    week_end_dt = datetime.combine(week_end, time.max)
-    week_done = (
-        db.query(func.count(Todo.id))
-        .filter(Todo.user_id == user_id, Todo.status == "done", Todo.completed_at >= week_start_dt, Todo.completed_at <= week_end_dt)
-        .scalar()
-        or 0
+    return items, total, next_cursor
+
+
+def clear_trash(db: Session, user_id: str) -> int:
+    criteria = [Todo.user_id == user_id, Todo.is_deleted.is_(True)]
+    return _bulk_by_chunks(db, user_id, criteria, lambda *where: delete(Todo).where(*where), "purged", deletes=True)
+
+
+def expired_trash(db: Session, cutoff: datetime, limit: int, after: tuple | None = None):
+    # Trash deleted before `cutoff` across all users, oldest first, resuming
+    # after the (deleted_at, id) of the previous chunk.
+    q = db.query(Todo.id, *STAT_FIELDS).filter(Todo.is_deleted.is_(True), Todo.deleted_at < cutoff)
+    if after:
+        deleted_at, todo_id = after
+        q = q.filter(or_(Todo.deleted_at > deleted_at, and_(Todo.deleted_at == deleted_at, Todo.id > todo_id)))
+    return q.order_by(Todo.deleted_at.asc(), Todo.id.asc()).limit(limit).all()
+
+
+def purge_expired_chunk(db: Session, cutoff: datetime, limit: int, after: tuple | None = None) -> tuple[int, tuple | None]:
+    # Deletes one chunk by primary key, in id order, and commits it. The
+    # DELETE repeats the expiry criteria so a row restored meanwhile survives,
+    # and stats are adjusted only for the rows that are actually gone.
+    rows = expired_trash(db, cutoff, limit, after)
+    if not rows:
+        return 0, None
+    ids = sorted(row.id for row in rows)
+    result = db.execute(
+        delete(Todo)
+        .where(Todo.id.in_(ids), Todo.is_deleted.is_(True), Todo.deleted_at < cutoff)
+        .execution_options(synchronize_session=False)
     )
-    week_total = (
-        db.query(func.count(Todo.id))
-        .filter(Todo.user_id == user_id, Todo.created_at >= week_start_dt, Todo.created_at <= week_end_dt, Todo.is_deleted.is_(False))
-        .scalar()
-        or 0
-    )
-    rate = round(week_done / week_total, 2) if week_total else 0.0
-    return {"total_todos": total, "today_completed": today_completed, "week_completion_rate": rate}
+    gone = []
+    if result.rowcount:
+        survivors = set(db.execute(select(Todo.id).where(Todo.id.in_(ids))).scalars()) if result.rowcount < len(ids) else set()
+        gone = [row for row in rows if row.id not in survivors]
+        delete_tags(db, [row.id for row in gone])
+        apply_stats_delta(db, todo_contributions(gone), Counter())
+    by_user = {}
+    for row in gone:
+        by_user.setdefault(row.user_id, []).append(row.id)
+    for user_id in sorted(by_user):
+        record_tombstones(db, user_id, "todo", by_user[user_id], bump_data_version(db, user_id))
+    db.commit()
+    for user_id, todo_ids in by_user.items():
+        publish_change(user_id, "todo", "purged", todo_ids)
+    return result.rowcount, (rows[-1].deleted_at, rows[-1].id)
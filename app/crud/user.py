@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.core.security import hash_password
+from app.core.security import invalidate_user
+from app.crud.version import bump_data_version
 import uuid
 
 
@@ -12,15 +13,30 @@ def get_user(db: Session, user_id: str):
     return db.query(User).filter(User.id == user_id).first()
 
 
-def create_user(db: Session, username: str, password: str, email: str | None, role: str | None = None):
+def create_user(db: Session, username: str, password_hash: str, email: str | None, role: str | None = None):
     user = User(
         id=str(uuid.uuid4()),
         username=username,
         email=email,
         role=role or "user",
-        password_hash=hash_password(password),
+        password_hash=password_hash,
     )
     db.add(user)
+    # also keeps the user's own reads on the primary until replicas catch up
+    bump_data_version(db, user.id)
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
+    return user
+
+
+def update_user(db: Session, user: User, data: dict):
+    for key, value in data.items():
+        setattr(user, key, value)
+    db.add(user)
+    # also keeps the user's own reads on the primary until replicas catch up
+    bump_data_version(db, user.id)
+    db.commit()
+    db.refresh(user)
+    invalidate_user(user.id)
     return user
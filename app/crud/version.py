@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.database import upsert_add
+from app.core.routing import mark_write
+from app.models.sync import SyncTombstone
+from app.models.version import UserDataVersion
+
+
+def get_data_version(db: Session, user_id: str) -> int:
+    version = db.execute(select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)).scalar()
+    return version or 0
+
+
+def bump_data_version(db: Session, user_id: str) -> int:
+    # Call in the transaction of every write to a user's todos or categories,
+    # so readers never see new data under an old version. last_write_at
+    # keeps the user's reads on the primary for the replica stickiness window.
+    # Returns the new version, which the write stores as the rows' change_seq:
+    # the version row stays locked until the commit, so a user's sequence
+    # numbers become visible in order (delta sync relies on this).
+    upsert_add(
+        db,
+        UserDataVersion,
+        [{"user_id": user_id, "version": 1, "last_write_at": datetime.utcnow()}],
+        ("version",),
+        replace=("last_write_at",),
+    )
+    mark_write(user_id)
+    return db.execute(select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)).scalar_one()
+
+
+def record_tombstones(db: Session, user_id: str, entity: str, ids: list[str], seq: int):
+    # Hard deletes leave a tombstone at the write's change_seq for delta sync.
+    if ids:
+        now = datetime.utcnow()
+        db.execute(
+            insert(SyncTombstone),
+            [{"user_id": user_id, "change_seq": seq, "entity": entity, "entity_id": entity_id, "created_at": now} for entity_id in ids],
+        )
@@ -1,19 +1,26 @@
-from fastapi import FastAPI, Request
+import logging
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import HTTPException as FastAPIHTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from app.core.config import get_settings
-from sqlalchemy import inspect, text
-from app.core.database import Base, engine, SessionLocal
-from app.models.user import User
-from app.crud.user import get_user_by_username, create_user
-from app.core.security import hash_password
-from app.api.routes import auth, users, categories, todos, trash, stats
+from app.bootstrap import bootstrap
+from app.core.database import engine
+from app.core.events import close_streams_on_exit
+from app.core.metrics import MetricsMiddleware, render as render_metrics
+from app.core.profiling import ProfilerMiddleware
+from app.core.reminders import start_scheduler, stop_scheduler
+from app.core.trash_purge import start_purger, stop_purger
+from app.migrations import pending
+from app.core.security import RedactQueryTokens, shutdown_password_pool
+from app.api.routes import auth, users, categories, todos, trash, stats, system, events, tags
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+logging.getLogger("uvicorn.access").addFilter(RedactQueryTokens())
 
 app = FastAPI(title="Todo API", version="0.1.0")
 
@@ -27,12 +34,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.profile_requests:
+    app.add_middleware(ProfilerMiddleware)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(categories.router, prefix="/api/v1")
 app.include_router(todos.router, prefix="/api/v1")
+app.include_router(tags.router, prefix="/api/v1")
 app.include_router(trash.router, prefix="/api/v1")
 app.include_router(stats.router, prefix="/api/v1")
+app.include_router(system.router, prefix="/api/v1")
+app.include_router(events.router, prefix="/api/v1")
+
+
+if settings.metrics_enabled:
+    # Registered before the static mount, which would otherwise catch it.
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 
 # Serve built frontend (single container deployment)
 static_dir = Path(__file__).resolve().parents[1] / "static"
@@ -41,6 +65,8 @@ if static_dir.exists():
 
 @app.exception_handler(FastAPIHTTPException)
 def http_exception_handler(request: Request, exc: FastAPIHTTPException):
+    if exc.status_code == 304:
+        return Response(status_code=304, headers=exc.headers)
     mapping = {401: 40101, 403: 40301, 404: 40401}
     code = mapping.get(exc.status_code, 40001)
     message = exc.detail if isinstance(exc.detail, str) else "error"
@@ -54,48 +80,44 @@ def validation_exception_handler(request: Request, exc: RequestValidationError):
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
-    ensure_user_role_column()
-    ensure_superadmin()
+    # Schema and admin bootstrap run as a separate deploy step (python -m
+    # app.migrations bootstrap); workers only check that it happened.
+    if settings.bootstrap_on_startup:
+        bootstrap()
+        return
+    missing = pending(engine)
+    if missing:
+        logger.warning("database schema is behind, pending revisions: %s", ", ".join(missing))
 
 
-def ensure_user_role_column():
-    inspector = inspect(engine)
-    if "users" not in inspector.get_table_names():
-        return
-    columns = [col["name"] for col in inspector.get_columns("users")]
-    if "role" not in columns:
-        with engine.begin() as conn:
-            conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR(32) NOT NULL DEFAULT 'user'"))
-
-
-def ensure_superadmin():
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.role == "superadmin").first()
-        if user:
-            if settings.admin_force_reset:
-                user.username = settings.admin_username
-                user.email = settings.admin_email
-                user.password_hash = hash_password(settings.admin_password)
-                db.add(user)
-                db.commit()
-            return
-        existing = get_user_by_username(db, settings.admin_username)
-        if existing:
-            existing.role = "superadmin"
-            if settings.admin_force_reset:
-                existing.email = settings.admin_email
-                existing.password_hash = hash_password(settings.admin_password)
-            db.add(existing)
-            db.commit()
-            return
-        create_user(
-            db,
-            settings.admin_username,
-            settings.admin_password,
-            settings.admin_email,
-            role="superadmin",
-        )
-    finally:
-        db.close()
+@app.on_event("startup")
+async def start_reminders():
+    if settings.reminders_enabled:
+        start_scheduler()
+
+
+@app.on_event("startup")
+async def start_event_streams():
+    if settings.events_enabled:
+        close_streams_on_exit()
+
+
+@app.on_event("startup")
+async def start_trash_purge():
+    if settings.trash_retention_days > 0 or settings.sync_tombstone_days > 0:
+        start_purger()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_password_pool()
+
+
+@app.on_event("shutdown")
+async def stop_reminders():
+    await stop_scheduler()
+
+
+@app.on_event("shutdown")
+async def stop_trash_purge():
+    await stop_purger()
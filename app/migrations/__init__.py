@@ -0,0 +1,101 @@
+import importlib
+import pkgutil
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import Table, Column, String, DateTime, MetaData, inspect, select, insert, delete
+from app.core.database import named_lock
+from app.migrations import versions
+
+LOCK_NAME = "todo_schema_bootstrap"
+
+metadata = MetaData()
+
+schema_revisions = Table(
+    "schema_revisions",
+    metadata,
+    Column("revision", String(32), primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def load_revisions():
+    names = sorted(info.name for info in pkgutil.iter_modules(versions.__path__))
+    return [importlib.import_module(f"{versions.__name__}.{name}") for name in names]
+
+
+def applied_revisions(conn) -> list[str]:
+    schema_revisions.create(conn, checkfirst=True)
+    rows = conn.execute(select(schema_revisions.c.revision).order_by(schema_revisions.c.revision))
+    return list(rows.scalars())
+
+
+def pending(engine) -> list[str]:
+    # Read-only (no CREATE TABLE), for the API startup check.
+    with engine.connect() as conn:
+        applied = set()
+        if inspect(conn).has_table(schema_revisions.name):
+            applied = set(conn.execute(select(schema_revisions.c.revision)).scalars())
+    return [module.revision for module in load_revisions() if module.revision not in applied]
+
+
+@contextmanager
+def lock(engine, timeout: int = 300):
+    # Serializes schema changes and bootstrap across processes.
+    with named_lock(engine, LOCK_NAME, timeout) as acquired:
+        if not acquired:
+            raise TimeoutError("migration_lock_timeout")
+        yield
+
+
+def current(engine) -> str | None:
+    with engine.begin() as conn:
+        applied = applied_revisions(conn)
+    return applied[-1] if applied else None
+
+
+def history(engine) -> list[dict]:
+    with engine.begin() as conn:
+        applied = set(applied_revisions(conn))
+    return [
+        {"revision": module.revision, "description": module.description, "applied": module.revision in applied}
+        for module in load_revisions()
+    ]
+
+
+def upgrade(engine, target: str | None = None) -> list[str]:
+    revisions = load_revisions()
+    if target and target not in {module.revision for module in revisions}:
+        raise ValueError("unknown_revision")
+    done = []
+    for module in revisions:
+        with engine.begin() as conn:
+            if module.revision not in applied_revisions(conn):
+                module.upgrade(conn)
+                conn.execute(
+                    insert(schema_revisions).values(
+                        revision=module.revision,
+                        description=module.description,
+                        applied_at=datetime.utcnow(),
+                    )
+                )
+                done.append(module.revision)
+        if module.revision == target:
+            break
+    return done
+
+
+def downgrade(engine, target: str) -> list[str]:
+    revisions = load_revisions()
+    if target != "base" and target not in {module.revision for module in revisions}:
+        raise ValueError("unknown_revision")
+    done = []
+    for module in reversed(revisions):
+        if module.revision == target:
+            break
+        with engine.begin() as conn:
+            if module.revision in applied_revisions(conn):
+                module.downgrade(conn)
+                conn.execute(delete(schema_revisions).where(schema_revisions.c.revision == module.revision))
+                done.append(module.revision)
+    return done
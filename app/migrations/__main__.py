@@ -0,0 +1,76 @@
+import argparse
+import json
+import sys
+from app.bootstrap import bootstrap
+from app.core.config import get_settings
+from app.core.database import SessionLocal, engine
+from app.core.trash_purge import purge_expired_trash
+from app.crud.stats import backfill_daily_stats
+from app.migrations import current, downgrade, history, lock, upgrade
+from app.migrations.plans import check_plans
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="apply pending revisions")
+    up.add_argument("target", nargs="?")
+    sub.add_parser("bootstrap", help="apply pending revisions and create or reset the superadmin")
+    down = sub.add_parser("downgrade", help="revert revisions newer than target ('base' reverts all)")
+    down.add_argument("target")
+    sub.add_parser("current", help="print the latest applied revision")
+    sub.add_parser("history", help="list revisions and whether they are applied")
+    plans = sub.add_parser("explain", help="EXPLAIN the todo hot-path queries")
+    plans.add_argument("--user-id", default="-")
+    plans.add_argument("--strict", action="store_true", help="exit 1 on full scans or unexpected filesorts")
+    backfill = sub.add_parser("backfill-stats", help="rebuild user_daily_stats from the todos table")
+    backfill.add_argument("--user-id")
+    purge = sub.add_parser("purge-trash", help="delete trash older than trash_retention_days now")
+    purge.add_argument("--days", type=int, help="override trash_retention_days")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        with lock(engine):
+            applied = upgrade(engine, args.target)
+        for revision in applied:
+            print(f"applied {revision}")
+    elif args.command == "bootstrap":
+        for revision in bootstrap():
+            print(f"applied {revision}")
+        print("superadmin ready")
+    elif args.command == "downgrade":
+        with lock(engine):
+            reverted = downgrade(engine, args.target)
+        for revision in reverted:
+            print(f"reverted {revision}")
+    elif args.command == "current":
+        print(current(engine) or "base")
+    elif args.command == "history":
+        for item in history(engine):
+            mark = "x" if item["applied"] else " "
+            print(f"[{mark}] {item['revision']} {item['description']}")
+    elif args.command == "explain":
+        report = check_plans(engine, args.user_id)
+        print(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+        if args.strict and not all(item["ok"] for item in report):
+            return 1
+    elif args.command == "backfill-stats":
+        with SessionLocal() as db:
+            print(f"wrote {backfill_daily_stats(db, args.user_id)} rows")
+    elif args.command == "purge-trash":
+        settings = get_settings()
+        days = settings.trash_retention_days if args.days is None else args.days
+        if days <= 0 and settings.sync_tombstone_days <= 0:
+            print("trash retention is disabled")
+            return 1
+        report = purge_expired_trash(
+            days, settings.trash_purge_chunk_size, settings.trash_purge_pause_seconds, settings.sync_tombstone_days
+        )
+        print(json.dumps(report))
+        if report["skipped"]:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+from sqlalchemy import Index, MetaData, Table, inspect, text
+
+
+def _table(conn, name: str) -> Table:
+    return Table(name, MetaData(), autoload_with=conn)
+
+
+def has_table(conn, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def has_column(conn, table: str, column: str) -> bool:
+    return column in {col["name"] for col in inspect(conn).get_columns(table)}
+
+
+def has_index(conn, table: str, name: str) -> bool:
+    return name in {idx["name"] for idx in inspect(conn).get_indexes(table)}
+
+
+def add_column(conn, table: str, column: str, ddl: str):
+    if not has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def drop_column(conn, table: str, column: str):
+    if has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+
+
+def create_index(conn, name: str, table: str, columns: list[str], unique: bool = False):
+    if has_index(conn, table, name):
+        return
+    reflected = _table(conn, table)
+    Index(name, *[reflected.c[col] for col in columns], unique=unique).create(conn)
+
+
+def drop_index(conn, name: str, table: str):
+    for index in _table(conn, table).indexes:
+        if index.name == name:
+            index.drop(conn)
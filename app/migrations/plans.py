@@ -0,0 +1,80 @@
+import re
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.crud.category import list_categories, list_categories_with_counts
+from app.crud.stats import daily_stats, stats_summary
+from app.crud.sync import changes_since
+from app.crud.tag import tag_counts
+from app.crud.todo import expired_trash, list_todos, list_trash
+
+# (name, call, allow_filesort)
+PROBES = [
+    ("todos_default", lambda db, uid: list_todos(db, uid, {}, 1, 20), False),
+    ("todos_status", lambda db, uid: list_todos(db, uid, {"status": "todo"}, 1, 20), False),
+    ("todos_due_week", lambda db, uid: list_todos(db, uid, {"due": "week", "sort_by": "due_date", "sort_order": "asc"}, 1, 20), False),
+    ("todos_due_sort", lambda db, uid: list_todos(db, uid, {"sort_by": "due_date"}, 1, 20), False),
+    ("todos_category", lambda db, uid: list_todos(db, uid, {"category_id": "-"}, 1, 20), True),
+    ("todos_keyword", lambda db, uid: list_todos(db, uid, {"keyword": "keyword", "sort_by": "relevance"}, 1, 20), True),
+    ("todos_tag", lambda db, uid: list_todos(db, uid, {"tags": ["tag"]}, 1, 20), False),
+    ("todos_tag_all", lambda db, uid: list_todos(db, uid, {"tags": ["tag", "other"], "tag_match": "all"}, 1, 20), False),
+    ("todos_priority_sort", lambda db, uid: list_todos(db, uid, {"sort_by": "priority"}, 1, 20), False),
+    ("trash", lambda db, uid: list_trash(db, uid, 1, 20), False),
+    ("trash_expiry", lambda db, uid: expired_trash(db, datetime.utcnow(), 500), False),
+    ("stats_summary", lambda db, uid: stats_summary(db, uid), False),
+    ("stats_daily", lambda db, uid: daily_stats(db, uid, date.today() - timedelta(days=30), date.today()), False),
+    ("categories", lambda db, uid: list_categories(db, uid), False),
+    ("categories_counts", lambda db, uid: list_categories_with_counts(db, uid), False),
+    ("tags", lambda db, uid: tag_counts(db, uid), True),
+    ("sync_changes", lambda db, uid: changes_since(db, uid, (0, 1, "-"), 500), False),
+]
+
+
+def capture(engine, call, user_id: str) -> list[tuple]:
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with Session(engine) as db:
+            call(db, user_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return statements
+
+
+def explain(conn, statement: str, parameters) -> dict:
+    tables = set(Base.metadata.tables)
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).mappings().all()
+        plan = [row["detail"] for row in rows]
+        full_scan = any(
+            (m := re.match(r"SCAN (\w+)", detail)) and m.group(1) in tables and "USING" not in detail
+            for detail in plan
+        )
+        filesort = any("USE TEMP B-TREE FOR ORDER BY" in detail for detail in plan)
+    else:
+        rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+        plan = [dict(row) for row in rows]
+        full_scan = any(row.get("type") == "ALL" and row.get("table") in tables for row in plan)
+        filesort = any("Using filesort" in (row.get("Extra") or "") for row in plan)
+    return {"plan": plan, "full_scan": full_scan, "filesort": filesort}
+
+
+def check_plans(engine, user_id: str = "-") -> list[dict]:
+    report = []
+    for name, call, allow_filesort in PROBES:
+        with engine.connect() as conn:
+            for statement, parameters in capture(engine, call, user_id):
+                result = explain(conn, statement, parameters)
+                result.update(
+                    probe=name,
+                    statement=statement,
+                    ok=not result["full_scan"] and (allow_filesort or not result["filesort"]),
+                )
+                report.append(result)
+    return report
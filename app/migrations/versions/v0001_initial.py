@@ -0,0 +1,61 @@
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, JSON, MetaData, String, Table, func
+
+revision = "0001"
+description = "create users, categories and todos"
+
+metadata = MetaData()
+
+users = Table(
+    "users",
+    metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("username", String(64), unique=True, index=True, nullable=False),
+    Column("email", String(128), nullable=True),
+    Column("avatar_url", String(255), nullable=True),
+    Column("role", String(32), nullable=False, default="user"),
+    Column("password_hash", String(255), nullable=False),
+    Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime, server_default=func.now(), nullable=False),
+)
+
+categories = Table(
+    "categories",
+    metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("user_id", String(36), index=True, nullable=False),
+    Column("name", String(64), nullable=False),
+    Column("color", String(16), nullable=False),
+    Column("order", Integer, default=0, nullable=False),
+    Column("is_system", Boolean, default=False, nullable=False),
+    Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime, server_default=func.now(), nullable=False),
+)
+
+todos = Table(
+    "todos",
+    metadata,
+    Column("id", String(36), primary_key=True, index=True),
+    Column("user_id", String(36), index=True, nullable=False),
+    Column("title", String(128), nullable=False),
+    Column("description", String(512), nullable=True),
+    Column("priority", String(16), nullable=False, default="medium"),
+    Column("status", String(16), nullable=False, default="todo"),
+    Column("due_date", Date, nullable=True),
+    Column("remind_at", DateTime, nullable=True),
+    Column("category_id", String(36), nullable=True),
+    Column("tags", JSON, nullable=True),
+    Column("is_deleted", Boolean, default=False, nullable=False),
+    Column("deleted_at", DateTime, nullable=True),
+    Column("completed_at", DateTime, nullable=True),
+    Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime, server_default=func.now(), nullable=False),
+)
+
+
+def upgrade(conn):
+    # Databases created by the old create_all() startup already have these.
+    metadata.create_all(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    metadata.drop_all(conn, checkfirst=True)
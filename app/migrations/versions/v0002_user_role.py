@@ -0,0 +1,12 @@
+from app.migrations.ops import add_column
+
+revision = "0002"
+description = "add users.role for databases that predate it"
+
+
+def upgrade(conn):
+    add_column(conn, "users", "role", "VARCHAR(32) NOT NULL DEFAULT 'user'")
+
+
+def downgrade(conn):
+    pass
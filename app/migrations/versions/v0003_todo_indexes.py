@@ -0,0 +1,41 @@
+from app.migrations.ops import create_index, drop_index
+
+revision = "0003"
+description = "composite indexes for todo list, trash and stats queries"
+
+INDEXES = [
+    # list_todos default order and cursor seek, stats total/week_total
+    ("ix_todos_user_deleted_created", "todos", ["user_id", "is_deleted", "created_at", "id"]),
+    # list_todos filtered by status
+    ("ix_todos_user_deleted_status_created", "todos", ["user_id", "is_deleted", "status", "created_at", "id"]),
+    # list_todos due filters and sort_by=due_date
+    ("ix_todos_user_deleted_due", "todos", ["user_id", "is_deleted", "due_date", "id"]),
+    # category filter and unassign on category delete
+    ("ix_todos_user_category", "todos", ["user_id", "category_id"]),
+    # list_trash
+    ("ix_todos_user_deleted_deleted_at", "todos", ["user_id", "is_deleted", "deleted_at", "id"]),
+    # stats today_completed / week_done
+    ("ix_todos_user_status_completed", "todos", ["user_id", "status", "completed_at"]),
+    # list_categories
+    ("ix_categories_user_order", "categories", ["user_id", "order"]),
+]
+
+# Left-prefixes of the composites above.
+REDUNDANT = [
+    ("ix_todos_user_id", "todos", ["user_id"]),
+    ("ix_categories_user_id", "categories", ["user_id"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+    for name, table, _ in REDUNDANT:
+        drop_index(conn, name, table)
+
+
+def downgrade(conn):
+    for name, table, columns in REDUNDANT:
+        create_index(conn, name, table, columns)
+    for name, table, _ in INDEXES:
+        drop_index(conn, name, table)
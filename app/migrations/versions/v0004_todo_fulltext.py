@@ -0,0 +1,49 @@
+from sqlalchemy import text
+from app.migrations.ops import drop_index, has_index, has_table
+
+revision = "0004"
+description = "full-text index on todo title/description"
+
+FULLTEXT_INDEX = "ft_todos_title_description"
+
+# SQLite only stands in for MySQL locally. The FTS5 table references todos by
+# rowid; run "INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')" after a VACUUM.
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE todos_fts USING fts5(title, description, content='todos', tokenize='trigram')",
+    """CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END""",
+    """CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    END""",
+    """CREATE TRIGGER todos_fts_au AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END""",
+    "INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS todos_fts_ai",
+    "DROP TRIGGER IF EXISTS todos_fts_ad",
+    "DROP TRIGGER IF EXISTS todos_fts_au",
+    "DROP TABLE IF EXISTS todos_fts",
+]
+
+
+def upgrade(conn):
+    if conn.dialect.name == "sqlite":
+        if not has_table(conn, "todos_fts"):
+            for statement in SQLITE_UPGRADE:
+                conn.execute(text(statement))
+    elif conn.dialect.name == "mysql":
+        if not has_index(conn, "todos", FULLTEXT_INDEX):
+            conn.execute(text(f"ALTER TABLE todos ADD FULLTEXT INDEX {FULLTEXT_INDEX} (title, description) WITH PARSER ngram"))
+
+
+def downgrade(conn):
+    if conn.dialect.name == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            conn.execute(text(statement))
+    elif conn.dialect.name == "mysql":
+        drop_index(conn, FULLTEXT_INDEX, "todos")
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table, text
+
+revision = "0005"
+description = "per-user daily stats rollup"
+
+metadata = MetaData()
+
+user_daily_stats = Table(
+    "user_daily_stats",
+    metadata,
+    Column("user_id", String(36), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("created", Integer, nullable=False, default=0),
+    Column("completed", Integer, nullable=False, default=0),
+    Column("deleted", Integer, nullable=False, default=0),
+)
+
+BACKFILL = """
+INSERT INTO user_daily_stats (user_id, day, created, completed, deleted)
+SELECT user_id, day, SUM(created), SUM(completed), SUM(deleted) FROM (
+    SELECT user_id, DATE(created_at) AS day, 1 AS created, 0 AS completed, 0 AS deleted
+    FROM todos WHERE is_deleted = 0
+    UNION ALL
+    SELECT user_id, DATE(completed_at), 0, 1, 0
+    FROM todos WHERE status = 'done' AND completed_at IS NOT NULL
+    UNION ALL
+    SELECT user_id, DATE(deleted_at), 0, 0, 1
+    FROM todos WHERE is_deleted = 1 AND deleted_at IS NOT NULL
+) AS events
+GROUP BY user_id, day
+"""
+
+
+def upgrade(conn):
+    user_daily_stats.create(conn, checkfirst=True)
+    conn.execute(text("DELETE FROM user_daily_stats"))
+    conn.execute(text(BACKFILL))
+
+
+def downgrade(conn):
+    user_daily_stats.drop(conn, checkfirst=True)
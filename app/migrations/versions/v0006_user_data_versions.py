@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, MetaData, String, Table
+
+revision = "0006"
+description = "per-user data version for conditional GET"
+
+metadata = MetaData()
+
+user_data_versions = Table(
+    "user_data_versions",
+    metadata,
+    Column("user_id", String(36), primary_key=True),
+    Column("version", BigInteger, nullable=False, default=0),
+)
+
+
+def upgrade(conn):
+    user_data_versions.create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    user_data_versions.drop(conn, checkfirst=True)
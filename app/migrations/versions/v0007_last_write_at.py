@@ -0,0 +1,12 @@
+from app.migrations.ops import add_column, drop_column
+
+revision = "0007"
+description = "user_data_versions.last_write_at for replica read-your-writes"
+
+
+def upgrade(conn):
+    add_column(conn, "user_data_versions", "last_write_at", "DATETIME NULL")
+
+
+def downgrade(conn):
+    drop_column(conn, "user_data_versions", "last_write_at")
@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import text
+from app.migrations.ops import add_column, create_index, drop_column, drop_index
+
+revision = "0008"
+description = "reminder delivery state and due-reminder index on todos"
+
+COLUMNS = [
+    ("reminded_at", "DATETIME NULL"),
+    ("reminder_claim", "VARCHAR(36) NULL"),
+    ("reminder_claimed_at", "DATETIME NULL"),
+]
+
+
+def upgrade(conn):
+    for column, ddl in COLUMNS:
+        add_column(conn, "todos", column, ddl)
+    # reminders already in the past count as handled; do not fire them all at once
+    conn.execute(
+        text("UPDATE todos SET reminded_at = remind_at WHERE remind_at IS NOT NULL AND remind_at < :now"),
+        {"now": datetime.utcnow()},
+    )
+    # pending reminders (reminded_at IS NULL) in remind_at order
+    create_index(conn, "ix_todos_reminder_due", "todos", ["reminded_at", "remind_at", "id"])
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_todos_reminder_due", "todos")
+    for column, _ in reversed(COLUMNS):
+        drop_column(conn, "todos", column)
@@ -0,0 +1,13 @@
+from app.migrations.ops import create_index, drop_index
+
+revision = "0009"
+description = "trash expiry index on todos"
+
+
+def upgrade(conn):
+    # expired trash across all users in deleted_at order, for the purger
+    create_index(conn, "ix_todos_trash_expiry", "todos", ["is_deleted", "deleted_at", "id"])
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_todos_trash_expiry", "todos")
@@ -0,0 +1,32 @@
+from sqlalchemy import BigInteger, Column, DateTime, MetaData, String, Table
+from app.migrations.ops import add_column, create_index, drop_column, drop_index
+
+revision = "0010"
+description = "change sequence on todos and categories, tombstones for delta sync"
+
+metadata = MetaData()
+
+sync_tombstones = Table(
+    "sync_tombstones",
+    metadata,
+    Column("user_id", String(36), primary_key=True),
+    Column("change_seq", BigInteger, primary_key=True),
+    Column("entity", String(16), primary_key=True),
+    Column("entity_id", String(36), primary_key=True),
+    Column("created_at", DateTime, nullable=False, index=True),
+)
+
+
+def upgrade(conn):
+    # existing rows keep 0: a client's first sync reads everything anyway
+    for table in ("todos", "categories"):
+        add_column(conn, table, "change_seq", "BIGINT NOT NULL DEFAULT 0")
+        create_index(conn, f"ix_{table}_user_change_seq", table, ["user_id", "change_seq", "id"])
+    sync_tombstones.create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    sync_tombstones.drop(conn, checkfirst=True)
+    for table in ("categories", "todos"):
+        drop_index(conn, f"ix_{table}_user_change_seq", table)
+        drop_column(conn, table, "change_seq")
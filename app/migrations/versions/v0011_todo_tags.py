@@ -0,0 +1,49 @@
+from sqlalchemy import JSON, Column, Index, MetaData, String, Table, column, insert, select, table
+
+revision = "0011"
+description = "todo_tags association table, backfilled from todos.tags"
+
+metadata = MetaData()
+
+todo_tags = Table(
+    "todo_tags",
+    metadata,
+    Column("user_id", String(36), primary_key=True),
+    Column("tag", String(64).with_variant(String(64, collation="utf8mb4_bin"), "mysql"), primary_key=True),
+    Column("todo_id", String(36), primary_key=True),
+    Index("ix_todo_tags_todo", "todo_id"),
+)
+
+todos = table("todos", column("id", String), column("user_id", String), column("tags", JSON))
+
+BATCH_SIZE = 1000
+MAX_TAG_LENGTH = 64
+
+
+def upgrade(conn):
+    todo_tags.create(conn, checkfirst=True)
+    conn.execute(todo_tags.delete())
+    last_id = ""
+    while True:
+        rows = conn.execute(
+            select(todos.c.id, todos.c.user_id, todos.c.tags)
+            .where(todos.c.tags.is_not(None), todos.c.id > last_id)
+            .order_by(todos.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        values = []
+        for row in rows:
+            # same normalization as the API applies on write; tags longer than
+            # the column stay in the JSON only
+            names = [tag.strip() for tag in row.tags or [] if isinstance(tag, str)]
+            for tag in dict.fromkeys(name for name in names if name and len(name) <= MAX_TAG_LENGTH):
+                values.append({"user_id": row.user_id, "tag": tag, "todo_id": row.id})
+        if values:
+            conn.execute(insert(todo_tags), values)
+
+
+def downgrade(conn):
+    todo_tags.drop(conn, checkfirst=True)
@@ -0,0 +1,16 @@
+from app.migrations.ops import create_index, drop_index
+
+revision = "0012"
+description = "covering index for per-category todo counts"
+
+
+def upgrade(conn):
+    # category filter, unassign on category delete and the open/done counts of
+    # GET /categories?with_counts=true without reading the rows
+    create_index(conn, "ix_todos_user_category_status", "todos", ["user_id", "category_id", "is_deleted", "status"])
+    drop_index(conn, "ix_todos_user_category", "todos")
+
+
+def downgrade(conn):
+    create_index(conn, "ix_todos_user_category", "todos", ["user_id", "category_id"])
+    drop_index(conn, "ix_todos_user_category_status", "todos")
@@ -0,0 +1,21 @@
+from sqlalchemy import text
+
+revision = "0013"
+description = "store todo sort timestamps in one text format on SQLite"
+
+# SQLite keeps datetimes as text: CURRENT_TIMESTAMP defaults as
+# "YYYY-MM-DD HH:MM:SS", values bound by the app with microseconds. Keyset
+# pagination compares the column against a bound datetime, so both have to
+# be in the latter format. MySQL stores DATETIME natively: nothing to do.
+COLUMNS = ("created_at", "deleted_at")
+
+
+def upgrade(conn):
+    if conn.dialect.name != "sqlite":
+        return
+    for column in COLUMNS:
+        conn.execute(text(f"UPDATE todos SET {column} = {column} || '.000000' WHERE length({column}) = 19"))
+
+
+def downgrade(conn):
+    pass
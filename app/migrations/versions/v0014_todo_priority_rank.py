@@ -0,0 +1,21 @@
+from sqlalchemy import text
+from app.migrations.ops import add_column, create_index, drop_column, drop_index
+
+revision = "0014"
+description = "indexed priority rank for the priority sort"
+
+
+def upgrade(conn):
+    # Sorting on a CASE over the priority name can't use an index: every
+    # page was a full scan plus a filesort. Store the rank and index it.
+    add_column(conn, "todos", "priority_rank", "SMALLINT NOT NULL DEFAULT 0")
+    conn.execute(text(
+        "UPDATE todos SET priority_rank = CASE priority "
+        "WHEN 'high' THEN 3 WHEN 'medium' THEN 2 WHEN 'low' THEN 1 ELSE 0 END"
+    ))
+    create_index(conn, "ix_todos_user_deleted_priority", "todos", ["user_id", "is_deleted", "priority_rank", "id"])
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_todos_user_deleted_priority", "todos")
+    drop_column(conn, "todos", "priority_rank")
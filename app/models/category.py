@@ -1,15 +1,21 @@
-from sqlalchemy import Column, String, DateTime, func, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, func, Integer, Boolean, Index, BigInteger
 from app.core.database import Base
 
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_user_order", "user_id", "order"),
+        Index("ix_categories_user_change_seq", "user_id", "change_seq", "id"),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
-    user_id = Column(String(36), index=True, nullable=False)
+    user_id = Column(String(36), nullable=False)
     name = Column(String(64), nullable=False)
     color = Column(String(16), nullable=False)
     order = Column(Integer, default=0, nullable=False)
     is_system = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    # the user's data version of the last write (see crud.version)
+    change_seq = Column(BigInteger, default=0, server_default="0", nullable=False)
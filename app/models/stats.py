@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Date, Integer
+from app.core.database import Base
+
+
+class UserDailyStats(Base):
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(String(36), primary_key=True)
+    day = Column(Date, primary_key=True)
+    # Active todos created on this day
+    created = Column(Integer, default=0, nullable=False)
+    # Done todos whose completed_at falls on this day
+    completed = Column(Integer, default=0, nullable=False)
+    # Todos in the trash whose deleted_at falls on this day
+    deleted = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from app.core.database import Base
+
+
+class SyncTombstone(Base):
+    # A hard-deleted todo or category, kept for delta sync clients.
+    __tablename__ = "sync_tombstones"
+
+    user_id = Column(String(36), primary_key=True)
+    change_seq = Column(BigInteger, primary_key=True)
+    entity = Column(String(16), primary_key=True)
+    entity_id = Column(String(36), primary_key=True)
+    created_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Index
+from app.core.database import Base
+
+
+class TodoTag(Base):
+    # One row per tag of a todo, mirroring Todo.tags (which stays the response
+    # shape) so tag filters and counts are index lookups instead of JSON scans.
+    __tablename__ = "todo_tags"
+    __table_args__ = (Index("ix_todo_tags_todo", "todo_id"),)
+
+    user_id = Column(String(36), primary_key=True)
+    # case-sensitive on MySQL too, like the JSON tags and SQLite
+    tag = Column(String(64).with_variant(String(64, collation="utf8mb4_bin"), "mysql"), primary_key=True)
+    todo_id = Column(String(36), primary_key=True)
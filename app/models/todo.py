@@ -1,22 +1,55 @@
-from sqlalchemy import Column, String, DateTime, func, Boolean, Date, JSON
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, func, Boolean, Date, JSON, Index, BigInteger, SmallInteger
 from app.core.database import Base
 
+PRIORITY_ORDER = {
+    "high": 3,
+    "medium": 2,
+    "low": 1,
+}
+
+
+def priority_rank_default(context):
+    return PRIORITY_ORDER.get(context.get_current_parameters().get("priority"), 0)
+
 
 class Todo(Base):
     __tablename__ = "todos"
+    __table_args__ = (
+        Index("ix_todos_user_deleted_created", "user_id", "is_deleted", "created_at", "id"),
+        Index("ix_todos_user_deleted_status_created", "user_id", "is_deleted", "status", "created_at", "id"),
+        Index("ix_todos_user_deleted_due", "user_id", "is_deleted", "due_date", "id"),
+        Index("ix_todos_user_deleted_priority", "user_id", "is_deleted", "priority_rank", "id"),
+        Index("ix_todos_user_category_status", "user_id", "category_id", "is_deleted", "status"),
+        Index("ix_todos_user_deleted_deleted_at", "user_id", "is_deleted", "deleted_at", "id"),
+        Index("ix_todos_user_status_completed", "user_id", "status", "completed_at"),
+        Index("ix_todos_reminder_due", "reminded_at", "remind_at", "id"),
+        Index("ix_todos_trash_expiry", "is_deleted", "deleted_at", "id"),
+        Index("ix_todos_user_change_seq", "user_id", "change_seq", "id"),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
-    user_id = Column(String(36), index=True, nullable=False)
+    user_id = Column(String(36), nullable=False)
     title = Column(String(128), nullable=False)
     description = Column(String(512), nullable=True)
     priority = Column(String(16), nullable=False, default="medium")
+    # PRIORITY_ORDER[priority], kept by the writers: the indexed sort key
+    priority_rank = Column(SmallInteger, nullable=False, default=priority_rank_default, server_default="0")
     status = Column(String(16), nullable=False, default="todo")
     due_date = Column(Date, nullable=True)
     remind_at = Column(DateTime, nullable=True)
+    reminded_at = Column(DateTime, nullable=True)
+    reminder_claim = Column(String(36), nullable=True)
+    reminder_claimed_at = Column(DateTime, nullable=True)
     category_id = Column(String(36), nullable=True)
     tags = Column(JSON, nullable=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
     deleted_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # set by the app rather than the server default: on SQLite CURRENT_TIMESTAMP
+    # is stored without microseconds and would not compare equal to a bound
+    # datetime (keyset pagination)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    # the user's data version of the last write (see crud.version)
+    change_seq = Column(BigInteger, default=0, server_default="0", nullable=False)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from app.core.database import Base
+
+
+class UserDataVersion(Base):
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(String(36), primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+    last_write_at = Column(DateTime, nullable=True)
@@ -1,6 +1,18 @@
-from typing import Optional, List
+from typing import Annotated, Any, Optional, List
 from datetime import date, datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, StringConstraints, field_validator
+
+# Longest tag accepted; tags are also stored one per row in todo_tags.
+MAX_TAG_LENGTH = 64
+
+Tag = Annotated[str, StringConstraints(strip_whitespace=True, max_length=MAX_TAG_LENGTH)]
+
+
+def normalize_tags(tags: list[str] | None) -> list[str] | None:
+    # Blank tags dropped, duplicates removed, first occurrence order kept.
+    if tags is None:
+        return None
+    return list(dict.fromkeys(tag for tag in tags if tag))
 
 
 class TodoCreate(BaseModel):
@@ -11,7 +23,14 @@ class TodoCreate(BaseModel):
     due_date: Optional[date] = None
     remind_at: Optional[datetime] = None
     category_id: Optional[str] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[List[Tag]] = None
+
+    _tags = field_validator("tags")(normalize_tags)
+
+
+class TodoBatchCreate(BaseModel):
+    # Items are validated one by one so errors can be reported per index.
+    items: List[Any]
 
 
 class TodoUpdate(BaseModel):
@@ -22,9 +41,11 @@ class TodoUpdate(BaseModel):
     due_date: Optional[date] = None
     remind_at: Optional[datetime] = None
     category_id: Optional[str] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[List[Tag]] = None
     completed_at: Optional[datetime] = None
 
+    _tags = field_validator("tags")(normalize_tags)
+
 
 class TodoOut(BaseModel):
     id: str
@@ -45,6 +66,31 @@ class TodoOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+TODO_FIELDS = tuple(TodoOut.model_fields)
+
+
+def parse_fields(raw: str | None) -> tuple[str, ...] | None:
+    # "fields=id,title,status" -> requested TodoOut fields in schema order.
+    if not raw:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    if not requested or requested - set(TODO_FIELDS):
+        raise ValueError("invalid_fields")
+    return tuple(name for name in TODO_FIELDS if name in requested)
+
+
+def serialize_todo(todo, fields: tuple[str, ...] | None = None) -> dict:
+    # Column projections (crud.todo.todo_columns) already have the response shape.
+    mapping = getattr(todo, "_mapping", None)
+    if fields:
+        if mapping is not None:
+            return {name: mapping[name] for name in fields}
+        return {name: getattr(todo, name) for name in fields}
+    if mapping is not None:
+        return dict(mapping)
+    return {name: getattr(todo, name) for name in TODO_FIELDS}
+
+
 class TodoBatchStatus(BaseModel):
     ids: List[str]
     status: str
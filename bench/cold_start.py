@@ -0,0 +1,105 @@
+"""API worker cold start with and without bootstrap at startup.
+
+The database is bootstrapped once (python -m app.migrations bootstrap), then
+each run starts a fresh interpreter that imports app.main, runs the startup
+handlers and serves one request, for bootstrap_on_startup false and true.
+Reports wall time per run and the import / startup split as JSON.
+
+    python -m bench.cold_start --runs 10 --rounds 12
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from bench.db_modes import percentile
+
+
+def run_child():
+    started = time.perf_counter()
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    imported = time.perf_counter()
+    with TestClient(app) as client:
+        ready = time.perf_counter()
+        client.get("/api/v1/users/me")
+    print(
+        json.dumps(
+            {
+                "import_ms": round((imported - started) * 1000, 1),
+                "startup_ms": round((ready - imported) * 1000, 1),
+            }
+        )
+    )
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(values, 50), 1),
+        "max_ms": round(max(values), 1),
+        "mean_ms": round(statistics.fmean(values), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="default: a fresh SQLite file")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    workdir = tempfile.mkdtemp(prefix="todo-cold-start-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    config = {"database_url": database_url, "bcrypt_rounds": args.rounds, "admin_force_reset": True}
+    config_path = os.path.join(workdir, "config.yaml")
+    env = {**os.environ, "TODO_CONFIG": config_path}
+    report = []
+    try:
+        for bootstrap_on_startup in (False, True):
+            with open(config_path, "w", encoding="utf-8") as f:
+                yaml.safe_dump({**config, "bootstrap_on_startup": bootstrap_on_startup}, f)
+            if not report:
+                subprocess.run([sys.executable, "-m", "app.migrations", "bootstrap"], env=env, check=True, capture_output=True)
+            walls, imports, startups = [], [], []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                child = subprocess.run(
+                    [sys.executable, "-m", "bench.cold_start", "--child"],
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                walls.append((time.perf_counter() - start) * 1000)
+                timings = json.loads(child.stdout.strip().splitlines()[-1])
+                imports.append(timings["import_ms"])
+                startups.append(timings["startup_ms"])
+            report.append(
+                {
+                    "bootstrap_on_startup": bootstrap_on_startup,
+                    "wall": summarize(walls),
+                    "import": summarize(imports),
+                    "startup": summarize(startups),
+                }
+            )
+    finally:
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
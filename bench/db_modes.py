@@ -0,0 +1,118 @@
+"""Compare request concurrency headroom of the sync and async database modes.
+
+Each mode runs in its own process against the same database with a small
+threadpool, then GET /api/v1/todos is driven at increasing concurrency.
+
+    python -m bench.db_modes --database-url sqlite:////tmp/bench.db --threadpool 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def drive(client, path: str, headers: dict, requests: int, concurrency: int) -> dict:
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+    }
+
+
+async def run_child(args) -> dict:
+    import anyio
+    import httpx
+    from app.core.config import get_settings
+    from app.bootstrap import bootstrap
+    from app.main import app
+
+    bootstrap()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+    settings = get_settings()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post(
+            "/api/v1/auth/login",
+            json={"username": settings.admin_username, "password": settings.admin_password},
+        )
+        headers = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+        listing = await client.get("/api/v1/todos", headers=headers)
+        for i in range(max(0, args.todos - listing.json()["data"]["total"])):
+            await client.post("/api/v1/todos", json={"title": f"bench {i}"}, headers=headers)
+        await drive(client, "/api/v1/todos", headers, args.concurrency[0], args.concurrency[0])
+        results = []
+        for concurrency in args.concurrency:
+            results.append(await drive(client, "/api/v1/todos", headers, args.requests, concurrency))
+    return {"mode": "async" if settings.database_async else "sync", "threadpool": args.threadpool, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=f"sqlite:///{Path(tempfile.gettempdir()) / 'todo-bench.db'}")
+    parser.add_argument("--todos", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--threadpool", type=int, default=8, help="Starlette threadpool size for both modes")
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(asyncio.run(run_child(args))))
+        return
+
+    report = []
+    for mode in ("sync", "async"):
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+            yaml.safe_dump({"database_url": args.database_url, "database_async": mode == "async"}, f)
+        try:
+            child = subprocess.run(
+                [sys.executable, "-m", "bench.db_modes", "--mode", mode, *sys.argv[1:]],
+                env={**os.environ, "TODO_CONFIG": f.name},
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        finally:
+            os.unlink(f.name)
+        report.append(json.loads(child.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
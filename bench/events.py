@@ -0,0 +1,200 @@
+"""Idle change-stream connections: server memory and event fan-out.
+
+Starts the API under uvicorn in a child process (fresh SQLite database),
+opens --connections GET /api/v1/events streams for one user in steps of
+--step, and records the server RSS after each step. The streams are then held
+idle for --hold seconds (set --heartbeat well below it so heartbeats flow),
+sampling RSS every second, and finally one todo is created and the time until
+every stream has received the change event is measured. Reports JSON.
+
+    python -m bench.events --connections 5000 --step 500 --hold 30 --heartbeat 5
+
+Each connection uses one file descriptor on both sides; the soft
+RLIMIT_NOFILE is raised to the hard limit for both processes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import yaml
+
+from bench.db_modes import percentile
+
+ADMIN_PASSWORD = "Bench@123456"
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def api(base: str, method: str, path: str, body=None, token: str | None = None) -> dict:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(base + path, data=data, headers=headers, method=method)
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def wait_ready(base: str, server: subprocess.Popen):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            urllib.request.urlopen(base + "/metrics", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+class Stream:
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.changes = 0
+        self.changed_at = None
+        self.pings = 0
+        self.task = None
+        self.writer = None
+
+    async def run(self, port: int, token: str):
+        reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.writer.write(
+            f"GET /api/v1/events?access_token={token} HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+        while line := await reader.readline():
+            if line.startswith(b"event: ready"):
+                self.ready.set()
+            elif line.startswith(b"event: change"):
+                self.changes += 1
+                self.changed_at = time.perf_counter()
+            elif line.startswith(b": ping"):
+                self.pings += 1
+
+
+async def drive(args, base: str, port: int, pid: int) -> dict:
+    login = api(base, "POST", "/api/v1/auth/login", {"username": "admin", "password": ADMIN_PASSWORD})
+    token = login["data"]["access_token"]
+    baseline = rss_kib(pid)
+    streams, steps = [], []
+    while len(streams) < args.connections:
+        batch = [Stream() for _ in range(min(args.step, args.connections - len(streams)))]
+        for stream in batch:
+            stream.task = asyncio.create_task(stream.run(port, token))
+        await asyncio.wait_for(asyncio.gather(*(stream.ready.wait() for stream in batch)), 120)
+        streams += batch
+        await asyncio.sleep(0.5)
+        rss = rss_kib(pid)
+        steps.append({"connections": len(streams), "rss_mib": round(rss / 1024, 1)})
+
+    held = []
+    for _ in range(int(args.hold)):
+        await asyncio.sleep(1)
+        held.append(rss_kib(pid))
+
+    started = time.perf_counter()
+    api(base, "POST", "/api/v1/todos", {"title": "fan-out"}, token)
+    while sum(1 for stream in streams if stream.changes) < len(streams) and time.perf_counter() - started < 60:
+        await asyncio.sleep(0.01)
+    delays = [(stream.changed_at - started) * 1000 for stream in streams if stream.changed_at]
+    hub = api(base, "GET", "/api/v1/system/events", token=token)["data"]
+
+    for stream in streams:
+        stream.writer.close()
+        stream.task.cancel()
+    await asyncio.gather(*(stream.task for stream in streams), return_exceptions=True)
+
+    per_connection = (steps[-1]["rss_mib"] * 1024 - baseline) / len(streams)
+    return {
+        "connections": len(streams),
+        "baseline_rss_mib": round(baseline / 1024, 1),
+        "steps": steps,
+        "per_connection_kib": round(per_connection, 1),
+        "hold": {
+            "seconds": len(held),
+            "rss_min_mib": round(min(held) / 1024, 1) if held else None,
+            "rss_max_mib": round(max(held) / 1024, 1) if held else None,
+            "heartbeats_per_stream": round(statistics.fmean(stream.pings for stream in streams), 1),
+        },
+        "fanout": {
+            "received": len(delays),
+            "p50_ms": round(percentile(delays, 50), 1) if delays else None,
+            "max_ms": round(max(delays), 1) if delays else None,
+        },
+        "hub": hub,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--step", type=int, default=500)
+    parser.add_argument("--hold", type=float, default=30, help="idle seconds after the last step")
+    parser.add_argument("--heartbeat", type=float, default=5, help="events_heartbeat_seconds for the server")
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard < args.connections * 2 + 100:
+        parser.error(f"RLIMIT_NOFILE hard limit {hard} is too low for {args.connections} connections")
+
+    workdir = tempfile.mkdtemp(prefix="todo-events-")
+    config_path = os.path.join(workdir, "config.yaml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            {
+                "database_url": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+                "bcrypt_rounds": 4,
+                "admin_password": ADMIN_PASSWORD,
+                "events_heartbeat_seconds": args.heartbeat,
+                "reminders_enabled": False,
+            },
+            f,
+        )
+    env = {**os.environ, "TODO_CONFIG": config_path}
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    subprocess.run([sys.executable, "-m", "app.migrations", "bootstrap"], env=env, check=True, capture_output=True)
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+            "--backlog", "4096", "--timeout-graceful-shutdown", "5",
+        ],
+        env=env,
+    )
+    try:
+        wait_ready(base, server)
+        report = asyncio.run(drive(args, base, port, server.pid))
+    finally:
+        server.terminate()
+        server.wait(10)
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Login throughput versus latency of other endpoints under mixed load.
+
+Each run starts the app in its own process with a given password_workers
+setting (0 = bcrypt in the request threadpool), then drives POST
+/api/v1/auth/login and GET /api/v1/todos concurrently for a fixed time.
+
+    python -m bench.login_mix --workers 0 2 --logins 16 --readers 8 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from bench.db_modes import percentile
+
+
+async def hammer(client, request, deadline: float, latencies: list, failures: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await request(client)
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            failures.append(response.status_code)
+
+
+def summarize(latencies: list, failures: list, duration: float) -> dict:
+    return {
+        "ok": len(latencies),
+        "rejected": len(failures),
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def run_child(args) -> dict:
+    import anyio
+    import httpx
+    from app.core.config import get_settings
+    from app.bootstrap import bootstrap
+    from app.main import app, on_shutdown
+
+    bootstrap()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+    settings = get_settings()
+    credentials = {"username": settings.admin_username, "password": settings.admin_password}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            login = await client.post("/api/v1/auth/login", json=credentials)
+            headers = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+            logins, login_failures, reads, read_failures = [], [], [], []
+            deadline = time.perf_counter() + args.duration
+            await asyncio.gather(
+                *(
+                    hammer(client, lambda c: c.post("/api/v1/auth/login", json=credentials), deadline, logins, login_failures)
+                    for _ in range(args.logins)
+                ),
+                *(
+                    hammer(client, lambda c: c.get("/api/v1/todos", headers=headers), deadline, reads, read_failures)
+                    for _ in range(args.readers)
+                ),
+            )
+    finally:
+        on_shutdown()
+    return {
+        "password_workers": settings.password_workers,
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "login": summarize(logins, login_failures, args.duration),
+        "todos": summarize(reads, read_failures, args.duration),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=f"sqlite:///{Path(tempfile.gettempdir()) / 'todo-bench.db'}")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2], help="password_workers values to compare")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login clients")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent GET /todos clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--threadpool", type=int, default=8, help="Starlette threadpool size")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child(args))))
+        return
+
+    report = []
+    for workers in args.workers:
+        config = {
+            "database_url": args.database_url,
+            "bcrypt_rounds": args.rounds,
+            "password_workers": workers,
+            "password_queue_limit": 10000,
+            "admin_force_reset": True,
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+            yaml.safe_dump(config, f)
+        try:
+            child = subprocess.run(
+                [sys.executable, "-m", "bench.login_mix", "--child", *sys.argv[1:]],
+                env={**os.environ, "TODO_CONFIG": f.name},
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        finally:
+            os.unlink(f.name)
+        report.append(json.loads(child.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
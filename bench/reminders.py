@@ -0,0 +1,166 @@
+"""Reminder dispatch throughput and lag with a large pending backlog.
+
+Inserts --reminders todos whose remind_at is spread over the last
+--backlog-seconds (already overdue) and the next --spread-seconds, then runs
+--workers ReminderScheduler instances against the same database, delivering
+into an in-process queue. Reports throughput, delivery lag percentiles and
+duplicate deliveries (must be 0) as JSON.
+
+    python -m bench.reminders --reminders 100000 --workers 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import yaml
+
+from bench.db_modes import percentile
+
+INSERT_CHUNK = 5000
+
+
+def seed_reminders(args) -> datetime:
+    from sqlalchemy import insert
+    from app.core.database import engine
+    from app.models.todo import Todo
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    user_id = str(uuid.uuid4())
+    rows = []
+    with engine.begin() as conn:
+        for n in range(args.reminders):
+            overdue = n < args.reminders * args.overdue_ratio
+            offset = -rng.uniform(0, args.backlog_seconds) if overdue else rng.uniform(0, args.spread_seconds)
+            rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "title": f"reminder {n}",
+                    "priority": "medium",
+                    "status": "todo",
+                    "is_deleted": False,
+                    "remind_at": now + timedelta(seconds=offset),
+                }
+            )
+            if len(rows) >= INSERT_CHUNK:
+                conn.execute(insert(Todo), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Todo), rows)
+    return now
+
+
+async def run_child(args) -> dict:
+    from app.bootstrap import bootstrap
+    from app.core.reminders import QueueSink, ReminderScheduler
+
+    bootstrap()
+    seed_reminders(args)
+    sink = QueueSink()
+    schedulers = [
+        ReminderScheduler(sink, window=args.window, batch_size=args.batch_size, poll_seconds=args.poll_seconds)
+        for _ in range(args.workers)
+    ]
+    seen, lags = set(), []  # lags: (remind_at, seconds late)
+    duplicates = 0
+    started = time.perf_counter()
+    for scheduler in schedulers:
+        scheduler.start()
+    deadline = started + args.spread_seconds + args.timeout
+    backlog_drained = None
+    overdue = int(args.reminders * args.overdue_ratio)
+    while len(seen) < args.reminders and time.perf_counter() < deadline:
+        if sink.queue.empty():
+            try:
+                reminder = await asyncio.wait_for(sink.queue.get(), timeout=1)
+            except asyncio.TimeoutError:
+                continue
+        else:
+            reminder = sink.queue.get_nowait()
+        if reminder["todo_id"] in seen:
+            duplicates += 1
+            continue
+        seen.add(reminder["todo_id"])
+        remind_at = datetime.fromisoformat(reminder["remind_at"])
+        lags.append((remind_at, (datetime.utcnow() - remind_at).total_seconds()))
+        if overdue and backlog_drained is None and len(seen) >= overdue:
+            backlog_drained = time.perf_counter() - started
+    elapsed = time.perf_counter() - started
+    for scheduler in schedulers:
+        await scheduler.stop()
+    # steady state: reminders falling due after the initial backlog was gone
+    drained_at = datetime.utcnow() - timedelta(seconds=elapsed - (backlog_drained or elapsed))
+    on_time = [lag for remind_at, lag in lags if remind_at > drained_at]
+    return {
+        "reminders": args.reminders,
+        "workers": args.workers,
+        "delivered": len(seen),
+        "duplicates": duplicates,
+        "elapsed_s": round(elapsed, 2),
+        "backlog_drain_s": round(backlog_drained, 2) if backlog_drained is not None else None,
+        "backlog_throughput_per_s": round(overdue / backlog_drained, 1) if backlog_drained else None,
+        "steady_reminders": len(on_time),
+        "steady_lag_s": {
+            "p50": round(percentile(on_time, 50), 3),
+            "p95": round(percentile(on_time, 95), 3),
+            "p99": round(percentile(on_time, 99), 3),
+        },
+        "schedulers": [scheduler.stats() for scheduler in schedulers],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="default: a fresh SQLite file")
+    parser.add_argument("--reminders", type=int, default=100000)
+    parser.add_argument("--overdue-ratio", type=float, default=0.9, help="share of reminders already due at start")
+    parser.add_argument("--backlog-seconds", type=float, default=3600)
+    parser.add_argument("--spread-seconds", type=float, default=30, help="remaining reminders fall due over this period")
+    parser.add_argument("--workers", type=int, default=2, help="schedulers sharing the database")
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--poll-seconds", type=float, default=1)
+    parser.add_argument("--timeout", type=float, default=600, help="give up this long after the last reminder is due")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child(args))))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="todo-reminders-")
+    config_path = os.path.join(workdir, "config.yaml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            {"database_url": args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}", "bcrypt_rounds": 4},
+            f,
+        )
+    try:
+        child = subprocess.run(
+            [sys.executable, "-m", "bench.reminders", "--child", *sys.argv[1:]],
+            env={**os.environ, "TODO_CONFIG": config_path},
+            capture_output=True,
+            text=True,
+        )
+        if child.returncode:
+            sys.stderr.write(child.stderr)
+            sys.exit(child.returncode)
+    finally:
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    print(json.dumps(json.loads(child.stdout.strip().splitlines()[-1]), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Seed a reproducible benchmark dataset.
+
+Creates --users accounts (bench-user-0, bench-user-1, ...) with --todos todos
+and --categories categories each. Categories and tags are drawn with a Zipf
+skew, so a few are very common and most are rare, like real data. The same
+--seed always produces the same rows. Existing bench users are removed first;
+other users are left alone.
+
+Uses the database from config.yaml (or TODO_CONFIG) and applies pending
+migrations first:
+
+    python -m bench.seed --users 20 --todos 2000 --deleted-ratio 0.1
+"""
+import argparse
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+USERNAME_PREFIX = "bench-user-"
+PASSWORD = "Bench@123456"
+INSERT_CHUNK = 1000
+# ids per user kept for the write scenarios; the rest are never read back
+SAMPLE_IDS = 500
+WORDS = (
+    "report", "review", "meeting", "invoice", "call", "email", "plan", "draft",
+    "fix", "deploy", "buy", "book", "renew", "update", "prepare", "check",
+)
+PRIORITIES = (("low", 3), ("medium", 5), ("high", 2))
+COLORS = ("#ef4444", "#f59e0b", "#10b981", "#3b82f6", "#8b5cf6")
+
+
+@dataclass
+class Shape:
+    users: int = 10
+    todos: int = 1000
+    categories: int = 8
+    tags: int = 50
+    skew: float = 1.2
+    deleted_ratio: float = 0.1
+    done_ratio: float = 0.4
+    due_ratio: float = 0.6
+    days: int = 90
+    seed: int = 42
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _zipf_weights(count: int, skew: float) -> list[float]:
+    return [1 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def _clear(db: Session):
+    from app.models.category import Category
+    from app.models.stats import UserDailyStats
+    from app.models.tag import TodoTag
+    from app.models.todo import Todo
+    from app.models.user import User
+    from app.models.version import UserDataVersion
+
+    user_ids = db.execute(select(User.id).where(User.username.like(f"{USERNAME_PREFIX}%"))).scalars().all()
+    for start in range(0, len(user_ids), INSERT_CHUNK):
+        chunk = user_ids[start:start + INSERT_CHUNK]
+        for model in (Todo, TodoTag, Category, UserDailyStats, UserDataVersion):
+            db.execute(delete(model).where(model.user_id.in_(chunk)))
+        db.execute(delete(User).where(User.id.in_(chunk)))
+    db.commit()
+
+
+def _todo_rows(rng: random.Random, shape: Shape, user_id: str, category_ids: list[str], now: datetime):
+    category_weights = _zipf_weights(len(category_ids), shape.skew)
+    tag_names = [f"tag-{rank}" for rank in range(shape.tags)]
+    tag_weights = _zipf_weights(shape.tags, shape.skew)
+    today = now.date()
+    for _ in range(shape.todos):
+        created_at = now - timedelta(seconds=rng.randrange(shape.days * 86400))
+        done = rng.random() < shape.done_ratio
+        deleted = rng.random() < shape.deleted_ratio
+        tags = sorted(set(rng.choices(tag_names, tag_weights, k=rng.randrange(4)))) if tag_names else []
+        yield {
+            "id": _uuid(rng),
+            "user_id": user_id,
+            "title": " ".join(rng.choices(WORDS, k=3)),
+            "description": None if rng.random() < 0.5 else " ".join(rng.choices(WORDS, k=12)),
+            "priority": rng.choices([p for p, _ in PRIORITIES], [w for _, w in PRIORITIES])[0],
+            "status": "done" if done else "todo",
+            "due_date": today + timedelta(days=rng.randint(-30, 30)) if rng.random() < shape.due_ratio else None,
+            "remind_at": None,
+            "category_id": rng.choices(category_ids, category_weights)[0] if category_ids and rng.random() < 0.8 else None,
+            "tags": tags or None,
+            "is_deleted": deleted,
+            "deleted_at": created_at + (now - created_at) / 2 if deleted else None,
+            "completed_at": created_at + (now - created_at) / 3 if done else None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def seed_dataset(db: Session, shape: Shape, password_hash: str) -> list[dict]:
+    # Imported here: app modules build the engine from config on import, and
+    # bench.suite's parent process only needs the argument helpers below.
+    from app.crud.stats import backfill_daily_stats
+    from app.crud.tag import add_tags, tag_rows
+    from app.models.category import Category
+    from app.models.todo import Todo
+    from app.models.user import User
+
+    # Returns, per user: username, id, category ids and a sample of todo ids.
+
+    _clear(db)
+    rng = random.Random(shape.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    users = []
+    for index in range(shape.users):
+        user_id = _uuid(rng)
+        db.execute(
+            insert(User).values(
+                id=user_id,
+                username=f"{USERNAME_PREFIX}{index}",
+                email=None,
+                role="user",
+                password_hash=password_hash,
+            )
+        )
+        categories = [
+            {"id": _uuid(rng), "user_id": user_id, "name": f"category {n}", "color": COLORS[n % len(COLORS)], "order": n, "is_system": False}
+            for n in range(shape.categories)
+        ]
+        if categories:
+            db.execute(insert(Category), categories)
+        category_ids = [row["id"] for row in categories]
+        sample = {"todo": [], "done": [], "deleted": []}
+        chunk = []
+        for row in _todo_rows(rng, shape, user_id, category_ids, now):
+            bucket = sample["deleted" if row["is_deleted"] else row["status"]]
+            if len(bucket) < SAMPLE_IDS:
+                bucket.append(row["id"])
+            chunk.append(row)
+            if len(chunk) >= INSERT_CHUNK:
+                db.execute(insert(Todo), chunk)
+                add_tags(db, [tag for todo in chunk for tag in tag_rows(user_id, todo["id"], todo["tags"])])
+                chunk = []
+        if chunk:
+            db.execute(insert(Todo), chunk)
+            add_tags(db, [tag for todo in chunk for tag in tag_rows(user_id, todo["id"], todo["tags"])])
+        db.commit()
+        users.append({"username": f"{USERNAME_PREFIX}{index}", "id": user_id, "category_ids": category_ids, "todo_ids": sample})
+    backfill_daily_stats(db)
+    return users
+
+
+def add_shape_arguments(parser: argparse.ArgumentParser):
+    defaults = Shape()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--todos", type=int, default=defaults.todos, help="todos per user")
+    parser.add_argument("--categories", type=int, default=defaults.categories, help="categories per user")
+    parser.add_argument("--tags", type=int, default=defaults.tags, help="distinct tag names")
+    parser.add_argument("--skew", type=float, default=defaults.skew, help="Zipf exponent for categories and tags")
+    parser.add_argument("--deleted-ratio", type=float, default=defaults.deleted_ratio)
+    parser.add_argument("--done-ratio", type=float, default=defaults.done_ratio)
+    parser.add_argument("--due-ratio", type=float, default=defaults.due_ratio)
+    parser.add_argument("--days", type=int, default=defaults.days, help="spread of created_at into the past")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def shape_from_args(args) -> Shape:
+    return Shape(**{name: getattr(args, name) for name in asdict(Shape())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal, engine
+    from app.core.security import hash_password
+    from app.migrations import upgrade
+
+    upgrade(engine)
+    shape = shape_from_args(args)
+    with SessionLocal() as db:
+        users = seed_dataset(db, shape, hash_password(PASSWORD))
+    print(f"seeded {len(users)} users x {shape.todos} todos (password {PASSWORD})")
+
+
+if __name__ == "__main__":
+    main()
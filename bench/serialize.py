@@ -0,0 +1,118 @@
+"""Per-row CPU cost of building a todo list response.
+
+Compares the old path (hydrate ORM Todo objects, copy them into dicts,
+jsonable_encoder + stdlib json) with the column projection + orjson path
+used by the list endpoints, on an in-memory SQLite page.
+
+    python -m bench.serialize --rows 100 --repeat 200
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.response import paginated
+from app.crud.todo import TODO_COLUMNS
+from app.models.todo import Todo
+from app.schemas.todo import serialize_todo
+
+
+def legacy_serialize(todo: Todo):
+    return {
+        "id": todo.id,
+        "title": todo.title,
+        "description": todo.description,
+        "priority": todo.priority,
+        "status": todo.status,
+        "due_date": todo.due_date,
+        "remind_at": todo.remind_at,
+        "category_id": todo.category_id,
+        "tags": todo.tags,
+        "is_deleted": todo.is_deleted,
+        "deleted_at": todo.deleted_at,
+        "completed_at": todo.completed_at,
+        "created_at": todo.created_at,
+        "updated_at": todo.updated_at,
+    }
+
+
+def orm_json(db: Session, rows: int) -> bytes:
+    items = db.query(Todo).order_by(Todo.created_at.desc()).limit(rows).all()
+    content = {"code": 0, "message": "ok", "data": {
+        "items": [legacy_serialize(item) for item in items],
+        "page": 1, "page_size": rows, "total": None, "next_cursor": None,
+    }}
+    body = JSONResponse(jsonable_encoder(content)).body
+    db.expunge_all()
+    return body
+
+
+def core_orjson(db: Session, rows: int) -> bytes:
+    items = db.query(*TODO_COLUMNS).order_by(Todo.created_at.desc()).limit(rows).all()
+    return paginated([serialize_todo(item) for item in items], 1, rows, None).body
+
+
+def seed(db: Session, rows: int):
+    now = datetime.utcnow()
+    for i in range(rows):
+        db.add(Todo(
+            id=str(uuid.uuid4()),
+            user_id="bench",
+            title=f"todo {i}",
+            description="lorem ipsum " * 8,
+            priority=("high", "medium", "low")[i % 3],
+            status="done" if i % 4 == 0 else "todo",
+            due_date=(now + timedelta(days=i % 30)).date(),
+            remind_at=now + timedelta(hours=i),
+            tags=["work", f"t{i % 5}"],
+            completed_at=now if i % 4 == 0 else None,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        ))
+    db.commit()
+
+
+def measure(fn, db: Session, rows: int, repeat: int) -> dict:
+    fn(db, rows)
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(db, rows)
+        samples.append((time.process_time() - start) * 1e6 / rows)
+    return {
+        "us_per_row_median": round(statistics.median(samples), 2),
+        "us_per_row_min": round(min(samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Todo.__table__])
+    with Session(engine) as db:
+        seed(db, args.rows)
+        assert json.loads(orm_json(db, args.rows)) == json.loads(core_orjson(db, args.rows))
+        before = measure(orm_json, db, args.rows, args.repeat)
+        after = measure(core_orjson, db, args.rows, args.repeat)
+    print(json.dumps({
+        "rows": args.rows,
+        "orm_jsonable_encoder": before,
+        "core_orjson": after,
+        "speedup": round(before["us_per_row_median"] / after["us_per_row_median"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Endpoint benchmark suite on a seeded dataset, with regression checks.
+
+Seeds a reproducible dataset (see bench.seed), then drives each /api/v1
+scenario (list filters and sorts, deep pages, trash, stats, categories,
+export, writes and login) with --requests requests at --concurrency and
+reports throughput and p50/p95/p99 per scenario as JSON. The app runs in a
+child process with its own config, like the other benchmarks.
+
+    python -m bench.suite --users 10 --todos 2000 --output baseline.json
+    python -m bench.suite --users 10 --todos 2000 --baseline baseline.json --threshold 15
+
+With --baseline the run fails (exit 1) when a scenario's p95 grows, or its
+throughput drops, by more than --threshold percent. --report compares an
+existing report instead of running. Without --database-url every run uses a
+fresh SQLite file; pass a dedicated MySQL database to benchmark MySQL.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import yaml
+
+from bench.db_modes import percentile
+from bench.seed import PASSWORD, add_shape_arguments, shape_from_args
+
+PAGE_SIZE = 20
+BATCH_IDS = 20
+
+
+def _list(**params):
+    return lambda rng, user: ("GET", "/api/v1/todos", {"params": params})
+
+
+def _top_category(rng, user):
+    params = {"category_id": user["category_ids"][0]} if user["category_ids"] else {}
+    return "GET", "/api/v1/todos", {"params": params}
+
+
+def _deep_offset(rng, user):
+    return "GET", "/api/v1/todos", {"params": {"page": user["deep_page"], "with_total": "false"}}
+
+
+def _deep_cursor(rng, user):
+    params = {"cursor": user["deep_cursor"]} if user["deep_cursor"] else {}
+    return "GET", "/api/v1/todos", {"params": params}
+
+
+def _daily(rng, user):
+    today = date.today()
+    params = {"from": (today - timedelta(days=29)).isoformat(), "to": today.isoformat()}
+    return "GET", "/api/v1/stats/daily", {"params": params}
+
+
+def _create(rng, user):
+    return "POST", "/api/v1/todos", {"json": {"title": f"bench {rng.random():.6f}", "priority": "high"}}
+
+
+def _batch_create(rng, user):
+    items = [{"title": f"bench batch {n}", "tags": ["bench"]} for n in range(BATCH_IDS)]
+    return "POST", "/api/v1/todos/batch", {"json": {"items": items}}
+
+
+def _update(rng, user):
+    todo_id = rng.choice(user["todo_ids"]["todo"])
+    return "PUT", f"/api/v1/todos/{todo_id}", {"json": {"title": f"bench {rng.random():.6f}"}}
+
+
+def _batch_status(rng, user):
+    ids = rng.sample(user["todo_ids"]["todo"], min(BATCH_IDS, len(user["todo_ids"]["todo"])))
+    return "PATCH", "/api/v1/todos/batch/status", {"json": {"ids": ids, "status": rng.choice(["todo", "done"])}}
+
+
+def _login(rng, user):
+    return "POST", "/api/v1/auth/login", {"json": {"username": user["username"], "password": PASSWORD}, "auth": False}
+
+
+# Reads first: the write scenarios change the data the reads would see.
+SCENARIOS = [
+    ("todos.list", _list()),
+    ("todos.list.status_todo", _list(status="todo")),
+    ("todos.list.status_done", _list(status="done")),
+    ("todos.list.priority_high", _list(priority="high")),
+    ("todos.list.top_category", _top_category),
+    ("todos.list.keyword", _list(keyword="report")),
+    ("todos.list.keyword_relevance", _list(keyword="report", sort_by="relevance")),
+    *((f"todos.list.due_{due}", _list(due=due)) for due in ("today", "week", "overdue", "none")),
+    *(
+        (f"todos.list.sort_{sort_by}_{order}", _list(sort_by=sort_by, sort_order=order))
+        for sort_by in ("created_at", "due_date", "priority")
+        for order in ("asc", "desc")
+    ),
+    ("todos.list.fields", _list(fields="id,title,status")),
+    ("todos.list.tag", _list(tag="tag-0")),
+    ("todos.list.tag_all", _list(tag=["tag-0", "tag-1"], tag_match="all")),
+    ("todos.list.deep_offset", _deep_offset),
+    ("todos.list.deep_cursor", _deep_cursor),
+    ("trash.list", lambda rng, user: ("GET", "/api/v1/trash", {})),
+    ("stats.summary", lambda rng, user: ("GET", "/api/v1/stats/summary", {})),
+    ("stats.daily", _daily),
+    ("categories.list", lambda rng, user: ("GET", "/api/v1/categories", {})),
+    ("categories.list.counts", lambda rng, user: ("GET", "/api/v1/categories", {"params": {"with_counts": "true"}})),
+    ("tags.list", lambda rng, user: ("GET", "/api/v1/tags", {})),
+    ("users.me", lambda rng, user: ("GET", "/api/v1/users/me", {})),
+    ("todos.export", lambda rng, user: ("GET", "/api/v1/todos/export", {})),
+    ("todos.create", _create),
+    ("todos.batch_create", _batch_create),
+    ("todos.update", _update),
+    ("todos.batch_status", _batch_status),
+    ("auth.login", _login),
+]
+
+
+async def run_scenario(client, name: str, build, users: list, args) -> dict:
+    # The request list depends only on the seed, so runs are comparable.
+    rng = random.Random(f"{args.seed}:{name}")
+    requests = [(user, build(rng, user)) for user in (rng.choice(users) for _ in range(args.warmup + args.requests))]
+    latencies, failures = [], []
+
+    async def send(user, request):
+        method, path, options = request
+        options = dict(options)
+        headers = user["headers"] if options.pop("auth", True) else {}
+        start = time.perf_counter()
+        response = await client.request(method, path, headers=headers, **options)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    for user, request in requests[:args.warmup]:
+        await send(user, request)
+    queue = iter(requests[args.warmup:])
+
+    async def worker():
+        for user, request in queue:
+            elapsed, status = await send(user, request)
+            if status < 400:
+                latencies.append(elapsed)
+            else:
+                failures.append(status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": args.requests,
+        "failures": len(failures),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def run_child(args) -> dict:
+    import httpx
+    from app.core.config import get_settings
+    from app.core.database import SessionLocal, async_engine
+    from app.core.security import hash_password
+    from app.bootstrap import bootstrap
+    from app.main import app, on_shutdown
+    from bench.seed import seed_dataset
+
+    bootstrap()
+    shape = shape_from_args(args)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        users = seed_dataset(db, shape, hash_password(PASSWORD))
+    seed_seconds = time.perf_counter() - started
+    pattern = re.compile(args.only) if args.only else None
+    transport = httpx.ASGITransport(app=app)
+    scenarios = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for user in users:
+                login = await client.post("/api/v1/auth/login", json={"username": user["username"], "password": PASSWORD})
+                user["headers"] = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+                user["deep_page"] = args.deep_page
+                previous = await client.get(
+                    "/api/v1/todos",
+                    params={"page": args.deep_page - 1, "page_size": PAGE_SIZE, "with_total": "false"},
+                    headers=user["headers"],
+                )
+                user["deep_cursor"] = previous.json()["data"]["next_cursor"]
+            for name, build in SCENARIOS:
+                if pattern and not pattern.search(name):
+                    continue
+                scenarios[name] = await run_scenario(client, name, build, users, args)
+    finally:
+        on_shutdown()
+        # aiosqlite connections run in non-daemon threads; close them so the
+        # child can exit.
+        if async_engine is not None:
+            await async_engine.dispose()
+    settings = get_settings()
+    return {
+        "meta": {
+            "shape": vars(shape),
+            "mode": "async" if settings.database_async else "sync",
+            "database": settings.database_url.split("://", 1)[0],
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "deep_page": args.deep_page,
+            "bcrypt_rounds": settings.bcrypt_rounds,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(baseline: dict, report: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    regressions = []
+    for name, current in report["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        p95_change = (current["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        rps_change = (current["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"] * 100
+        slower = p95_change > threshold and current["p95_ms"] - base["p95_ms"] >= min_delta_ms
+        failing = current["failures"] > base["failures"]
+        mark = "REGRESSION" if slower or rps_change < -threshold or failing else "ok"
+        print(
+            f"{mark:<10} {name:<36} p95 {base['p95_ms']:>8.2f} -> {current['p95_ms']:>8.2f} ms ({p95_change:+.1f}%)"
+            f"  rps {base['throughput_rps']:>8.1f} -> {current['throughput_rps']:>8.1f} ({rps_change:+.1f}%)",
+            file=sys.stderr,
+        )
+        if mark != "ok":
+            regressions.append(name)
+    return regressions
+
+
+def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    config_path = os.path.join(workdir, "config.yaml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            {"database_url": database_url, "database_async": args.database_async, "bcrypt_rounds": args.rounds},
+            f,
+        )
+    try:
+        child = subprocess.run(
+            [sys.executable, "-m", "bench.suite", "--child", *sys.argv[1:]],
+            env={**os.environ, "TODO_CONFIG": config_path},
+            capture_output=True,
+            text=True,
+        )
+        if child.returncode:
+            sys.stderr.write(child.stderr)
+            sys.exit(child.returncode)
+    finally:
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="default: a fresh SQLite file per run")
+    parser.add_argument("--async", dest="database_async", action="store_true", help="use the async database mode")
+    add_shape_arguments(parser)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--deep-page", type=int, default=50, help=f"page number (of {PAGE_SIZE}) for the deep page scenarios")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--only", help="regex; run matching scenarios only")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="report to compare against")
+    parser.add_argument("--report", help="compare this existing report instead of running")
+    parser.add_argument("--threshold", type=float, default=15.0, help="allowed p95/throughput change in percent")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 increases smaller than this")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child(args))))
+        return
+
+    if args.report:
+        with open(args.report, encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        report = run(args)
+        print(json.dumps(report, indent=2))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["shape"] != report["meta"]["shape"]:
+            print("warning: baseline was recorded with a different dataset shape", file=sys.stderr)
+        regressions = compare(baseline, report, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed by more than {args.threshold}%", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
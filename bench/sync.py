@@ -0,0 +1,126 @@
+"""Delta sync cost: full sync versus resync after a few changes.
+
+Seeds one account with --todos todos (see bench.seed), pages through
+GET /api/v1/todos/changes from scratch, then changes --changes todos (updates,
+one move to trash and one permanent delete) and syncs again from the saved
+cursor. Reports rows returned, requests, SQL statements (from Server-Timing)
+and time for both, plus an idle resync, as JSON. The app runs in a child
+process with its own config, like the other benchmarks.
+
+    python -m bench.sync --todos 10000 --changes 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from bench.seed import PASSWORD, Shape
+
+QUERIES = re.compile(r'db;dur=[0-9.]+;desc="(\d+) queries"')
+
+
+async def sync(client, headers: dict, cursor: str | None, limit: int) -> tuple[dict, str]:
+    totals = {"requests": 0, "todos": 0, "categories": 0, "deleted": 0, "sql_statements": 0}
+    started = time.perf_counter()
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["since"] = cursor
+        response = await client.get("/api/v1/todos/changes", params=params, headers=headers)
+        data = response.json()["data"]
+        totals["requests"] += 1
+        for key in ("todos", "categories", "deleted"):
+            totals[key] += len(data[key])
+        match = QUERIES.search(response.headers.get("server-timing", ""))
+        totals["sql_statements"] += int(match.group(1)) if match else 0
+        cursor = data["cursor"]
+        if not data["has_more"]:
+            break
+    totals["ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return totals, cursor
+
+
+async def run_child(args) -> dict:
+    import httpx
+    from app.core.database import SessionLocal, async_engine
+    from app.core.security import hash_password
+    from app.bootstrap import bootstrap
+    from app.main import app, on_shutdown
+    from bench.seed import seed_dataset
+
+    bootstrap()
+    with SessionLocal() as db:
+        user = seed_dataset(db, Shape(users=1, todos=args.todos, seed=args.seed), hash_password(PASSWORD))[0]
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            login = await client.post("/api/v1/auth/login", json={"username": user["username"], "password": PASSWORD})
+            headers = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+            full, cursor = await sync(client, headers, None, args.limit)
+            idle, cursor = await sync(client, headers, cursor, args.limit)
+
+            live = user["todo_ids"]["todo"] + user["todo_ids"]["done"]
+            updated = live[: max(args.changes - 2, 0)]
+            for todo_id in updated:
+                await client.put(f"/api/v1/todos/{todo_id}", json={"title": "changed"}, headers=headers)
+            await client.delete(f"/api/v1/todos/{live[len(updated)]}", headers=headers)
+            await client.delete(f"/api/v1/trash/{user['todo_ids']['deleted'][0]}/purge", headers=headers)
+            delta, cursor = await sync(client, headers, cursor, args.limit)
+    finally:
+        on_shutdown()
+        if async_engine is not None:
+            await async_engine.dispose()
+    return {"todos": args.todos, "changes": len(updated) + 2, "full": full, "idle": idle, "delta": delta}
+
+
+def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="todo-sync-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    config_path = os.path.join(workdir, "config.yaml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            {"database_url": database_url, "bcrypt_rounds": 4, "profile_requests": True, "events_enabled": False},
+            f,
+        )
+    try:
+        child = subprocess.run(
+            [sys.executable, "-m", "bench.sync", "--child", *sys.argv[1:]],
+            env={**os.environ, "TODO_CONFIG": config_path},
+            capture_output=True,
+            text=True,
+        )
+        if child.returncode:
+            sys.stderr.write(child.stderr)
+            sys.exit(child.returncode)
+    finally:
+        for name in os.listdir(workdir):
+            os.unlink(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="default: a fresh SQLite file per run")
+    parser.add_argument("--todos", type=int, default=10000)
+    parser.add_argument("--changes", type=int, default=5, help="todos changed between the syncs (at least 2)")
+    parser.add_argument("--limit", type=int, default=500, help="page size of the sync requests")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child(args))))
+        return
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+import yaml
+
+# Settings are read once, at import of the app modules: point them at a
+# throwaway SQLite database before anything under app/ is imported.
+WORKDIR = tempfile.mkdtemp(prefix="todo-tests-")
+DATABASE_PATH = os.path.join(WORKDIR, "todo.db")
+CONFIG = {
+    "database_url": f"sqlite:///{DATABASE_PATH}",
+    "bcrypt_rounds": 4,
+    "password_workers": 0,
+    "reminders_enabled": False,
+    "events_enabled": False,
+    "trash_retention_days": 0,
+    "sync_tombstone_days": 0,
+}
+with open(os.path.join(WORKDIR, "config.yaml"), "w", encoding="utf-8") as f:
+    yaml.safe_dump(CONFIG, f)
+os.environ["TODO_CONFIG"] = os.path.join(WORKDIR, "config.yaml")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    from app.core.database import engine
+    from app.migrations import upgrade
+
+    upgrade(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def make_user():
+    # Fresh accounts, so tests don't see each other's todos.
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token, hash_password
+    from app.crud.user import create_user
+
+    def make() -> dict:
+        with SessionLocal() as db:
+            created = create_user(db, f"user-{uuid.uuid4().hex[:12]}", hash_password("Test@123456"), None)
+            user_id = created.id
+        return {"id": user_id, "headers": {"Authorization": f"Bearer {create_access_token(user_id)}"}}
+
+    return make
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import database
+from app.core.config import _build_async_database_url, get_settings
+from app.core.routing import RoutingSession
+
+
+@pytest.fixture
+def async_db(monkeypatch, client):
+    # database_async: true, as app.core.database would build it, on aiosqlite
+    engine = database.get_async_engine(_build_async_database_url(get_settings().database_url))
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(
+            engine,
+            sync_session_class=RoutingSession,
+            autoflush=False,
+            expire_on_commit=False,
+            info={"replicas": []},
+        ),
+    )
+    yield statements
+    client.portal.call(engine.dispose)
+
+
+def test_async_mode_create_list_update(client, user, async_db):
+    headers = user["headers"]
+    created = client.post("/api/v1/todos", json={"title": "async", "priority": "high"}, headers=headers)
+    assert created.status_code == 200
+    todo_id = created.json()["data"]["id"]
+
+    listed = client.get("/api/v1/todos", headers=headers).json()["data"]
+    assert [item["id"] for item in listed["items"]] == [todo_id]
+    assert listed["total"] == 1
+
+    updated = client.put(f"/api/v1/todos/{todo_id}", json={"title": "async updated", "status": "done"}, headers=headers)
+    assert updated.status_code == 200
+    assert updated.json()["data"]["status"] == "done"
+
+    items = client.get("/api/v1/todos", params={"status": "done"}, headers=headers).json()["data"]["items"]
+    assert [(item["id"], item["title"]) for item in items] == [(todo_id, "async updated")]
+    assert any(statement.startswith("INSERT INTO todos") for statement in async_db)
+    assert any(statement.startswith("UPDATE todos") for statement in async_db)
+
+
+def test_sync_sessions_wait_for_a_pool_slot(monkeypatch):
+    # With pool capacity 2, a third request session waits in run_db until
+    # one of the first two is closed by get_db.
+    monkeypatch.setattr(database, "_pool_capacity", lambda: 2)
+    request = SimpleNamespace(method="GET")
+
+    async def scenario():
+        sessions = [database.get_db(request) for _ in range(3)]
+        dbs = [await session.__anext__() for session in sessions]
+        assert await database.run_db(dbs[0], lambda db: 1) == 1
+        assert await database.run_db(dbs[1], lambda db: 2) == 2
+        # a session holds its slot across calls
+        assert await database.run_db(dbs[0], lambda db: 3) == 3
+
+        waiting = asyncio.create_task(database.run_db(dbs[2], lambda db: 4))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        await sessions[0].aclose()
+        assert await asyncio.wait_for(waiting, 1) == 4
+        for session in sessions[1:]:
+            await session.aclose()
+        # every slot was given back
+        slots = dbs[2].info["slots"]
+        await asyncio.wait_for(asyncio.gather(slots.acquire(), slots.acquire()), 1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from app.core import cache
+from app.core.database import SessionLocal, engine
+from app.core.security import user_cache
+from app.crud.user import get_user, update_user
+
+
+def _statements(client, user, path="/api/v1/users/me") -> int:
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get(path, headers=user["headers"]).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+def test_cache_hit_touches_no_database(client, user):
+    _statements(client, user)
+    assert _statements(client, user) == 0
+    client.post("/api/v1/todos", json={"title": "write"}, headers=user["headers"])
+    assert _statements(client, user) == 0
+
+
+def test_local_user_write_evicts_at_once(client, user):
+    client.get("/api/v1/users/me", headers=user["headers"])
+    with SessionLocal() as db:
+        update_user(db, get_user(db, user["id"]), {"role": "superadmin"})
+    assert client.get("/api/v1/users/me", headers=user["headers"]).json()["data"]["role"] == "superadmin"
+
+
+def test_other_process_changes_show_after_the_user_ttl(monkeypatch, client, user):
+    now = [time.monotonic()]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    client.get("/api/v1/users/me", headers=user["headers"])
+
+    # as another worker or the bootstrap CLI would: the local entry stays
+    with SessionLocal() as db:
+        cached = user_cache.get(user["id"])
+        update_user(db, get_user(db, user["id"]), {"role": "superadmin"})
+        user_cache.set(user["id"], cached)
+
+    assert client.get("/api/v1/users/me", headers=user["headers"]).json()["data"]["role"] == "user"
+    now[0] += user_cache.ttl
+    assert client.get("/api/v1/users/me", headers=user["headers"]).json()["data"]["role"] == "superadmin"
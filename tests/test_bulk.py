@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.crud import todo as crud_todo
+from app.crud.stats import backfill_daily_stats
+from app.models.stats import UserDailyStats
+from app.models.sync import SyncTombstone
+from app.models.tag import TodoTag
+from app.models.todo import Todo
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(crud_todo, "publish_change", lambda user_id, entity, op, ids: events.append((user_id, op, ids)))
+    return events
+
+
+def _create(client, user, count: int, **fields) -> list[str]:
+    items = [{"title": f"todo {i}", "tags": ["bulk"], **fields} for i in range(count)]
+    return client.post("/api/v1/todos/batch", json={"items": items}, headers=user["headers"]).json()["data"]["ids"]
+
+
+def _rows(db, ids) -> dict:
+    return {row.id: row for row in db.execute(select(Todo.id, Todo.status, Todo.is_deleted).where(Todo.id.in_(ids)))}
+
+
+def _stats(db, user_id: str) -> list[tuple]:
+    rows = db.execute(
+        select(UserDailyStats.day, UserDailyStats.created, UserDailyStats.completed, UserDailyStats.deleted)
+        .where(UserDailyStats.user_id == user_id)
+        .order_by(UserDailyStats.day)
+    ).all()
+    return [tuple(row) for row in rows if any(row[1:])]
+
+
+def _assert_stats_consistent(*users):
+    # the incrementally kept rollup equals one rebuilt from the todos
+    with SessionLocal() as db:
+        for user in users:
+            kept = _stats(db, user["id"])
+            backfill_daily_stats(db, user["id"])
+            assert _stats(db, user["id"]) == kept
+
+
+def _race(monkeypatch, other_write):
+    # Runs another writer's change once, between a chunk's SELECT and its
+    # statement (where _bulk_by_chunks bumps the data version).
+    bump = crud_todo.bump_data_version
+    pending = [other_write]
+
+    def racing_bump(db, user_id):
+        if pending:
+            pending.pop()(db)
+        return bump(db, user_id)
+
+    monkeypatch.setattr(crud_todo, "bump_data_version", racing_bump)
+
+
+def test_clear_done_skips_rows_changed_mid_chunk(monkeypatch, client, make_user, published):
+    user, other = make_user(), make_user()
+    ids = _create(client, user, 5, status="done")
+    other_ids = _create(client, other, 2, status="done")
+    monkeypatch.setattr(crud_todo, "BULK_CHUNK_SIZE", 2)
+    # the whole first chunk is reopened by another request meanwhile
+    _race(monkeypatch, lambda db: crud_todo.batch_status(db, user["id"], ids[:2], "todo"))
+
+    with SessionLocal() as db:
+        assert crud_todo.clear_done(db, user["id"]) == 3
+        rows = _rows(db, ids + other_ids)
+    assert [rows[i].is_deleted for i in ids] == [False, False, True, True, True]
+    assert not any(rows[i].is_deleted for i in other_ids)
+    cleared = [i for user_id, op, event_ids in published if op == "deleted" for i in event_ids]
+    assert sorted(cleared) == sorted(ids[2:])
+    _assert_stats_consistent(user, other)
+
+
+def test_clear_trash_skips_rows_restored_mid_chunk(monkeypatch, client, make_user, published):
+    user, other = make_user(), make_user()
+    ids = _create(client, user, 5)
+    other_ids = _create(client, other, 1)
+    for owner, todo_ids in ((user, ids), (other, other_ids)):
+        for todo_id in todo_ids:
+            client.delete(f"/api/v1/todos/{todo_id}", headers=owner["headers"])
+    monkeypatch.setattr(crud_todo, "BULK_CHUNK_SIZE", 2)
+    _race(monkeypatch, lambda db: crud_todo.restore_todo(db, db.get(Todo, ids[0])))
+
+    with SessionLocal() as db:
+        assert crud_todo.clear_trash(db, user["id"]) == 4
+        assert set(_rows(db, ids + other_ids)) == {ids[0], *other_ids}
+        tombstones = db.execute(select(SyncTombstone.entity_id).where(SyncTombstone.user_id == user["id"])).scalars()
+        assert sorted(tombstones) == sorted(ids[1:])
+        tagged = db.execute(select(TodoTag.todo_id).where(TodoTag.todo_id.in_(ids + other_ids))).scalars()
+        assert sorted(tagged) == sorted([ids[0], *other_ids])
+    _assert_stats_consistent(user, other)
+
+
+def test_batch_status_only_touches_own_rows(client, make_user, published):
+    user, other = make_user(), make_user()
+    ids = _create(client, user, 3)
+    other_ids = _create(client, other, 2)
+
+    with SessionLocal() as db:
+        assert crud_todo.batch_status(db, user["id"], ids[:2] + other_ids + ["missing"], "done") == 2
+        assert crud_todo.batch_status(db, user["id"], other_ids, "done") == 0
+        rows = _rows(db, ids + other_ids)
+    assert [rows[i].status for i in ids + other_ids] == ["done", "done", "todo", "todo", "todo"]
+    updates = [(user_id, sorted(event_ids)) for user_id, op, event_ids in published if op == "updated"]
+    assert updates == [(user["id"], sorted(ids[:2]))]
+    _assert_stats_consistent(user, other)
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.crud import category as crud_category
+from app.models.category import Category
+from app.models.sync import SyncTombstone
+from app.models.todo import Todo
+
+
+@pytest.fixture
+def category(client, user):
+    headers = user["headers"]
+    created = client.post("/api/v1/categories", json={"name": "work", "color": "#000000"}, headers=headers).json()["data"]
+    items = [{"title": f"todo {i}", "category_id": created["id"]} for i in range(5)]
+    ids = client.post("/api/v1/todos/batch", json={"items": items}, headers=headers).json()["data"]["ids"]
+    client.delete(f"/api/v1/todos/{ids[0]}", headers=headers)
+    return created["id"], ids
+
+
+def _assignments(db, ids) -> set:
+    return set(db.execute(select(Todo.category_id, Todo.change_seq).where(Todo.id.in_(ids))).all())
+
+
+def test_delete_category_unassigns_its_todos_in_the_same_write(client, user, category):
+    category_id, ids = category
+    assert client.delete(f"/api/v1/categories/{category_id}", headers=user["headers"]).status_code == 200
+
+    with SessionLocal() as db:
+        assert db.get(Category, category_id) is None
+        seq = db.execute(select(SyncTombstone.change_seq).where(SyncTombstone.entity_id == category_id)).scalar_one()
+        # trash included, all at the delete's change_seq
+        assert _assignments(db, ids) == {(None, seq)}
+
+
+def test_failed_delete_keeps_category_and_assignments(monkeypatch, user, category):
+    category_id, ids = category
+
+    def fail(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(crud_category, "record_tombstones", fail)
+    with SessionLocal() as db:
+        before = _assignments(db, ids)
+        with pytest.raises(RuntimeError):
+            crud_category.delete_category(db, crud_category.get_category(db, user["id"], category_id))
+        db.rollback()
+        assert db.get(Category, category_id) is not None
+        assert _assignments(db, ids) == before
+        assert {row[0] for row in before} == {category_id}
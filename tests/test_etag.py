@@ -0,0 +1,73 @@
+import pytest
+
+CACHED = ["/api/v1/todos", "/api/v1/trash", "/api/v1/tags", "/api/v1/categories", "/api/v1/stats/summary"]
+
+
+def _get(client, user, path: str, etag: str | None = None, **params):
+    headers = {**user["headers"], **({"If-None-Match": etag} if etag else {})}
+    return client.get(path, params=params, headers=headers)
+
+
+def _version(etag: str) -> int:
+    return int(etag.strip('"').split("-")[0])
+
+
+@pytest.mark.parametrize("path", CACHED)
+def test_unchanged_data_is_not_modified(client, user, path):
+    first = _get(client, user, path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    response = _get(client, user, path, etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    # weak and list forms match too
+    assert _get(client, user, path, f'"other", W/{etag}').status_code == 304
+    assert _get(client, user, path, "*").status_code == 304
+    assert _get(client, user, path, '"0-0000000000000000"').status_code == 200
+
+
+def test_writes_change_the_etag(client, user):
+    etag = _get(client, user, "/api/v1/todos").headers["ETag"]
+    todo = client.post("/api/v1/todos", json={"title": "a"}, headers=user["headers"]).json()["data"]
+    response = _get(client, user, "/api/v1/todos", etag)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["data"]["items"]] == [todo["id"]]
+    assert _version(response.headers["ETag"]) > _version(etag)
+
+    # every kind of write moves the version: update, trash, category change
+    for write in (
+        lambda: client.put(f"/api/v1/todos/{todo['id']}", json={"title": "b"}, headers=user["headers"]),
+        lambda: client.delete(f"/api/v1/todos/{todo['id']}", headers=user["headers"]),
+        lambda: client.post("/api/v1/categories", json={"name": "etag", "color": "#ffffff"}, headers=user["headers"]),
+    ):
+        etags = {path: _get(client, user, path).headers["ETag"] for path in CACHED}
+        write()
+        for path, etag in etags.items():
+            assert _get(client, user, path, etag).status_code == 200, path
+
+    # the cached category list follows the version too
+    names = [item["name"] for item in _get(client, user, "/api/v1/categories").json()["data"]]
+    assert "etag" in names
+
+
+def test_etags_differ_per_query(client, user):
+    plain = _get(client, user, "/api/v1/todos").headers["ETag"]
+    filtered = _get(client, user, "/api/v1/todos", status="done").headers["ETag"]
+    assert plain != filtered
+    assert _get(client, user, "/api/v1/todos", plain, status="done").status_code == 200
+
+
+def test_etags_are_per_user(client, make_user):
+    owner, other = make_user(), make_user()
+    etag = _get(client, owner, "/api/v1/todos").headers["ETag"]
+
+    # another user's write does not invalidate this one's cache...
+    client.post("/api/v1/todos", json={"title": "theirs"}, headers=other["headers"])
+    assert _get(client, owner, "/api/v1/todos", etag).status_code == 304
+    # ...and one user's ETag never matches another user's data
+    response = _get(client, other, "/api/v1/todos", etag)
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["data"]["items"]] == ["theirs"]
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import tracemalloc
+
+import orjson
+
+from app.api.routes import events as events_route
+from app.core.events import OVERFLOW, ChangeHub
+from app.core.security import create_access_token
+
+
+def _payloads(subscription) -> list:
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+
+def test_slow_subscriber_is_bounded_then_dropped_with_overflow():
+    async def scenario():
+        hub = ChangeHub(queue_size=3)
+        slow, reader = hub.subscribe("u1"), hub.subscribe("u1")
+        for n in range(3):
+            hub.publish("u1", {"entity": "todo", "op": "updated", "n": n})
+            await asyncio.sleep(0)
+            _payloads(reader)
+        assert slow.queue.qsize() == 3 and not slow.dropped
+
+        hub.publish("u1", {"entity": "todo", "op": "updated", "n": 3})
+        await asyncio.sleep(0)
+        # the slow stream gets one overflow message telling it to resync;
+        # the one keeping up still gets the event
+        assert slow.dropped
+        assert _payloads(slow) == [OVERFLOW]
+        assert [orjson.loads(m.split(b"data: ")[1])["n"] for m in _payloads(reader)] == [3]
+        assert hub.stats() == {"users": 1, "subscribers": 1, "published": 4, "delivered": 7, "dropped": 1}
+
+        hub.publish("u1", {"entity": "todo", "op": "updated", "n": 4})
+        await asyncio.sleep(0)
+        assert slow.queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_stream_unsubscribes_on_disconnect(monkeypatch):
+    class Request:
+        disconnected = False
+
+        async def is_disconnected(self):
+            return self.disconnected
+
+    async def scenario():
+        hub = ChangeHub(queue_size=10)
+        monkeypatch.setattr(events_route, "hub", hub)
+        request = Request()
+        stream = events_route._event_stream(request, "u1", heartbeat=0.01)
+        assert b"event: ready" in await stream.__anext__()
+        assert hub.stats()["subscribers"] == 1
+
+        hub.publish("u1", {"entity": "todo", "op": "created"})
+        assert b"event: change" in await stream.__anext__()
+        request.disconnected = True
+        assert [message async for message in stream] == []
+        assert hub.stats()["subscribers"] == 0 and hub.stats()["users"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_idle_streams_hold_bounded_state(monkeypatch):
+    # A scaled-down bench.events: many idle streams of one user, held through
+    # several heartbeats, then one change fanned out to all of them.
+    streams = 500
+
+    class Request:
+        disconnected = False
+
+        async def is_disconnected(self):
+            return self.disconnected
+
+    async def scenario():
+        hub = ChangeHub(queue_size=10)
+        monkeypatch.setattr(events_route, "hub", hub)
+        request = Request()
+        heartbeats, changes = [0] * streams, [0] * streams
+
+        async def consume(n):
+            async for message in events_route._event_stream(request, "u1", heartbeat=0.02):
+                if message == events_route.HEARTBEAT:
+                    heartbeats[n] += 1
+                elif b"event: change" in message:
+                    changes[n] += 1
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            tasks = [asyncio.create_task(consume(n)) for n in range(streams)]
+            await asyncio.sleep(0.05)
+            assert hub.stats()["subscribers"] == streams
+            opened = tracemalloc.get_traced_memory()[0]
+            await asyncio.sleep(0.25)
+            idle = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        per_stream = (opened - before) / streams
+        assert per_stream < 16 * 1024, per_stream
+        # holding idle does not accumulate per-stream state
+        assert (idle - opened) / streams < 1024, idle - opened
+        assert min(heartbeats) >= 2
+        assert all(sub.queue.qsize() <= 1 for subs in hub._subscribers.values() for sub in subs)
+
+        hub.publish("u1", {"entity": "todo", "op": "created", "ids": ["t1"]})
+        await asyncio.sleep(0.05)
+        assert changes == [1] * streams
+        assert hub.stats()["dropped"] == 0
+
+        request.disconnected = True
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        assert hub.stats()["subscribers"] == 0 and hub.stats()["users"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_access_log_redacts_query_tokens(caplog):
+    import app.main  # noqa: F401 - installs the access log filter
+
+    token = create_access_token("u1")
+    with caplog.at_level(logging.INFO, logger="uvicorn.access"):
+        logging.getLogger("uvicorn.access").info(
+            '%s - "%s %s HTTP/%s" %d', "127.0.0.1:5000", "GET", f"/api/v1/events?access_token={token}&x=1", "1.1", 200
+        )
+    assert token not in caplog.text
+    assert "/api/v1/events?access_token=***&x=1" in caplog.text
@@ -0,0 +1,100 @@
+import json
+
+from sqlalchemy import func, select
+
+from app.api.routes import todos as todos_route
+from app.core.database import SessionLocal
+from app.core.streaming import MAX_LINE_LENGTH
+from app.models.todo import Todo
+
+
+def _count(user) -> int:
+    with SessionLocal() as db:
+        return db.execute(select(func.count()).select_from(Todo).where(Todo.user_id == user["id"])).scalar()
+
+
+def _titles(client, user) -> list[str]:
+    params = {"sort_by": "title", "sort_order": "asc", "page_size": 100}
+    return [item["title"] for item in client.get("/api/v1/todos", params=params, headers=user["headers"]).json()["data"]["items"]]
+
+
+def _import(client, user, body: bytes, content_type: str = "application/x-ndjson", **params):
+    headers = {**user["headers"], "Content-Type": content_type}
+    return client.post("/api/v1/todos/import", params=params, content=body, headers=headers)
+
+
+def test_batch_create(client, user):
+    items = [{"title": "a", "tags": ["x"]}, {"title": "b", "priority": "high"}]
+    response = client.post("/api/v1/todos/batch", json={"items": items}, headers=user["headers"])
+    data = response.json()["data"]
+    assert data["created"] == 2 and len(data["ids"]) == 2
+    assert _titles(client, user) == ["a", "b"]
+
+
+def test_batch_create_is_all_or_nothing(client, user):
+    items = [{"title": "ok"}, {"description": "no title"}, {"title": "ok too"}, {"title": "x", "tags": ["t" * 65]}]
+    response = client.post("/api/v1/todos/batch", json={"items": items}, headers=user["headers"])
+    assert response.status_code == 422
+    errors = response.json()["data"]["errors"]
+    assert [error["index"] for error in errors] == [1, 3]
+    assert errors[0]["errors"][0]["loc"] == ["title"]
+    assert _count(user) == 0
+
+    too_many = [{"title": str(n)} for n in range(todos_route.MAX_BATCH_ITEMS + 1)]
+    response = client.post("/api/v1/todos/batch", json={"items": too_many}, headers=user["headers"])
+    assert response.json()["message"] == "too_many_items"
+    assert _count(user) == 0
+
+
+def test_jsonl_import_reports_bad_lines_and_keeps_the_rest(client, user, monkeypatch):
+    monkeypatch.setattr(todos_route, "IMPORT_CHUNK_SIZE", 2)
+    lines = [
+        json.dumps({"title": "a", "tags": ["x", "x"]}),
+        "{not json",
+        "",
+        json.dumps({"title": "b"}),
+        json.dumps({"priority": "high"}),
+        json.dumps({"title": "c"}),
+    ]
+    response = _import(client, user, "\n".join(lines).encode("utf-8"))
+    assert response.status_code == 200
+    summary = response.json()["data"]
+    # blank lines are skipped, not counted; line numbers are the file's
+    assert {key: summary[key] for key in ("rows", "created", "failed", "chunks")} == {
+        "rows": 5, "created": 3, "failed": 2, "chunks": 2,
+    }
+    assert [error["line"] for error in summary["errors"]] == [2, 5]
+    assert summary["errors"][0]["errors"] == [{"msg": "invalid_json"}]
+    assert summary["errors"][1]["errors"][0]["loc"] == ["title"]
+    assert _titles(client, user) == ["a", "b", "c"]
+
+
+def test_csv_import(client, user):
+    body = (
+        "title,priority,tags,description\r\n"
+        "a,high,work; home,\r\n"
+        '"b, quoted",low,,"two\nlines"\r\n'
+        "short,row\r\n"
+        "c,,,\r\n"
+    ).encode("utf-8-sig")
+    response = _import(client, user, body, "text/csv")
+    summary = response.json()["data"]
+    assert (summary["rows"], summary["created"], summary["failed"]) == (4, 3, 1)
+    assert summary["errors"] == [{"line": 5, "errors": [{"msg": "column_count_mismatch"}]}]
+    items = client.get("/api/v1/todos", params={"sort_by": "title", "sort_order": "asc"}, headers=user["headers"]).json()["data"]["items"]
+    assert [(item["title"], item["priority"], item["tags"]) for item in items] == [
+        ("a", "high", ["work", "home"]), ("b, quoted", "low", None), ("c", "medium", None),
+    ]
+    assert items[1]["description"] == "two\nlines"
+
+
+def test_import_stops_on_an_unreadable_line_with_what_was_committed(client, user, monkeypatch):
+    monkeypatch.setattr(todos_route, "IMPORT_CHUNK_SIZE", 1)
+    body = b'{"title": "a"}\n{"title": "b"}\n' + b"x" * (MAX_LINE_LENGTH + 1)
+    response = _import(client, user, body, format="jsonl")
+    assert response.status_code == 400
+    assert response.json()["message"] == "line_too_long"
+    assert response.json()["data"]["created"] == 2
+    assert _titles(client, user) == ["a", "b"]
+
+    assert _import(client, user, b"", format="xml").json()["message"] == "invalid_format"
@@ -0,0 +1,97 @@
+import asyncio
+import re
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics
+from app.core.profiling import ProfilerMiddleware
+
+REQUESTS = 8
+STATEMENTS = 4
+SLEEP_MS = 20
+
+
+@pytest.fixture
+def shared_engine(tmp_path):
+    # Fewer pooled connections than requests: concurrent requests take turns
+    # on each connection, and two statements are always in flight at once.
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", poolclass=QueuePool, pool_size=2, max_overflow=0)
+
+    @event.listens_for(engine, "connect")
+    def add_sleep(dbapi_conn, record):
+        dbapi_conn.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000) or ms)
+
+    yield engine
+    engine.dispose()
+
+
+def _app(engine):
+    def statement(sql: str):
+        with engine.connect() as conn:
+            conn.execute(text(sql))
+
+    app = FastAPI()
+
+    @app.get("/work/{kind}")
+    async def work(kind: str):
+        # Every request runs STATEMENTS timed statements, one connection
+        # checkout each; "failing" ones also run a statement that raises
+        # before each of them.
+        for _ in range(STATEMENTS):
+            if kind == "failing":
+                try:
+                    await run_in_threadpool(statement, "SELECT * FROM no_such_table")
+                except OperationalError:
+                    pass
+            await run_in_threadpool(statement, f"SELECT sleep_ms({SLEEP_MS})")
+            await asyncio.sleep(0)
+        return {}
+
+    return metrics.MetricsMiddleware(ProfilerMiddleware(app))
+
+
+def _server_timing(response) -> tuple[int, float, float]:
+    header = response.headers["server-timing"]
+    db = re.search(r'db;dur=([\d.]+);desc="(\d+) queries"', header)
+    total = re.search(r"total;dur=([\d.]+)", header)
+    return int(db.group(2)), float(db.group(1)) / 1000, float(total.group(1)) / 1000
+
+
+def test_concurrent_requests_on_shared_pooled_connections_are_timed_separately(shared_engine):
+    route = ("GET", "/work/{kind}")
+    statements_before = metrics.sql_statements_total._values.get((), 0)
+    seconds_before = metrics.sql_duration_total._values.get((), 0)
+    counts_before, observed_before = metrics.request_sql_statements._values.get(route, [[0], 0])
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=_app(shared_engine))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            kinds = ["failing" if n % 2 else "plain" for n in range(REQUESTS)]
+            return await asyncio.gather(*(client.get(f"/work/{kind}") for kind in kinds))
+
+    responses = asyncio.run(scenario())
+
+    assert [response.status_code for response in responses] == [200] * REQUESTS
+    # The requests waited for each other's statements, yet each reports only
+    # its own: failed ones are not counted and nobody else's time is included.
+    own_seconds = STATEMENTS * SLEEP_MS / 1000
+    timings = [_server_timing(response) for response in responses]
+    assert max(total for _, _, total in timings) > own_seconds * 3
+    for queries, db_seconds, _ in timings:
+        assert queries == STATEMENTS
+        assert own_seconds * 0.9 <= db_seconds < own_seconds * 2, db_seconds
+
+    total = REQUESTS * STATEMENTS
+    assert metrics.sql_statements_total._values[()] - statements_before == total
+    assert total * SLEEP_MS / 1000 * 0.9 <= metrics.sql_duration_total._values[()] - seconds_before
+    assert metrics.sql_duration_total._values[()] - seconds_before < total * SLEEP_MS / 1000 * 2
+    counts, observed = metrics.request_sql_statements._values[route]
+    assert observed - observed_before == total
+    assert sum(counts) - sum(counts_before) == REQUESTS
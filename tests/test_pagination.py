@@ -0,0 +1,84 @@
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.core.database import SessionLocal, engine
+from app.migrations.versions import v0013_sqlite_datetime_format
+from app.models.todo import Todo
+
+SORTS = [(sort_by, order) for sort_by in ("created_at", "due_date", "priority") for order in ("asc", "desc")]
+
+
+@pytest.fixture
+def todos(client, user):
+    # Whole-second timestamps (the CURRENT_TIMESTAMP shape), ties on every
+    # sort key and NULL due dates, plus a few rows created through the API.
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    rows = []
+    for i in range(45):
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "user_id": user["id"],
+            "title": f"todo {i}",
+            "priority": ("low", "medium", "high")[i % 3],
+            "due_date": date(2026, 2, 1) + timedelta(days=i % 4) if i % 5 else None,
+            "created_at": base + timedelta(seconds=i // 3, microseconds=0 if i % 2 else 250000),
+        })
+    with SessionLocal() as db:
+        db.execute(insert(Todo), rows)
+        db.commit()
+    for i in range(5):
+        response = client.post("/api/v1/todos", json={"title": f"api {i}", "priority": "high"}, headers=user["headers"])
+        assert response.status_code == 200
+    return len(rows) + 5
+
+
+def _ids(client, user, **params):
+    response = client.get("/api/v1/todos", params=params, headers=user["headers"])
+    assert response.status_code == 200
+    data = response.json()["data"]
+    return [item["id"] for item in data["items"]], data["next_cursor"]
+
+
+@pytest.mark.parametrize("sort_by, sort_order", SORTS)
+def test_cursor_pages_match_offset_pages(client, user, todos, sort_by, sort_order):
+    params = {"sort_by": sort_by, "sort_order": sort_order, "page_size": 7}
+    by_offset, page = [], 1
+    while True:
+        ids, _ = _ids(client, user, page=page, **params)
+        if not ids:
+            break
+        by_offset += ids
+        page += 1
+
+    by_cursor, cursor = _ids(client, user, **params)
+    while cursor:
+        ids, cursor = _ids(client, user, cursor=cursor, **params)
+        by_cursor += ids
+
+    assert len(by_offset) == todos
+    assert by_cursor == by_offset
+
+
+def test_migration_normalizes_sqlite_timestamps(user):
+    todo_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO todos (id, user_id, title, priority, status, is_deleted, created_at, deleted_at) "
+                 "VALUES (:id, :user_id, 'legacy', 'low', 'todo', 1, '2026-01-01 08:00:00', '2026-01-02 09:30:00')"),
+            {"id": todo_id, "user_id": user["id"]},
+        )
+        v0013_sqlite_datetime_format.upgrade(conn)
+        row = conn.execute(text("SELECT created_at, deleted_at FROM todos WHERE id = :id"), {"id": todo_id}).one()
+    assert tuple(row) == ("2026-01-01 08:00:00.000000", "2026-01-02 09:30:00.000000")
+
+
+def test_priority_rank_follows_priority(client, user):
+    created = client.post("/api/v1/todos", json={"title": "rank", "priority": "low"}, headers=user["headers"]).json()["data"]
+    client.post("/api/v1/todos/batch", json={"items": [{"title": "bulk", "priority": "high"}, {"title": "default"}]}, headers=user["headers"])
+    client.put(f"/api/v1/todos/{created['id']}", json={"priority": "high"}, headers=user["headers"])
+    with SessionLocal() as db:
+        rows = db.query(Todo.priority, Todo.priority_rank).filter(Todo.user_id == user["id"]).all()
+    assert sorted(rows) == [("high", 3), ("high", 3), ("medium", 2)]
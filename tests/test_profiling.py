@@ -0,0 +1,24 @@
+import logging
+
+from sqlalchemy import text
+
+from app.core import profiling
+from app.core.config import get_settings
+from app.core.database import engine
+
+
+def test_slow_query_log_leaves_out_bound_values(monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "slow_query_ms", 0)
+    profile = profiling.RequestProfile({"method": "POST", "path": "/api/v1/auth/login"})
+    token = profiling._profile.set(profile)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.core.profiling"), engine.connect() as conn:
+            conn.execute(text("SELECT :email, :hash"), {"email": "someone@example.com", "hash": "$2b$12$secret"})
+            conn.execute(text("CREATE TEMP TABLE params (value TEXT)"))
+            conn.execute(text("INSERT INTO params VALUES (:value)"), [{"value": "secret-1"}, {"value": "secret-2"}])
+    finally:
+        profiling._profile.reset(token)
+    assert "SELECT ?, ? (2 params)" in caplog.text
+    assert "INSERT INTO params VALUES (?) (2 rows x 1 params)" in caplog.text
+    assert "POST /api/v1/auth/login" in caplog.text
+    assert "example.com" not in caplog.text and "secret" not in caplog.text
@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.core.database import SessionLocal
+from app.core.reminders import QueueSink, ReminderScheduler
+from app.crud.reminder import claim_reminders, finish_reminders
+from app.models.todo import Todo
+
+
+class FailingSink:
+    async def deliver(self, reminders: list[dict]):
+        raise RuntimeError("sink down")
+
+
+def _scheduler(sink, **options) -> ReminderScheduler:
+    # poll_seconds=0: every tick reads the database again
+    return ReminderScheduler(sink, **{"window": 60, "batch_size": 50, "poll_seconds": 0, "lease_seconds": 60, **options})
+
+
+def _overdue(minutes: int = 1) -> str:
+    return (datetime.utcnow() - timedelta(minutes=minutes)).isoformat()
+
+
+def _create(client, user, count: int, **fields) -> list[str]:
+    items = [{"title": f"remind {i}", "remind_at": _overdue(), **fields} for i in range(count)]
+    return client.post("/api/v1/todos/batch", json={"items": items}, headers=user["headers"]).json()["data"]["ids"]
+
+
+def _delivered(sink: QueueSink, user) -> list[str]:
+    ids = []
+    while not sink.queue.empty():
+        reminder = sink.queue.get_nowait()
+        if reminder["user_id"] == user["id"]:
+            ids.append(reminder["todo_id"])
+    return ids
+
+
+def _state(ids) -> dict:
+    with SessionLocal() as db:
+        rows = db.execute(select(Todo.id, Todo.remind_at, Todo.reminded_at, Todo.reminder_claim).where(Todo.id.in_(ids)))
+        return {row.id: row for row in rows}
+
+
+def _drain(*schedulers, rounds: int = 10):
+    async def scenario():
+        for _ in range(rounds):
+            await asyncio.gather(*(scheduler.tick() for scheduler in schedulers))
+
+    asyncio.run(scenario())
+
+
+def test_two_workers_deliver_each_reminder_once(client, user):
+    # more than one batch, so both workers go through the backlog cursor
+    ids = _create(client, user, 120)
+    sink = QueueSink()
+    first, second = _scheduler(sink), _scheduler(sink)
+
+    _drain(first, second)
+
+    delivered = _delivered(sink, user)
+    assert sorted(delivered) == sorted(ids)
+    assert all(row.reminded_at is not None for row in _state(ids).values())
+
+
+def test_claim_is_exclusive_until_the_lease_expires(client, user):
+    [todo_id] = _create(client, user, 1)
+    remind_at = _state([todo_id])[todo_id].remind_at
+    keys = [(remind_at, todo_id)]
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        assert [row.id for row in claim_reminders(db, keys, "a", now, 60)] == [todo_id]
+        assert claim_reminders(db, keys, "b", now + timedelta(seconds=30), 60) == []
+        # worker "a" died without finishing: after the lease "b" takes over
+        assert [row.id for row in claim_reminders(db, keys, "b", now + timedelta(seconds=61), 60)] == [todo_id]
+        assert finish_reminders(db, [todo_id], "a", now) == 0
+        assert _state([todo_id])[todo_id].reminded_at is None
+        assert finish_reminders(db, [todo_id], "b", now) == 1
+    assert _state([todo_id])[todo_id].reminded_at == now
+    with SessionLocal() as db:
+        assert claim_reminders(db, keys, "c", now + timedelta(hours=1), 60) == []
+
+
+def test_failed_delivery_is_retried_by_another_worker_after_the_lease(client, user):
+    ids = _create(client, user, 3)
+    failing, sink = _scheduler(FailingSink()), QueueSink()
+    other = _scheduler(sink)
+
+    _drain(failing, rounds=1)
+    assert failing.counts["failed"] >= 3
+    state = _state(ids)
+    assert all(row.reminded_at is None and row.reminder_claim for row in state.values())
+
+    # still leased: the other worker reads the rows but cannot claim them
+    _drain(other, rounds=1)
+    assert _delivered(sink, user) == []
+
+    with SessionLocal() as db:
+        db.execute(update(Todo).where(Todo.id.in_(ids)).values(reminder_claimed_at=datetime.utcnow() - timedelta(minutes=2)))
+        db.commit()
+    _drain(other, rounds=1)
+    assert sorted(_delivered(sink, user)) == sorted(ids)
+    assert all(row.reminded_at is not None for row in _state(ids).values())
+
+
+def test_changing_remind_at_rearms_the_reminder(client, user):
+    first_id, second_id = _create(client, user, 2)
+    sink = QueueSink()
+    scheduler = _scheduler(sink)
+    _drain(scheduler, rounds=1)
+    assert sorted(_delivered(sink, user)) == sorted([first_id, second_id])
+
+    # editing anything else does not fire it again
+    client.put(f"/api/v1/todos/{first_id}", json={"title": "renamed"}, headers=user["headers"])
+    client.put(f"/api/v1/todos/{second_id}", json={"remind_at": _overdue(2)}, headers=user["headers"])
+    assert _state([second_id])[second_id].reminded_at is None
+
+    _drain(scheduler, rounds=1)
+    assert _delivered(sink, user) == [second_id]
+    assert _state([second_id])[second_id].reminded_at is not None
+
+
+def test_trashed_and_done_todos_are_skipped(client, user):
+    live, trashed, done = _create(client, user, 3)
+    client.delete(f"/api/v1/todos/{trashed}", headers=user["headers"])
+    client.put(f"/api/v1/todos/{done}", json={"status": "done"}, headers=user["headers"])
+    sink = QueueSink()
+    scheduler = _scheduler(sink)
+
+    _drain(scheduler, rounds=1)
+
+    assert _delivered(sink, user) == [live]
+    assert scheduler.counts["skipped"] >= 2
+    # skipped ones are finished too, so they are not read again
+    assert all(row.reminded_at is not None for row in _state([live, trashed, done]).values())
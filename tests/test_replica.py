@@ -0,0 +1,95 @@
+import sqlite3
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database, routing
+from app.core.config import get_settings
+from app.core.routing import RoutingSession
+from app.models.todo import Todo
+from app.models.version import UserDataVersion
+
+LONG_AGO = datetime(2000, 1, 1)
+
+
+def _route_to(monkeypatch, replica):
+    monkeypatch.setattr(
+        database,
+        "SessionLocal",
+        sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=database.engine, info={"replicas": [replica]}),
+    )
+
+
+def _add_todo(engine, user_id: str, title: str):
+    with engine.begin() as conn:
+        conn.execute(insert(Todo), {"id": str(uuid.uuid4()), "user_id": user_id, "title": title})
+
+
+def _age_last_write(user_id: str):
+    # outside the stickiness window, in this process and in the database
+    routing.recent_writers.clear()
+    with database.engine.begin() as conn:
+        conn.execute(update(UserDataVersion).where(UserDataVersion.user_id == user_id).values(last_write_at=LONG_AGO))
+
+
+def _titles(client, user) -> set[str]:
+    response = client.get("/api/v1/todos", headers=user["headers"])
+    assert response.status_code == 200
+    return {item["title"] for item in response.json()["data"]["items"]}
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path, client, user):
+    # The replica starts as a copy of the primary; each then gets a todo of
+    # its own, so a list shows which database served it.
+    _add_todo(database.engine, user["id"], "primary")
+    _age_last_write(user["id"])
+    path = tmp_path / "replica.db"
+    with sqlite3.connect(get_settings().database_url.removeprefix("sqlite:///")) as source, sqlite3.connect(path) as target:
+        source.backup(target)
+    engine = database.get_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(update(Todo).where(Todo.user_id == user["id"]).values(title="replica"))
+    _route_to(monkeypatch, engine)
+    yield engine
+    engine.dispose()
+
+
+def test_reads_go_to_the_replica(client, user, replica):
+    assert _titles(client, user) == {"replica"}
+
+
+def test_writes_go_to_the_primary(client, user, replica):
+    response = client.post("/api/v1/todos", json={"title": "written"}, headers=user["headers"])
+    todo_id = response.json()["data"]["id"]
+    with database.engine.connect() as conn:
+        assert conn.execute(select(Todo.title).where(Todo.id == todo_id)).scalar() == "written"
+    with replica.connect() as conn:
+        assert conn.execute(select(Todo.title).where(Todo.id == todo_id)).scalar() is None
+
+
+def test_reads_stay_on_the_primary_after_a_write(client, user, replica):
+    client.post("/api/v1/todos", json={"title": "written"}, headers=user["headers"])
+    assert _titles(client, user) == {"primary", "written"}
+    # another worker only sees last_write_at on the primary
+    routing.recent_writers.clear()
+    assert _titles(client, user) == {"primary", "written"}
+    _age_last_write(user["id"])
+    assert _titles(client, user) == {"replica"}
+
+
+def test_unavailable_replica_falls_back_to_the_primary(monkeypatch, tmp_path, client, user):
+    _add_todo(database.engine, user["id"], "primary")
+    _age_last_write(user["id"])
+    missing = database.get_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(routing, "down_replicas", routing.TTLCache(10, 60))
+    _route_to(monkeypatch, missing)
+    try:
+        assert _titles(client, user) == {"primary"}
+        assert routing.down_replicas.get(missing)
+        assert _titles(client, user) == {"primary"}
+    finally:
+        missing.dispose()
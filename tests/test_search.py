@@ -0,0 +1,62 @@
+import pytest
+
+from app.core import search
+from app.core.database import SessionLocal
+from app.crud import todo as crud_todo
+
+TODOS = [
+    ("buy milk and bread", "groceries"),
+    ("milk milk milk", None),
+    ("call mom", "about milk"),
+    ("完成设计稿", "完成 Todo 列表页面"),
+]
+
+
+@pytest.fixture
+def todos(client, user):
+    for title, description in TODOS:
+        client.post("/api/v1/todos", json={"title": title, "description": description}, headers=user["headers"])
+
+
+@pytest.mark.parametrize("keyword", ["milk", "设计稿", "bread", "mi"])
+def test_fts_matches_like(monkeypatch, user, todos, keyword):
+    def titles(backend, sort_by="created_at"):
+        monkeypatch.setattr(crud_todo, "get_search_backend", lambda: backend)
+        with SessionLocal() as db:
+            items, total, _ = crud_todo.list_todos(db, user["id"], {"keyword": keyword, "sort_by": sort_by}, 1, 20)
+        assert total == len(items)
+        return [item.title for item in items]
+
+    expected = titles(search.LikeSearch())
+    assert expected
+    assert titles(search.SqliteFtsSearch()) == expected
+    assert sorted(titles(search.SqliteFtsSearch(), "relevance")) == sorted(expected)
+
+
+def test_fts_relevance_prefers_title_matches(monkeypatch, user, todos):
+    monkeypatch.setattr(crud_todo, "get_search_backend", search.SqliteFtsSearch)
+    with SessionLocal() as db:
+        items, _, _ = crud_todo.list_todos(db, user["id"], {"keyword": "milk", "sort_by": "relevance"}, 1, 20)
+    assert [item.title for item in items] == ["milk milk milk", "buy milk and bread", "call mom"]
+
+
+def test_like_fallback_rechecks_for_the_fulltext_index(monkeypatch):
+    class MysqlEngine:
+        class dialect:
+            name = "mysql"
+
+    ready, now = [False], [1000.0]
+    monkeypatch.setattr(search, "engine", MysqlEngine)
+    monkeypatch.setattr(search, "_fulltext_ready", lambda bind: ready[0])
+    monkeypatch.setattr(search.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(search, "_backend", None)
+    monkeypatch.setattr(search, "_recheck_at", None)
+
+    assert search.get_search_backend().name == "like"
+    ready[0] = True
+    assert search.get_search_backend().name == "like"
+    now[0] += search.FULLTEXT_RECHECK_SECONDS
+    assert search.get_search_backend().name == "mysql_fulltext"
+    ready[0] = False
+    now[0] += search.FULLTEXT_RECHECK_SECONDS
+    assert search.get_search_backend().name == "mysql_fulltext"
@@ -0,0 +1,116 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.crud.sync import changes_since, prune_tombstones
+from app.models.sync import SyncTombstone
+
+
+def _create(client, user, count: int) -> list[str]:
+    items = [{"title": f"sync {i}"} for i in range(count)]
+    return client.post("/api/v1/todos/batch", json={"items": items}, headers=user["headers"]).json()["data"]["ids"]
+
+
+def _changes(client, user, since: str | None = None, limit: int = 500) -> dict:
+    params = {"limit": limit, **({"since": since} if since else {})}
+    response = client.get("/api/v1/todos/changes", params=params, headers=user["headers"])
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+def _sync(client, user, since: str | None, limit: int) -> tuple[list, list, str]:
+    # follows has_more to the end, like a client catching up
+    todos, deleted = [], []
+    while True:
+        page = _changes(client, user, since, limit)
+        todos += [todo["id"] for todo in page["todos"]]
+        deleted += [(item["entity"], item["id"]) for item in page["deleted"]]
+        since = page["cursor"]
+        if not page["has_more"]:
+            return todos, deleted, since
+
+
+def test_changes_follow_change_seq_and_page_across_limit(client, user):
+    first = _create(client, user, 5)
+    second = _create(client, user, 3)
+    # a bulk chunk shares one change_seq: within it the cursor goes by id
+    with SessionLocal() as db:
+        changes, has_more = changes_since(db, user["id"], None, 100, tombstones=False)
+        assert not has_more
+        keys = [item[:3] for item in changes]
+        assert keys == sorted(keys)
+        todo_seqs = {item[2]: item[0] for item in changes if item[1] == 1}
+        assert len({todo_seqs[todo_id] for todo_id in first}) == 1
+        assert todo_seqs[first[0]] < todo_seqs[second[0]]
+
+    todos, deleted, cursor = _sync(client, user, None, 2)
+    assert todos == sorted(first) + sorted(second)
+    assert deleted == []
+    page = _changes(client, user, cursor)
+    assert page["todos"] == [] and not page["has_more"]
+
+    client.put(f"/api/v1/todos/{first[2]}", json={"title": "edited"}, headers=user["headers"])
+    third = _create(client, user, 1)
+    todos, _, cursor = _sync(client, user, cursor, 1)
+    assert todos == [first[2], *third]
+    assert _sync(client, user, cursor, 1)[0] == []
+
+
+def test_deletes_and_purges_leave_tombstones(client, user):
+    cursor = _sync(client, user, None, 100)[2]
+    kept, purged, cleared = _create(client, user, 3)
+    category = client.post("/api/v1/categories", json={"name": "sync", "color": "#000000"}, headers=user["headers"])
+    category_id = category.json()["data"]["id"]
+    for todo_id in (purged, cleared):
+        client.delete(f"/api/v1/todos/{todo_id}", headers=user["headers"])
+    client.delete(f"/api/v1/trash/{purged}/purge", headers=user["headers"])
+    client.delete("/api/v1/trash/clear", headers=user["headers"])
+    client.delete(f"/api/v1/categories/{category_id}", headers=user["headers"])
+
+    todos, deleted, cursor = _sync(client, user, cursor, 2)
+    # a soft delete is an update; only hard deletes become tombstones
+    assert kept in todos and purged not in todos and cleared not in todos
+    assert sorted(deleted) == sorted([("todo", purged), ("todo", cleared), ("category", category_id)])
+    assert _sync(client, user, cursor, 2)[1] == []
+
+    # a first sync is a snapshot of what exists, without tombstones
+    todos, deleted, _ = _sync(client, user, None, 2)
+    assert todos == [kept] and deleted == []
+
+
+def test_prune_tombstones_removes_old_ones_in_chunks(client, user):
+    ids = _create(client, user, 4)
+    for todo_id in ids:
+        client.delete(f"/api/v1/todos/{todo_id}", headers=user["headers"])
+        client.delete(f"/api/v1/trash/{todo_id}/purge", headers=user["headers"])
+    old = datetime(2000, 1, 1)
+    with SessionLocal() as db:
+        for n, todo_id in enumerate(ids[:3]):
+            db.execute(update(SyncTombstone).where(SyncTombstone.entity_id == todo_id).values(created_at=old + timedelta(seconds=n)))
+        db.commit()
+        cutoff = old + timedelta(days=1)
+        assert prune_tombstones(db, cutoff, 2) == 2
+        assert prune_tombstones(db, cutoff, 2) == 1
+        assert prune_tombstones(db, cutoff, 2) == 0
+        left = db.execute(select(SyncTombstone.entity_id).where(SyncTombstone.user_id == user["id"])).scalars().all()
+    assert left == [ids[3]]
+
+
+def test_cursor_older_than_the_tombstone_horizon_is_gone(client, user, monkeypatch):
+    monkeypatch.setattr(get_settings(), "sync_tombstone_days", 1)
+    fresh = _changes(client, user)["cursor"]
+    assert client.get("/api/v1/todos/changes", params={"since": fresh}, headers=user["headers"]).status_code == 200
+
+    issued = int(time.time()) - 2 * 86400
+    stale = encode_cursor({"s": 0, "r": 0, "id": "", "t": issued})
+    response = client.get("/api/v1/todos/changes", params={"since": stale}, headers=user["headers"])
+    assert response.status_code == 410
+    assert response.json()["code"] == 41001
+
+    # with tombstones kept forever no cursor expires
+    monkeypatch.setattr(get_settings(), "sync_tombstone_days", 0)
+    assert client.get("/api/v1/todos/changes", params={"since": stale}, headers=user["headers"]).status_code == 200
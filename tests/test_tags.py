@@ -0,0 +1,96 @@
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.tag import TodoTag
+
+
+def _create(client, user, title: str, tags: list[str]) -> dict:
+    return client.post("/api/v1/todos", json={"title": title, "tags": tags}, headers=user["headers"]).json()["data"]
+
+
+def _titles(client, user, tags: list[str], match: str | None = None) -> list[str]:
+    params = {"tag": tags, "sort_by": "title", "sort_order": "asc", **({"tag_match": match} if match else {})}
+    response = client.get("/api/v1/todos", params=params, headers=user["headers"])
+    assert response.status_code == 200
+    return [item["title"] for item in response.json()["data"]["items"]]
+
+
+def _stored(todo_id: str) -> list[str]:
+    with SessionLocal() as db:
+        return sorted(db.execute(select(TodoTag.tag).where(TodoTag.todo_id == todo_id)).scalars())
+
+
+def _tags(client, user) -> list[tuple]:
+    return [(row["tag"], row["count"]) for row in client.get("/api/v1/tags", headers=user["headers"]).json()["data"]]
+
+
+def test_tags_are_normalized_and_deduplicated(client, user):
+    todo = _create(client, user, "a", [" work ", "work", "", "  ", "home", "work"])
+    assert todo["tags"] == ["work", "home"]
+    assert _stored(todo["id"]) == ["home", "work"]
+    # the filter is normalized the same way
+    assert _titles(client, user, [" work", "work "]) == ["a"]
+    response = client.post("/api/v1/todos", json={"title": "long", "tags": ["x" * 65]}, headers=user["headers"])
+    assert response.status_code == 422
+
+
+def test_tag_match_any_and_all(client, user):
+    _create(client, user, "a", ["work", "urgent"])
+    _create(client, user, "b", ["work"])
+    _create(client, user, "c", ["home", "urgent"])
+    _create(client, user, "d", [])
+
+    assert _titles(client, user, ["work"]) == ["a", "b"]
+    assert _titles(client, user, ["work", "urgent"]) == ["a", "b", "c"]
+    assert _titles(client, user, ["work", "urgent"], "any") == ["a", "b", "c"]
+    assert _titles(client, user, ["work", "urgent"], "all") == ["a"]
+    assert _titles(client, user, ["work", "home"], "all") == []
+    assert _titles(client, user, ["missing"]) == []
+    response = client.get("/api/v1/todos", params={"tag": "work", "tag_match": "some"}, headers=user["headers"])
+    assert response.json()["message"] == "invalid_tag_match"
+
+
+def test_tags_are_per_user(client, make_user):
+    owner, other = make_user(), make_user()
+    _create(client, owner, "mine", ["shared"])
+    _create(client, other, "theirs", ["shared"])
+    assert _titles(client, owner, ["shared"]) == ["mine"]
+    assert _tags(client, owner) == [("shared", 1)]
+
+
+def test_update_replaces_tags(client, user):
+    todo = _create(client, user, "a", ["work", "home"])
+    client.put(f"/api/v1/todos/{todo['id']}", json={"tags": ["home", "errand", "errand"]}, headers=user["headers"])
+    assert _stored(todo["id"]) == ["errand", "home"]
+    assert _titles(client, user, ["work"]) == []
+    assert _titles(client, user, ["errand"]) == ["a"]
+
+    # an update without tags leaves them alone; an empty list clears them
+    client.put(f"/api/v1/todos/{todo['id']}", json={"title": "b"}, headers=user["headers"])
+    assert _stored(todo["id"]) == ["errand", "home"]
+    client.put(f"/api/v1/todos/{todo['id']}", json={"tags": []}, headers=user["headers"])
+    assert _stored(todo["id"]) == []
+    assert _tags(client, user) == []
+
+
+def test_tag_counts_exclude_trash_and_purge_removes_tags(client, user):
+    kept = _create(client, user, "kept", ["work", "home"])
+    trashed = _create(client, user, "trashed", ["work"])
+    purged = _create(client, user, "purged", ["work", "errand"])
+    assert _tags(client, user) == [("work", 3), ("errand", 1), ("home", 1)]
+
+    client.delete(f"/api/v1/todos/{trashed['id']}", headers=user["headers"])
+    client.delete(f"/api/v1/todos/{purged['id']}", headers=user["headers"])
+    # trashed todos keep their tags (for a restore) but are not counted
+    assert _stored(trashed["id"]) == ["work"]
+    assert _tags(client, user) == [("home", 1), ("work", 1)]
+    assert _titles(client, user, ["work"]) == ["kept"]
+
+    client.delete(f"/api/v1/trash/{purged['id']}/purge", headers=user["headers"])
+    assert _stored(purged["id"]) == []
+    client.post(f"/api/v1/trash/{trashed['id']}/restore", headers=user["headers"])
+    assert _tags(client, user) == [("work", 2), ("home", 1)]
+    client.delete(f"/api/v1/todos/{trashed['id']}", headers=user["headers"])
+    client.delete("/api/v1/trash/clear", headers=user["headers"])
+    assert _stored(trashed["id"]) == []
+    assert _stored(kept["id"]) == ["home", "work"]
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core import trash_purge
+from app.core.database import SessionLocal, engine, named_lock
+from app.crud import todo as crud_todo
+from app.crud.stats import backfill_daily_stats
+from app.models.stats import UserDailyStats
+from app.models.sync import SyncTombstone
+from app.models.tag import TodoTag
+from app.models.todo import Todo
+
+
+@pytest.fixture(autouse=True)
+def empty_backlog():
+    # The purge is across all users: start without other tests' old trash.
+    trash_purge.purge_expired_trash(1, pause_seconds=0)
+
+
+def _trash(client, user, count: int, days_ago: float) -> list[str]:
+    # Trashed todos whose deleted_at is `days_ago`, one second apart, with the
+    # stats rollup rebuilt to match the backdated rows.
+    items = [{"title": f"trash {n}", "tags": ["purge"]} for n in range(count)]
+    ids = client.post("/api/v1/todos/batch", json={"items": items}, headers=user["headers"]).json()["data"]["ids"]
+    deleted_at = datetime.utcnow() - timedelta(days=days_ago)
+    with SessionLocal() as db:
+        for n, todo_id in enumerate(ids):
+            db.execute(
+                update(Todo).where(Todo.id == todo_id).values(is_deleted=True, deleted_at=deleted_at + timedelta(seconds=n))
+            )
+        db.commit()
+        backfill_daily_stats(db, user["id"])
+    return ids
+
+
+def _existing(ids) -> set:
+    with SessionLocal() as db:
+        return set(db.execute(select(Todo.id).where(Todo.id.in_(ids))).scalars())
+
+
+def _tagged(ids) -> set:
+    with SessionLocal() as db:
+        return set(db.execute(select(TodoTag.todo_id).where(TodoTag.todo_id.in_(ids))).scalars())
+
+
+def _tombstones(user) -> set:
+    with SessionLocal() as db:
+        return set(db.execute(select(SyncTombstone.entity_id).where(SyncTombstone.user_id == user["id"])).scalars())
+
+
+def _assert_stats_consistent(user):
+    def rows(db):
+        return db.execute(
+            select(UserDailyStats.day, UserDailyStats.created, UserDailyStats.completed, UserDailyStats.deleted)
+            .where(UserDailyStats.user_id == user["id"])
+            .order_by(UserDailyStats.day)
+        ).all()
+
+    with SessionLocal() as db:
+        kept = [tuple(row) for row in rows(db) if any(row[1:])]
+        backfill_daily_stats(db, user["id"])
+        assert [tuple(row) for row in rows(db) if any(row[1:])] == kept
+
+
+def test_purge_chunks_follow_the_cutoff_and_cursor(client, user):
+    expired = _trash(client, user, 3, 40)
+    recent = _trash(client, user, 1, 10)
+    cutoff = datetime.utcnow() - timedelta(days=30)
+
+    with SessionLocal() as db:
+        purged, after = crud_todo.purge_expired_chunk(db, cutoff, 2)
+        assert purged == 2 and after[1] == expired[1]
+        assert _existing(expired) == {expired[2]}
+        purged, after = crud_todo.purge_expired_chunk(db, cutoff, 2, after)
+        assert purged == 1 and after[1] == expired[2]
+        assert crud_todo.purge_expired_chunk(db, cutoff, 2, after) == (0, None)
+
+    assert _existing(expired + recent) == set(recent)
+    assert _tagged(expired + recent) == set(recent)
+    assert _tombstones(user) == set(expired)
+    _assert_stats_consistent(user)
+
+
+def test_purge_keeps_a_todo_restored_meanwhile(client, user, monkeypatch):
+    restored, purged = _trash(client, user, 2, 40)
+    read = crud_todo.expired_trash
+
+    def restore_after_read(db, *args):
+        rows = read(db, *args)
+        with SessionLocal() as other:
+            crud_todo.restore_todo(other, other.get(Todo, restored))
+        return rows
+
+    monkeypatch.setattr(crud_todo, "expired_trash", restore_after_read)
+    with SessionLocal() as db:
+        count, after = crud_todo.purge_expired_chunk(db, datetime.utcnow() - timedelta(days=30), 10)
+    # the cursor still moves past the row it read
+    assert count == 1 and after[1] == purged
+    assert _existing([restored, purged]) == {restored}
+    assert _tagged([restored, purged]) == {restored}
+    assert _tombstones(user) == {purged}
+    _assert_stats_consistent(user)
+
+
+def test_purge_run_reports_chunks_and_prunes_tombstones(client, user):
+    expired = _trash(client, user, 5, 40)
+    recent = _trash(client, user, 2, 1)
+
+    report = trash_purge.purge_expired_trash(30, chunk_size=2, pause_seconds=0, tombstone_days=0)
+    assert not report["skipped"]
+    assert (report["purged"], report["chunks"], report["tombstones"]) == (5, 3, 0)
+    assert _existing(expired + recent) == set(recent)
+    assert _tombstones(user) == set(expired)
+
+    with SessionLocal() as db:
+        db.execute(update(SyncTombstone).where(SyncTombstone.user_id == user["id"]).values(created_at=datetime(2000, 1, 1)))
+        db.commit()
+    report = trash_purge.purge_expired_trash(30, chunk_size=2, pause_seconds=0, tombstone_days=90)
+    assert (report["purged"], report["tombstones"]) == (0, 5)
+    assert _tombstones(user) == set()
+
+
+def test_retention_zero_keeps_trash_forever(client, user):
+    ids = _trash(client, user, 2, 3650)
+    report = trash_purge.purge_expired_trash(0, chunk_size=2, pause_seconds=0)
+    assert (report["purged"], report["chunks"]) == (0, 0)
+    assert _existing(ids) == set(ids)
+    # the trash endpoint lists them as usual
+    trash = client.get("/api/v1/trash", headers=user["headers"]).json()["data"]["items"]
+    assert sorted(item["id"] for item in trash) == sorted(ids)
+
+
+def test_concurrent_run_is_skipped(client, user):
+    ids = _trash(client, user, 1, 40)
+    with named_lock(engine, trash_purge.LOCK_NAME) as acquired:
+        assert acquired
+        report = trash_purge.purge_expired_trash(30, pause_seconds=0)
+    assert report["skipped"] and report["purged"] == 0
+    assert _existing(ids) == set(ids)
+    assert trash_purge.purge_expired_trash(30, pause_seconds=0)["purged"] == 1
+    assert _existing(ids) == set()